@@ -0,0 +1,98 @@
+"""Bill of materials for a budget.
+
+Structure items are expanded into their ``StructureMaterial`` lines using the
+cached structure definitions, multiplied by the item quantity and aggregated
+by material code. Other catalog items (poles, conductors, equipment) appear
+as their own lines. Budget lines are first grouped by ``item_id`` so every
+structure is expanded once no matter how often the budget repeats it.
+"""
+import csv
+import io
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+from pricing import item_source, to_money
+
+STRUCTURE_COLLECTIONS = ("medium_voltage_structures", "low_voltage_structures")
+ITEM_UNITS = {"conductors": "m"}
+CSV_HEADER = ["code", "description", "unit", "quantity", "unit_price", "extended_price"]
+
+def _decimal(value: Any) -> Decimal:
+    return Decimal(str(value))
+
+def _add(lines: Dict[str, Dict[str, Any]], code: str, description: str, unit: str, quantity: Decimal, unit_price: float) -> None:
+    line = lines.get(code)
+    if line is None:
+        line = lines[code] = {"code": code, "description": description, "unit": unit,
+                              "quantity": Decimal("0"), "extended_price": Decimal("0")}
+    line["quantity"] += quantity
+    line["extended_price"] += quantity * _decimal(unit_price)
+
+async def explode_budget(budget: Dict[str, Any], cache) -> List[Dict[str, Any]]:
+    quantities: Dict[str, Decimal] = {}
+    first_item: Dict[str, Dict[str, Any]] = {}
+    for item in budget['items']:
+        quantities[item['item_id']] = quantities.get(item['item_id'], Decimal("0")) + _decimal(item['quantity'])
+        first_item.setdefault(item['item_id'], item)
+
+    snapshots = {}
+    lines: Dict[str, Dict[str, Any]] = {}
+    for item_id, quantity in quantities.items():
+        item = first_item[item_id]
+        source = item_source(item['item_type'])
+        collection = source.collection if source else None
+
+        structure = None
+        if collection in STRUCTURE_COLLECTIONS:
+            if collection not in snapshots:
+                snapshots[collection] = await cache.get(collection)
+            structure = snapshots[collection].by_id.get(item_id)
+
+        if structure is not None:
+            for material in structure.materials:
+                _add(lines, material.code, material.description, material.unit,
+                     _decimal(material.quantity) * quantity, material.unit_price)
+        else:
+            # Non-structure items, or structures deleted from the catalog since
+            # the budget was made, are listed as sold.
+            _add(lines, item['code'], item['description'], ITEM_UNITS.get(collection, "pç"),
+                 quantity, item['unit_price'])
+
+    result = []
+    for code in sorted(lines):
+        line = lines[code]
+        extended = to_money(line["extended_price"])
+        result.append({
+            "code": code,
+            "description": line["description"],
+            "unit": line["unit"],
+            "quantity": float(line["quantity"]),
+            "unit_price": float(to_money(line["extended_price"] / line["quantity"])) if line["quantity"] else 0.0,
+            "extended_price": float(extended),
+        })
+    return result
+
+def iter_csv(lines: List[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for line in lines:
+        writer.writerow([line[column] for column in CSV_HEADER])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def build_xlsx(lines: List[Dict[str, Any]]) -> bytes:
+    """Requires openpyxl; raises ImportError when it is not installed."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="Materiais")
+    sheet.append(CSV_HEADER)
+    for line in lines:
+        sheet.append([line[column] for column in CSV_HEADER])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
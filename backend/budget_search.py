@@ -0,0 +1,117 @@
+"""Budget search and aggregates computed by Mongo aggregation pipelines.
+
+Filtering, sorting, counting and grouping all happen in the database; only
+the projected ``BudgetSummary`` fields (no ``items`` array) or the grouped
+rows travel back to the API.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Projection shared by every list view that does not need the line items
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "project_name": 1,
+    "client_name": 1,
+    "total": 1,
+    "created_at": 1,
+    "item_count": {"$size": {"$ifNull": ["$items", []]}},
+}
+
+SORT_FIELDS = {"created_at": "created_at", "total": "total", "project_name": "project_name", "client_name": "client_name"}
+
+def build_match(q: Optional[str] = None, client_name: Optional[str] = None,
+                created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                total_min: Optional[float] = None, total_max: Optional[float] = None) -> Dict[str, Any]:
+    match: Dict[str, Any] = {}
+    if q:
+        match['$text'] = {"$search": q}
+    if client_name:
+        match['client_name'] = client_name
+    created_at = {}
+    if created_from:
+        created_at['$gte'] = created_from
+    if created_to:
+        created_at['$lte'] = created_to
+    if created_at:
+        match['created_at'] = created_at
+    total = {}
+    if total_min is not None:
+        total['$gte'] = total_min
+    if total_max is not None:
+        total['$lte'] = total_max
+    if total:
+        match['total'] = total
+    return match
+
+async def search(db, match: Dict[str, Any], sort: str = "created_at", descending: bool = True,
+                 skip: int = 0, limit: int = 50) -> Dict[str, Any]:
+    """One page of budget summaries plus the number of matches."""
+    if sort == "relevance" and "$text" in match:
+        order: Dict[str, Any] = {"score": {"$meta": "textScore"}, "id": 1}
+    else:
+        direction = -1 if descending else 1
+        order = {SORT_FIELDS.get(sort, "created_at"): direction, "id": direction}
+    pipeline = [{"$match": match}, {"$sort": order}, {"$skip": skip}, {"$limit": limit}, {"$project": SUMMARY_PROJECTION}]
+    results, total_count = await asyncio.gather(
+        db.budgets.aggregate(pipeline).to_list(None),
+        db.budgets.count_documents(match),
+    )
+    return {"total_count": total_count, "results": results}
+
+async def totals_by_client(db, match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$client_name", "budget_count": {"$sum": 1}, "total": {"$sum": "$total"}}},
+        {"$sort": {"total": -1, "_id": 1}},
+        {"$limit": limit},
+    ]
+    return [
+        {"client_name": row["_id"], "budget_count": row["budget_count"], "total": round(row["total"], 2)}
+        async for row in db.budgets.aggregate(pipeline)
+    ]
+
+async def totals_by_month(db, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}},
+            "budget_count": {"$sum": 1},
+            "total": {"$sum": "$total"},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    return [
+        {"month": row["_id"], "budget_count": row["budget_count"], "total": round(row["total"], 2)}
+        async for row in db.budgets.aggregate(pipeline)
+    ]
+
+async def top_items(db, match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Catalog items with the highest spend across the matching budgets."""
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "id": 1, "items": 1}},
+        {"$unwind": "$items"},
+        {"$group": {
+            "_id": {"item_type": "$items.item_type", "code": "$items.code"},
+            "description": {"$first": "$items.description"},
+            "quantity": {"$sum": "$items.quantity"},
+            "spend": {"$sum": "$items.total_price"},
+            "budgets": {"$addToSet": "$id"},
+        }},
+        {"$sort": {"spend": -1, "_id.code": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 1, "description": 1, "quantity": 1, "spend": 1, "budget_count": {"$size": "$budgets"}}},
+    ]
+    return [
+        {
+            "item_type": row["_id"]["item_type"],
+            "code": row["_id"]["code"],
+            "description": row["description"],
+            "quantity": row["quantity"],
+            "spend": round(row["spend"], 2),
+            "budget_count": row["budget_count"],
+        }
+        async for row in db.budgets.aggregate(pipeline)
+    ]
@@ -0,0 +1,195 @@
+"""Bulk catalog import from CSV, NDJSON or XLSX.
+
+Rows are parsed as the request body streams in, validated one by one with
+the collection's ``*Create`` model and upserted by ``code`` through unordered
+``bulk_write`` batches. Invalid rows and rows rejected by Mongo are reported
+by their 1-based row number instead of failing the whole import.
+"""
+import codecs
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS_BY_CONTENT_TYPE = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+
+Row = Tuple[int, Dict[str, Any]]
+
+class ImportFormatError(ValueError):
+    pass
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS_BY_CONTENT_TYPE.get(media_type)
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """CSV rows as dicts keyed by the header; quoted fields may span lines."""
+    header = None
+    record, row_number = "", 0
+    async for line in _iter_lines(chunks):
+        record += line
+        # A record is complete once its double quotes are balanced
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        yield row_number, {name: value.strip() for name, value in zip(header, values) if value.strip() != ""}
+    if record.strip():
+        raise ImportFormatError("CSV terminou dentro de um campo entre aspas")
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as exc:
+            data = {"__error__": f"JSON inválido: {exc.msg}"}
+        yield row_number, data if isinstance(data, dict) else {"__error__": "linha não é um objeto JSON"}
+
+async def iter_xlsx_rows(content: bytes) -> AsyncIterator[Row]:
+    """First sheet, first row as header. Requires openpyxl."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    header = [str(name).strip() if name is not None else "" for name in next(rows, [])]
+    for row_number, values in enumerate(rows, 1):
+        if all(value is None for value in values):
+            continue
+        yield row_number, {name: value for name, value in zip(header, values) if name and value is not None}
+    workbook.close()
+
+def _coerce_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Nested lists (structure materials) travel as a JSON column in CSV/XLSX
+    materials = data.get("materials")
+    if isinstance(materials, str):
+        data = {**data, "materials": json.loads(materials)}
+    return data
+
+def _error_messages(exc: Exception) -> List[str]:
+    if isinstance(exc, ValidationError):
+        return [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()]
+    return [str(exc)]
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.valid = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.upserted_codes: List[str] = []
+
+    def add_error(self, row: int, messages: List[str], code: Optional[str] = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "code": code, "errors": messages})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "valid": self.valid,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+async def _flush(collection, batch: Dict[str, Tuple[int, UpdateOne]], report: ImportReport) -> None:
+    entries = list(batch.items())
+    try:
+        result = await collection.bulk_write([op for _, (_, op) in entries], ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as exc:
+        details = exc.details
+    failed = set()
+    for error in details.get("writeErrors", []):
+        code, (row, _) = entries[error["index"]]
+        failed.add(error["index"])
+        report.add_error(row, [error.get("errmsg", "erro de escrita")], code)
+    report.inserted += details.get("nUpserted", 0)
+    report.updated += details.get("nMatched", 0)
+    report.upserted_codes.extend(code for index, (code, _) in enumerate(entries) if index not in failed)
+
+async def bulk_upsert(collection, rows: AsyncIterator[Row], model: Type[BaseModel],
+                      prepare: Callable[[BaseModel], Dict[str, Any]] = None) -> ImportReport:
+    """Validate ``rows`` with ``model`` and upsert them by ``code``.
+
+    Existing documents keep their ``id`` and ``created_at``; new ones get
+    fresh values. When a code repeats within a batch the last row wins.
+    """
+    prepare = prepare or (lambda obj: obj.model_dump())
+    report = ImportReport()
+    batch: Dict[str, Tuple[int, UpdateOne]] = {}
+    async for row_number, data in rows:
+        report.received += 1
+        if "__error__" in data:
+            report.add_error(row_number, [data["__error__"]])
+            continue
+        try:
+            obj = model.model_validate(_coerce_row(data))
+        except (ValidationError, ValueError) as exc:
+            report.add_error(row_number, _error_messages(exc), data.get("code"))
+            continue
+        report.valid += 1
+
+        doc = prepare(obj)
+        batch.pop(doc["code"], None)
+        batch[doc["code"]] = (row_number, UpdateOne(
+            {"code": doc["code"]},
+            {"$set": doc, "$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "created_at": datetime.now(timezone.utc),
+            }},
+            upsert=True,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            await _flush(collection, batch, report)
+            batch = {}
+    if batch:
+        await _flush(collection, batch, report)
+    return report
+
+def rows_for_format(fmt: str, body: Any) -> AsyncIterator[Row]:
+    if fmt == "csv":
+        return iter_csv_rows(body)
+    if fmt == "ndjson":
+        return iter_ndjson_rows(body)
+    return iter_xlsx_rows(body)
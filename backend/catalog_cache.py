@@ -0,0 +1,162 @@
+"""Read-through, in-process cache for the catalog collections.
+
+Catalogs (poles, conductors, equipment, the MV/LV structures and the dropdown
+options) are read on every page of the frontend and written only from the
+management screens, so each collection is kept in memory as an immutable
+``CatalogSnapshot``. Write handlers call ``invalidate``; when several workers
+share the database the optional change stream watcher invalidates the other
+workers' copies too.
+
+Writes the watcher cannot see (it is off, or down) would otherwise leave a
+worker serving its copy forever, so snapshots also expire after
+``CATALOG_CACHE_TTL_SECONDS``. That bounds how stale a price can be, e.g.
+after ``reprice_catalog.py`` or a seeder ran against the database.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from pymongo.errors import PyMongoError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+WATCH_RETRY_SECONDS = 5
+SNAPSHOT_TTL_SECONDS = float(os.environ.get('CATALOG_CACHE_TTL_SECONDS', 60))
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    collection: str
+    version: int
+    etag: str
+    items: Tuple[BaseModel, ...]
+    by_id: Mapping[str, BaseModel] = field(repr=False)
+    keys: Tuple[Tuple[datetime, str], ...] = field(repr=False)
+    # Each item serialized once at load time, so list responses are a join
+    item_json: Tuple[bytes, ...] = field(repr=False, default=())
+    # time.monotonic() when the collection was read
+    loaded_at: float = field(repr=False, default=0.0)
+
+    def _bounds(self, key: Optional[Tuple[datetime, str]], limit: Optional[int]) -> Tuple[int, int]:
+        start = bisect_right(self.keys, key) if key is not None else 0
+        end = len(self.items) if limit is None else min(start + limit, len(self.items))
+        return start, end
+
+    def page_after(self, key: Optional[Tuple[datetime, str]], limit: Optional[int]) -> Tuple[Tuple[BaseModel, ...], bool]:
+        """Slice the snapshot like a keyset query on ``(created_at, id)``."""
+        start, end = self._bounds(key, limit)
+        return self.items[start:end], end < len(self.items)
+
+    def json_page_after(self, key: Optional[Tuple[datetime, str]], limit: Optional[int]) -> Tuple[Tuple[bytes, ...], Optional[BaseModel]]:
+        """``page_after`` as serialized items, plus the last item when more follow."""
+        start, end = self._bounds(key, limit)
+        last = self.items[end - 1] if start < end < len(self.items) else None
+        return self.item_json[start:end], last
+
+class CatalogCache:
+    def __init__(self, db, models: Dict[str, Type[BaseModel]], ttl: float = SNAPSHOT_TTL_SECONDS):
+        self.db = db
+        self._models = models
+        self.ttl = ttl
+        self._adapters = {name: TypeAdapter(model) for name, model in models.items()}
+        self._snapshots: Dict[str, CatalogSnapshot] = {}
+        self._versions = {name: 0 for name in models}
+        self._locks = {name: asyncio.Lock() for name in models}
+
+    @property
+    def collections(self) -> Tuple[str, ...]:
+        return tuple(self._models)
+
+    def _fresh(self, name: str) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at >= self.ttl:
+            return None
+        return snapshot
+
+    def peek(self, name: str) -> Optional[CatalogSnapshot]:
+        """Current snapshot, or None when it has to be reloaded."""
+        return self._fresh(name)
+
+    async def get(self, name: str) -> CatalogSnapshot:
+        snapshot = self._fresh(name)
+        if snapshot is not None:
+            metrics.CACHE_REQUESTS.inc("catalog", "hit")
+            return snapshot
+        async with self._locks[name]:
+            snapshot = self._fresh(name)
+            if snapshot is not None:
+                # Loaded by a concurrent request while this one waited
+                metrics.CACHE_REQUESTS.inc("catalog", "shared")
+                return snapshot
+            metrics.CACHE_REQUESTS.inc("catalog", "miss")
+            version = self._versions[name]
+            snapshot = await self._load(name, version)
+            # A write that landed while we were reading makes this copy stale
+            if self._versions[name] == version:
+                self._snapshots[name] = snapshot
+            return snapshot
+
+    def invalidate(self, name: str) -> None:
+        if name not in self._versions:
+            return
+        self._versions[name] += 1
+        self._snapshots.pop(name, None)
+
+    def invalidate_all(self) -> None:
+        for name in self._models:
+            self.invalidate(name)
+
+    async def _load(self, name: str, version: int) -> CatalogSnapshot:
+        model = self._models[name]
+        loaded_at = time.monotonic()
+        docs = await self.db[name].find({}, {"_id": 0}).to_list(None)
+        items = sorted((model.model_validate(doc) for doc in docs), key=lambda item: (item.created_at, item.id))
+        adapter = self._adapters[name]
+        item_json = tuple(adapter.dump_json(item) for item in items)
+        digest = hashlib.sha1()
+        for payload in item_json:
+            digest.update(payload)
+        return CatalogSnapshot(
+            collection=name,
+            version=version,
+            etag=f'"{name}-{digest.hexdigest()[:20]}"',
+            items=tuple(items),
+            by_id=MappingProxyType({item.id: item for item in items}),
+            keys=tuple((item.created_at, item.id) for item in items),
+            item_json=item_json,
+            loaded_at=loaded_at,
+        )
+
+    async def watch(self) -> None:
+        """Invalidate snapshots from a Mongo change stream (needs a replica set).
+
+        Runs until cancelled. Everything is invalidated whenever the stream is
+        (re)opened, since changes may have been missed while it was down.
+        """
+        names = list(self._models)
+        # Seeders swap a staging collection in with a rename, which is
+        # reported under the staging name with the live one in ``to``
+        pipeline = [{"$match": {"$or": [{"ns.coll": {"$in": names}}, {"to.coll": {"$in": names}}]}}]
+        while True:
+            try:
+                async with self.db.watch(pipeline) as stream:
+                    self.invalidate_all()
+                    async for change in stream:
+                        self.invalidate(change["ns"]["coll"])
+                        if "to" in change:
+                            self.invalidate(change["to"]["coll"])
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as exc:
+                logger.warning("Change stream do cache de catálogo interrompido: %s", exc)
+                self.invalidate_all()
+                await asyncio.sleep(WATCH_RETRY_SECONDS)
@@ -0,0 +1,128 @@
+"""Batch export of many budgets as one ZIP of PDFs.
+
+A job is a document in the ``export_jobs`` collection, so any worker can
+report its progress; the rendering itself runs as an asyncio task in the
+worker that accepted the job. Budgets are streamed from a cursor, rendered
+through ``pdf_service`` (process pool + PDF cache) a few at a time and
+appended to a ZIP on disk as they finish, so memory does not grow with the
+number of budgets.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pdf_service
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "export_jobs"
+EXPORT_DIR = Path(os.environ.get('EXPORT_DIR', Path(__file__).parent / 'pdf_cache' / 'exports'))
+# Leave queue room in the PDF pool for interactive single downloads
+EXPORT_CONCURRENCY = max(1, pdf_service.PDF_WORKERS)
+PROGRESS_INTERVAL = 1.0
+
+_tasks: Dict[str, asyncio.Task] = {}
+
+def archive_path(job_id: str) -> Path:
+    return EXPORT_DIR / f"orcamentos_{job_id}.zip"
+
+def pdf_filename(budget: Dict[str, Any]) -> str:
+    return f"orcamento_{budget['project_name'].replace(' ', '_').replace('/', '_')}_{budget['id'][:8]}.pdf"
+
+async def _render_with_retry(budget: Dict[str, Any]) -> Path:
+    while True:
+        try:
+            return await pdf_service.get_or_render(budget)
+        except pdf_service.PdfQueueFull as exc:
+            await asyncio.sleep(exc.retry_after)
+
+async def _run(db, job_id: str, query: Dict[str, Any]) -> None:
+    jobs = db[JOBS_COLLECTION]
+    total = await db.budgets.count_documents(query)
+    await jobs.update_one({"id": job_id}, {"$set": {
+        "status": "running", "total": total, "started_at": datetime.now(timezone.utc)
+    }})
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    final_path = archive_path(job_id)
+    partial_path = final_path.with_suffix(".zip.part")
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    done = failed = 0
+    last_report = time.monotonic()
+
+    async def render(budget):
+        async with semaphore:
+            return budget, await _render_with_retry(budget)
+
+    def write(archive, finished):
+        nonlocal done, failed
+        for task in finished:
+            try:
+                budget, path = task.result()
+                # PDFs are already compressed; storing avoids burning CPU on deflate
+                archive.write(path, arcname=pdf_filename(budget), compress_type=zipfile.ZIP_STORED)
+            except Exception:
+                # A render error, or a cached PDF evicted before it was copied
+                logger.exception("Falha ao gerar PDF na exportação %s", job_id)
+                failed += 1
+                continue
+            done += 1
+
+    with zipfile.ZipFile(partial_path, "w") as archive:
+        pending = set()
+        async for budget in db.budgets.find(query, {"_id": 0}).sort("created_at", 1):
+            pending.add(asyncio.ensure_future(render(budget)))
+            if len(pending) >= EXPORT_CONCURRENCY * 2:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                await asyncio.to_thread(write, archive, finished)
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await jobs.update_one({"id": job_id}, {"$set": {"done": done, "failed": failed}})
+        if pending:
+            finished, _ = await asyncio.wait(pending)
+            await asyncio.to_thread(write, archive, finished)
+
+    os.replace(partial_path, final_path)
+    await jobs.update_one({"id": job_id}, {"$set": {
+        "status": "done", "done": done, "failed": failed,
+        "size_bytes": final_path.stat().st_size, "finished_at": datetime.now(timezone.utc)
+    }})
+
+async def _run_guarded(db, job_id: str, query: Dict[str, Any]) -> None:
+    try:
+        await _run(db, job_id, query)
+    except asyncio.CancelledError:
+        await db[JOBS_COLLECTION].update_one({"id": job_id}, {"$set": {"status": "failed", "error": "cancelado"}})
+        raise
+    except Exception as exc:
+        logger.exception("Exportação %s falhou", job_id)
+        await db[JOBS_COLLECTION].update_one({"id": job_id}, {"$set": {"status": "failed", "error": str(exc)}})
+    finally:
+        _tasks.pop(job_id, None)
+
+async def start_export(db, query: Dict[str, Any], description: Dict[str, Any]) -> Dict[str, Any]:
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": "queued",
+        "filter": description,
+        "total": None,
+        "done": 0,
+        "failed": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+    await db[JOBS_COLLECTION].insert_one(dict(job))
+    _tasks[job['id']] = asyncio.create_task(_run_guarded(db, job['id'], query))
+    return job
+
+async def get_job(db, job_id: str) -> Optional[Dict[str, Any]]:
+    return await db[JOBS_COLLECTION].find_one({"id": job_id}, {"_id": 0})
+
+def cancel_all() -> None:
+    for task in list(_tasks.values()):
+        task.cancel()
@@ -0,0 +1,212 @@
+"""Response compression and conditional-request handling for the API.
+
+``HttpCacheMiddleware`` is a pure ASGI middleware, so streamed responses
+(NDJSON lists) are compressed chunk by chunk instead of being buffered:
+
+* JSON/NDJSON/text bodies of at least ``COMPRESS_MIN_SIZE`` bytes are
+  compressed with brotli (when the optional ``brotli`` package is installed
+  and the client accepts it) or gzip, with ``Vary: Accept-Encoding``.
+* Complete ``GET`` JSON bodies without an ETag get a strong one hashed from
+  the body; a matching ``If-None-Match`` then turns the response into a 304.
+* ``precheck`` may return the current ETag of a path without running the
+  route (e.g. from the in-memory catalog snapshot), so revalidations of
+  unchanged catalogs are answered with 304 without touching Mongo.
+
+Compressed representations carry the ETag with an ``-gzip``/``-br`` suffix,
+since a strong validator must differ between encodings; ``etag_matches``
+accepts either form.
+"""
+import gzip
+import hashlib
+import os
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+# Brotli's higher qualities cost far more CPU than they save on JSON
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+Headers = List[Tuple[bytes, bytes]]
+
+def _strip_suffix(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _strip_suffix(etag) in {_strip_suffix(tag) for tag in if_none_match.split(",")}
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        # Sync flush so every streamed chunk reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+def compress_body(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def _header(headers: Headers, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+def _without(headers: Headers, *names: bytes) -> Headers:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+def _add_vary(headers: Headers) -> Headers:
+    vary = _header(headers, b"vary")
+    if vary and "accept-encoding" in vary.lower():
+        return headers
+    value = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+    return _without(headers, b"vary") + [(b"vary", value.encode("latin-1"))]
+
+def _tag_with_encoding(etag: str, encoding: str) -> str:
+    return etag[:-1] + f'-{encoding}"' if etag.endswith('"') else etag
+
+class HttpCacheMiddleware:
+    def __init__(self, app, prefix: str = "/api", precheck: Optional[Callable[[str], Optional[str]]] = None,
+                 minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.prefix = prefix
+        self.precheck = precheck
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = scope["headers"]
+        method = scope["method"]
+        if_none_match = _header(request_headers, b"if-none-match")
+        encoding = choose_encoding(_header(request_headers, b"accept-encoding") or "") if method == "GET" else None
+
+        if if_none_match and method in ("GET", "HEAD") and self.precheck is not None:
+            current = self.precheck(scope["path"])
+            if current is not None and etag_matches(if_none_match, current):
+                await send({"type": "http.response.start", "status": 304, "headers": [
+                    (b"etag", current.encode("latin-1")),
+                    (b"cache-control", b"no-cache"),
+                    (b"vary", b"Accept-Encoding"),
+                ]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is not None:
+                chunk = encoder.compress(body) if body else b""
+                if not more_body:
+                    chunk += encoder.finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+
+            headers: Headers = list(start_message["headers"])
+            status = start_message["status"]
+            content_type = (_header(headers, b"content-type") or "").lower()
+            compressible = (status == 200 and content_type.startswith(COMPRESSIBLE_TYPES)
+                            and _header(headers, b"content-encoding") is None)
+            if not compressible:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            headers = _add_vary(headers)
+
+            if not more_body:
+                etag = _header(headers, b"etag")
+                if etag is None and method == "GET" and content_type.startswith("application/json"):
+                    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                    headers.append((b"etag", etag.encode("latin-1")))
+                if etag is not None and etag_matches(if_none_match, etag):
+                    headers = _without(headers, b"content-length", b"content-type")
+                    await send({"type": "http.response.start", "status": 304, "headers": headers})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                if encoding and len(body) >= self.minimum_size:
+                    body = compress_body(encoding, body)
+                    headers = _without(headers, b"content-length", b"etag") + [
+                        (b"content-encoding", encoding.encode()),
+                        (b"content-length", str(len(body)).encode()),
+                    ]
+                    if etag is not None:
+                        headers.append((b"etag", _tag_with_encoding(etag, encoding).encode("latin-1")))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            # Streamed body: size unknown up front, compress every chunk
+            if encoding:
+                encoder = _Encoder(encoding)
+                etag = _header(headers, b"etag")
+                headers = _without(headers, b"content-length", b"etag") + [(b"content-encoding", encoding.encode())]
+                if etag is not None:
+                    headers.append((b"etag", _tag_with_encoding(etag, encoding).encode("latin-1")))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": encoder.compress(body), "more_body": True})
+                return
+            passthrough = True
+            await send({**start_message, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,156 @@
+"""Declared MongoDB indexes and the reconciler that applies them at startup.
+
+Every lookup in ``server.py`` goes through the application-level ``id`` field
+and every list endpoint sorts on ``(created_at, id)``, so each collection
+declares the indexes those queries need here. ``ensure_indexes`` compares the
+declarations with what already exists, creates what is missing and never
+drops anything: an existing index that conflicts with a declaration is only
+reported, so an operator can decide what to do with it.
+"""
+import logging
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Collections whose documents are addressed by the app-level uuid ``id``
+ID_COLLECTIONS = (
+    "poles",
+    "conductors",
+    "equipment",
+    "budgets",
+    "medium_voltage_structures",
+    "low_voltage_structures",
+)
+
+LISTING_KEY = [("created_at", ASCENDING), ("id", ASCENDING)]
+
+def _declared_indexes() -> Dict[str, List[IndexModel]]:
+    indexes: Dict[str, List[IndexModel]] = {}
+    for name in ID_COLLECTIONS:
+        indexes[name] = [
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+            IndexModel(LISTING_KEY, name="created_at_id"),
+        ]
+    indexes["dropdown_options"] = [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("category", ASCENDING), ("value", ASCENDING)], name="category_value"),
+        IndexModel([("category", ASCENDING)] + LISTING_KEY, name="category_created_at_id"),
+    ]
+    # Bulk imports and seeders upsert catalog rows by their business code
+    for name in ("poles", "conductors", "equipment", "medium_voltage_structures", "low_voltage_structures"):
+        indexes[name].append(IndexModel([("code", ASCENDING)], name="code"))
+    # Budgets referencing a catalog item (material usage, targeted repricing)
+    indexes["budgets"].append(IndexModel([("items.item_id", ASCENDING)], name="items_item_id"))
+    indexes["budgets"].append(IndexModel(
+        [("project_name", TEXT), ("client_name", TEXT)], name="project_client_text", default_language="portuguese",
+    ))
+    indexes["material_usage"] = [
+        IndexModel([("code", ASCENDING), ("structure_code", ASCENDING)], name="code_structure_code"),
+        IndexModel([("structure_id", ASCENDING)], name="structure_id"),
+    ]
+    indexes["budget_revisions"] = [
+        IndexModel([("budget_id", ASCENDING), ("revision", ASCENDING)], name="budget_id_revision", unique=True),
+    ]
+    indexes["schema_migrations"] = [IndexModel([("version", ASCENDING)], name="version_unique", unique=True)]
+    return indexes
+
+INDEXES = _declared_indexes()
+
+# Options that change the behaviour of an index; two indexes on the same keys
+# that disagree on any of these are a conflict, not a match.
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "weights", "default_language")
+
+def _options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    options = {opt: spec[opt] for opt in _COMPARED_OPTIONS if spec.get(opt) not in (None, False)}
+    # Mongo reports the implicit weight of 1 for every text field
+    if all(weight == 1 for weight in options.get("weights", {}).values()):
+        options.pop("weights", None)
+    return options
+
+def _key(spec: Dict[str, Any]) -> List[tuple]:
+    key = spec["key"]
+    items = [(field, direction) for field, direction in (key.items() if isinstance(key, dict) else key)]
+    if ("_fts", TEXT) in items:
+        # Existing text indexes are keyed _fts/_ftsx, their fields are in weights
+        items = [item for item in items if item[0] not in ("_fts", "_ftsx")]
+        items += [(field, TEXT) for field in spec.get("weights", {})]
+    # Text field order is not significant
+    return [item for item in items if item[1] != TEXT] + sorted(item for item in items if item[1] == TEXT)
+
+def plan_collection(collection: str, declared: List[IndexModel], existing: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Compare declared indexes with ``index_information()`` output."""
+    plan = []
+    matched = set()
+    for model in declared:
+        spec = model.document
+        name, key, options = spec["name"], _key(spec), _options(spec)
+        entry = {"collection": collection, "index": name, "key": key}
+
+        same_key = next((n for n, info in existing.items() if _key(info) == key), None)
+        if same_key is not None:
+            matched.add(same_key)
+            current = _options(existing[same_key])
+            if current != options:
+                entry.update(action="conflict", detail=f"índice '{same_key}' existe com opções {current}, esperado {options}")
+            else:
+                entry.update(action="exists", detail=f"índice '{same_key}'")
+        elif name in existing:
+            matched.add(name)
+            entry.update(action="conflict", detail=f"índice '{name}' existe com chave {_key(existing[name])}")
+        else:
+            entry.update(action="create", detail=None)
+        plan.append(entry)
+
+    for name, info in existing.items():
+        if name == "_id_" or name in matched:
+            continue
+        plan.append({"collection": collection, "index": name, "key": _key(info), "action": "unmanaged", "detail": None})
+    return plan
+
+async def ensure_collection_indexes(collection, declared: List[IndexModel], dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Reconcile one collection with ``declared`` and return its report entries."""
+    existing = await collection.index_information()
+    plan = plan_collection(collection.name, declared, existing)
+
+    to_create = [model for model, entry in zip(declared, plan) if entry["action"] == "create"]
+    for entry in plan:
+        if entry["action"] == "conflict":
+            logger.warning("Conflito de índice em %s.%s: %s", collection.name, entry["index"], entry["detail"])
+
+    if to_create and not dry_run:
+        try:
+            await collection.create_indexes(to_create)
+        except OperationFailure as exc:
+            logger.warning("Falha ao criar índices em %s: %s", collection.name, exc)
+            for entry in plan:
+                if entry["action"] == "create":
+                    entry.update(action="failed", detail=str(exc))
+        else:
+            for entry in plan:
+                if entry["action"] == "create":
+                    entry["action"] = "created"
+    return plan
+
+async def ensure_indexes(db, dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Create missing declared indexes and return a report of every decision.
+
+    With ``dry_run=True`` nothing is written; the report shows what would be
+    created. Conflicts are logged as warnings and left untouched.
+    """
+    report = []
+    for collection, declared in INDEXES.items():
+        report.extend(await ensure_collection_indexes(db[collection], declared, dry_run))
+    return report
+
+def format_report(report: List[Dict[str, Any]]) -> str:
+    lines = []
+    for entry in report:
+        key = ", ".join(f"{field}:{direction}" for field, direction in entry["key"])
+        line = f"{entry['action']:<10} {entry['collection']}.{entry['index']} ({key})"
+        if entry["detail"]:
+            line += f" - {entry['detail']}"
+        lines.append(line)
+    return "\n".join(lines)
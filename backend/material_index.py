@@ -0,0 +1,111 @@
+"""Reverse index from ``StructureMaterial.code`` to the structures using it.
+
+The ``material_usage`` collection holds one document per (structure,
+material code) pair and is kept up to date by the structure write handlers,
+so "which structures and budgets use this material?" is an indexed lookup
+proportional to the number of hits instead of a scan of every structure's
+embedded ``materials`` array.
+"""
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+USAGE_COLLECTION = "material_usage"
+STRUCTURE_COLLECTIONS = ("medium_voltage_structures", "low_voltage_structures")
+INSERT_BATCH_SIZE = 1000
+
+def usage_entries(collection: str, structure: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One entry per material code; repeated codes in a structure are summed."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    for material in structure.get('materials', []):
+        entry = entries.get(material['code'])
+        if entry is None:
+            entries[material['code']] = {
+                "code": material['code'],
+                "description": material['description'],
+                "unit": material['unit'],
+                "quantity": material['quantity'],
+                "unit_price": material['unit_price'],
+                "structure_collection": collection,
+                "structure_id": structure['id'],
+                "structure_code": structure['code'],
+            }
+        else:
+            entry['quantity'] += material['quantity']
+    return list(entries.values())
+
+async def index_structure(db, collection: str, structure: Dict[str, Any]) -> None:
+    await db[USAGE_COLLECTION].delete_many({"structure_id": structure['id']})
+    entries = usage_entries(collection, structure)
+    if entries:
+        await db[USAGE_COLLECTION].insert_many(entries, ordered=False)
+
+async def index_structures(db, collection: str, structures: List[Dict[str, Any]]) -> None:
+    """Batch form of ``index_structure`` for bulk imports."""
+    if not structures:
+        return
+    await db[USAGE_COLLECTION].delete_many({"structure_id": {"$in": [s['id'] for s in structures]}})
+    entries = [entry for structure in structures for entry in usage_entries(collection, structure)]
+    for start in range(0, len(entries), INSERT_BATCH_SIZE):
+        await db[USAGE_COLLECTION].insert_many(entries[start:start + INSERT_BATCH_SIZE], ordered=False)
+
+async def remove_structure(db, structure_id: str) -> None:
+    await db[USAGE_COLLECTION].delete_many({"structure_id": structure_id})
+
+async def rebuild(db) -> int:
+    """Recreate the whole index from the structure collections."""
+    await db[USAGE_COLLECTION].delete_many({})
+    total = 0
+    for collection in STRUCTURE_COLLECTIONS:
+        batch = []
+        async for structure in db[collection].find({}, {"_id": 0, "id": 1, "code": 1, "materials": 1}):
+            batch.extend(usage_entries(collection, structure))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                await db[USAGE_COLLECTION].insert_many(batch, ordered=False)
+                total += len(batch)
+                batch = []
+        if batch:
+            await db[USAGE_COLLECTION].insert_many(batch, ordered=False)
+            total += len(batch)
+    return total
+
+async def rebuild_if_empty(db) -> None:
+    if await db[USAGE_COLLECTION].find_one({}, {"_id": 1}):
+        return
+    for collection in STRUCTURE_COLLECTIONS:
+        if await db[collection].find_one({}, {"_id": 1}):
+            total = await rebuild(db)
+            logger.info("Índice de materiais reconstruído: %d entradas", total)
+            return
+
+async def structures_using(db, codes: List[str]) -> Dict[str, List[str]]:
+    """Structure ids per collection that contain any of ``codes``."""
+    found: Dict[str, Dict[str, None]] = {name: {} for name in STRUCTURE_COLLECTIONS}
+    projection = {"_id": 0, "structure_collection": 1, "structure_id": 1}
+    async for entry in db[USAGE_COLLECTION].find({"code": {"$in": codes}}, projection):
+        found[entry['structure_collection']][entry['structure_id']] = None
+    return {name: list(ids) for name, ids in found.items()}
+
+async def material_usage(db, code: str) -> Dict[str, Any]:
+    structures = await db[USAGE_COLLECTION].find({"code": code}, {"_id": 0, "code": 0}).sort("structure_code", 1).to_list(None)
+    structure_ids = [entry['structure_id'] for entry in structures]
+
+    budgets = []
+    if structure_ids:
+        per_structure = {entry['structure_id']: entry['quantity'] for entry in structures}
+        projection = {"_id": 0, "id": 1, "project_name": 1, "client_name": 1, "total": 1, "items.item_id": 1, "items.quantity": 1}
+        async for budget in db.budgets.find({"items.item_id": {"$in": structure_ids}}, projection):
+            material_quantity = sum(
+                item['quantity'] * per_structure[item['item_id']]
+                for item in budget['items'] if item['item_id'] in per_structure
+            )
+            budgets.append({
+                "id": budget['id'],
+                "project_name": budget['project_name'],
+                "client_name": budget['client_name'],
+                "total": budget['total'],
+                "material_quantity": material_quantity,
+            })
+
+    return {"code": code, "structures": structures, "budgets": budgets}
@@ -0,0 +1,200 @@
+"""Versioned, resumable data migrations.
+
+A migration walks the documents of one collection that match its query in
+``_id`` order, computes a ``$set`` for each one and writes the updates in
+unordered ``bulk_write`` batches. After every batch the last processed
+``_id`` is checkpointed in ``schema_migrations``, so an interrupted run
+resumes where it stopped, and an applied migration is not run again unless
+it is ``repeatable``: those are re-checked on every run because old writers
+(seed scripts, restored dumps) can bring back the data they convert.
+Only the changed fields are sent, so the app can keep serving while a
+migration runs on a large collection.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+DEFAULT_BATCH_SIZE = 1000
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    description: str
+    collection: str
+    query: Dict[str, Any]
+    # Returns the fields to ``$set`` on the document, or None to leave it
+    transform: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    projection: Optional[Dict[str, Any]] = None
+    # Re-run from the start after being applied, whenever the query matches again
+    repeatable: bool = False
+
+@dataclass
+class MigrationResult:
+    version: str
+    status: str
+    processed: int = 0
+    modified: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.version}: {self.status}, {self.processed} documentos lidos, "
+                f"{self.modified} alterados em {self.elapsed:.1f}s ({self.throughput:.0f} docs/s)")
+
+def _budget_bdi_fields(budget: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Budgets created before BDI existed
+    return {"bdi_percentage": 0.0, "bdi_value": 0.0}
+
+# Timestamps written as ISO strings before dates were stored as BSON dates
+STRING_DATE_FIELDS = {
+    "poles": ("created_at",),
+    "conductors": ("created_at",),
+    "equipment": ("created_at",),
+    "medium_voltage_structures": ("created_at",),
+    "low_voltage_structures": ("created_at",),
+    "dropdown_options": ("created_at",),
+    "budgets": ("created_at", "updated_at"),
+    "budget_revisions": ("doc.created_at",),
+}
+
+def _dotted(doc: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _string_dates_to_bson(fields):
+    def transform(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        changes = {field: _parse_timestamp(_dotted(doc, field)) for field in fields
+                   if isinstance(_dotted(doc, field), str)}
+        return changes or None
+    return transform
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version="0001",
+        description="Adiciona bdi_percentage e bdi_value aos orçamentos antigos",
+        collection="budgets",
+        query={"bdi_percentage": {"$exists": False}},
+        transform=_budget_bdi_fields,
+        projection={"_id": 1},
+    ),
+] + [
+    Migration(
+        version=f"0002-{collection}",
+        description=f"Converte datas em texto para datas BSON em {collection}",
+        collection=collection,
+        query={"$or": [{field: {"$type": "string"}} for field in fields]},
+        transform=_string_dates_to_bson(fields),
+        projection={field: 1 for field in fields},
+        repeatable=True,
+    )
+    for collection, fields in STRING_DATE_FIELDS.items()
+]
+
+async def applied_versions(db) -> Dict[str, Dict[str, Any]]:
+    records = await db[MIGRATIONS_COLLECTION].find({}, {"_id": 0}).to_list(None)
+    return {record['version']: record for record in records}
+
+async def pending(db) -> List[Migration]:
+    records = await applied_versions(db)
+    return [m for m in MIGRATIONS if m.repeatable or records.get(m.version, {}).get('status') != "applied"]
+
+async def outstanding(db) -> List[Migration]:
+    """Pending migrations that still match documents.
+
+    A pending migration with nothing left to convert (e.g. on a fresh
+    database) does not count; an applied repeatable one counts again as soon
+    as a document matches its query.
+    """
+    return [m for m in await pending(db) if await db[m.collection].find_one(m.query, {"_id": 1})]
+
+async def run_migration(db, migration: Migration, batch_size: int = DEFAULT_BATCH_SIZE,
+                        pause: float = 0.0, dry_run: bool = False) -> MigrationResult:
+    """Run (or resume) one migration.
+
+    ``pause`` sleeps between batches to leave room for production traffic.
+    With ``dry_run`` only the number of documents left to process is counted.
+    """
+    records = db[MIGRATIONS_COLLECTION]
+    record = await records.find_one({"version": migration.version}) or {}
+    restart = {}
+    if record.get('status') == "applied":
+        if not migration.repeatable:
+            return MigrationResult(migration.version, "applied")
+        # Matching documents may sit before the old checkpoint, so start over
+        record, restart = {}, {"last_id": None}
+
+    query = dict(migration.query)
+    if record.get('last_id') is not None:
+        query = {"$and": [migration.query, {"_id": {"$gt": record['last_id']}}]}
+    collection = db[migration.collection]
+    if dry_run:
+        remaining = await collection.count_documents(query)
+        return MigrationResult(migration.version, "pending", processed=remaining)
+
+    now = datetime.now(timezone.utc)
+    await records.update_one({"version": migration.version}, {
+        "$set": {"status": "running", "description": migration.description, "resumed_at": now, **restart},
+        "$setOnInsert": {"started_at": now, "processed": 0, "modified": 0, "last_id": None},
+    }, upsert=True)
+
+    result = MigrationResult(migration.version, "running")
+    started = time.perf_counter()
+
+    async def flush(ops: List[UpdateOne], last_id: Any, count: int) -> None:
+        modified = 0
+        if ops:
+            modified = (await collection.bulk_write(ops, ordered=False)).modified_count
+        result.processed += count
+        result.modified += modified
+        await records.update_one({"version": migration.version}, {
+            "$set": {"last_id": last_id},
+            "$inc": {"processed": count, "modified": modified},
+        })
+        result.elapsed = time.perf_counter() - started
+        logger.info(result.summary())
+
+    ops: List[UpdateOne] = []
+    count, last_id = 0, None
+    cursor = collection.find(query, migration.projection).sort("_id", 1).batch_size(batch_size)
+    async for doc in cursor:
+        changes = migration.transform(doc)
+        if changes:
+            ops.append(UpdateOne({"_id": doc['_id']}, {"$set": changes}))
+        count, last_id = count + 1, doc['_id']
+        if count >= batch_size:
+            await flush(ops, last_id, count)
+            ops, count = [], 0
+            if pause:
+                await asyncio.sleep(pause)
+    if count:
+        await flush(ops, last_id, count)
+
+    result.elapsed = time.perf_counter() - started
+    result.status = "applied"
+    await records.update_one({"version": migration.version}, {"$set": {
+        "status": "applied", "finished_at": datetime.now(timezone.utc),
+    }})
+    return result
+
+async def migrate(db, batch_size: int = DEFAULT_BATCH_SIZE, pause: float = 0.0,
+                  dry_run: bool = False) -> List[MigrationResult]:
+    """Run every pending migration in version order."""
+    return [await run_migration(db, migration, batch_size, pause, dry_run) for migration in await pending(db)]
@@ -0,0 +1,47 @@
+"""Motor connection pool settings, warm-up and the latency probe.
+
+Pool sizing and timeouts come from the environment so each deployment can
+size them for its worker count without code changes:
+
+``MONGO_MAX_POOL_SIZE``, ``MONGO_MIN_POOL_SIZE``, ``MONGO_MAX_IDLE_TIME_MS``,
+``MONGO_CONNECT_TIMEOUT_MS``, ``MONGO_SERVER_SELECTION_TIMEOUT_MS`` and
+``MONGO_SOCKET_TIMEOUT_MS``. Unset values keep pymongo's defaults.
+
+``warm_up`` opens connections before the worker takes traffic, so the first
+requests do not pay the TCP/TLS/auth handshakes.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+# env var -> pymongo option
+POOL_SETTINGS = {
+    'MONGO_MAX_POOL_SIZE': "maxPoolSize",
+    'MONGO_MIN_POOL_SIZE': "minPoolSize",
+    'MONGO_MAX_IDLE_TIME_MS': "maxIdleTimeMS",
+    'MONGO_CONNECT_TIMEOUT_MS': "connectTimeoutMS",
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': "serverSelectionTimeoutMS",
+    'MONGO_SOCKET_TIMEOUT_MS': "socketTimeoutMS",
+}
+
+def client_options() -> Dict[str, Any]:
+    return {option: int(os.environ[env]) for env, option in POOL_SETTINGS.items() if os.environ.get(env)}
+
+def warm_connection_count(options: Dict[str, Any]) -> int:
+    default = options.get("minPoolSize") or 4
+    return int(os.environ.get('MONGO_WARM_CONNECTIONS', default))
+
+async def ping(db, timeout: float) -> float:
+    """Round trip of a ``ping`` command in milliseconds; raises on failure or timeout."""
+    started = time.perf_counter()
+    await asyncio.wait_for(db.command("ping"), timeout)
+    return (time.perf_counter() - started) * 1000
+
+async def warm_up(db, connections: int, timeout: float = 10.0) -> float:
+    """Open ``connections`` pool connections with concurrent pings; returns the slowest ping."""
+    if connections <= 0:
+        return 0.0
+    # Concurrent commands each check out their own connection
+    latencies = await asyncio.gather(*(ping(db, timeout) for _ in range(connections)))
+    return max(latencies)
@@ -0,0 +1,195 @@
+"""ReportLab rendering of a budget as PDF.
+
+Kept apart from ``server.py`` so it can run inside the PDF worker processes
+(see ``pdf_service``); ``render_budget_pdf`` takes the stored budget document
+and returns the finished PDF bytes.
+"""
+import io
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.enums import TA_CENTER
+
+@lru_cache(maxsize=None)
+def get_styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles, built once per process and shared by every render."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#1e3a8a'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#334155'),
+            spaceAfter=12,
+            spaceBefore=12
+        ),
+        'normal': styles['Normal'],
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        ),
+    }
+
+@lru_cache(maxsize=None)
+def get_table_styles() -> Dict[str, TableStyle]:
+    """Table styles, built once per process; a TableStyle is not modified by setStyle."""
+    return {
+        'info': TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+        ]),
+        'items': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (2, 1), (2, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')])
+        ]),
+        'summary': TableStyle([
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (0, -2), 'Helvetica'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -2), 10),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#2563eb')),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#2563eb')),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#eff6ff'))
+        ]),
+    }
+
+def warm_up() -> None:
+    """Process pool initializer: build the styles before the first job."""
+    get_styles()
+    get_table_styles()
+
+def render_budget_pdf(budget: Dict[str, Any]) -> bytes:
+    created_at = budget['created_at']
+
+    # Create PDF in memory
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
+    
+    # Container for the 'Flowable' objects
+    elements = []
+    
+    # Define styles
+    styles = get_styles()
+    title_style = styles['title']
+    heading_style = styles['heading']
+    normal_style = styles['normal']
+    table_styles = get_table_styles()
+    
+    # Title
+    elements.append(Paragraph("ORÇAMENTO", title_style))
+    elements.append(Paragraph(f"Sistema de Orçamentação - Estruturas de Média Tensão", normal_style))
+    elements.append(Spacer(1, 0.5*cm))
+    
+    # Project Info
+    elements.append(Paragraph("INFORMAÇÕES DO PROJETO", heading_style))
+    
+    info_data = [
+        ['Projeto:', budget['project_name']],
+        ['Cliente:', budget['client_name']],
+        ['Data:', created_at.strftime('%d/%m/%Y %H:%M')],
+        ['Orçamento Nº:', budget['id'][:8].upper()]
+    ]
+    
+    info_table = Table(info_data, colWidths=[4*cm, 13*cm])
+    info_table.setStyle(table_styles['info'])
+    
+    elements.append(info_table)
+    elements.append(Spacer(1, 0.8*cm))
+    
+    # Items Table
+    elements.append(Paragraph("LISTA DE MATERIAIS E SERVIÇOS", heading_style))
+    
+    items_data = [['Item', 'Código', 'Descrição', 'Qtd', 'Preço Unit.', 'Total']]
+    
+    for idx, item in enumerate(budget['items'], 1):
+        items_data.append([
+            str(idx),
+            item['code'],
+            item['description'][:40] + '...' if len(item['description']) > 40 else item['description'],
+            str(item['quantity']),
+            f"R$ {item['unit_price']:.2f}",
+            f"R$ {item['total_price']:.2f}"
+        ])
+    
+    items_table = Table(items_data, colWidths=[1*cm, 2.5*cm, 7*cm, 1.5*cm, 2.5*cm, 2.5*cm])
+    items_table.setStyle(table_styles['items'])
+    
+    elements.append(items_table)
+    elements.append(Spacer(1, 0.5*cm))
+    
+    # Summary Table
+    elements.append(Paragraph("RESUMO FINANCEIRO", heading_style))
+    
+    summary_data = [
+        ['Subtotal (Materiais):', f"R$ {budget['subtotal']:.2f}"],
+        ['Mão de Obra:', f"R$ {budget['labor_cost']:.2f}"],
+        ['Serviços Adicionais:', f"R$ {budget['additional_services']:.2f}"],
+    ]
+    
+    subtotal_with_services = budget['subtotal'] + budget['labor_cost'] + budget['additional_services']
+    summary_data.append(['Subtotal com Serviços:', f"R$ {subtotal_with_services:.2f}"])
+    
+    if budget.get('bdi_percentage', 0) > 0:
+        summary_data.append([f"BDI ({budget['bdi_percentage']:.2f}%):", f"R$ {budget['bdi_value']:.2f}"])
+    
+    summary_data.append(['', ''])  # Empty row
+    summary_data.append(['TOTAL:', f"R$ {budget['total']:.2f}"])
+    
+    summary_table = Table(summary_data, colWidths=[13*cm, 4*cm])
+    summary_table.setStyle(table_styles['summary'])
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.5*cm))
+    
+    # Notes
+    if budget.get('notes'):
+        elements.append(Paragraph("OBSERVAÇÕES", heading_style))
+        elements.append(Paragraph(budget['notes'], normal_style))
+        elements.append(Spacer(1, 0.5*cm))
+    
+    # Footer
+    elements.append(Spacer(1, 1*cm))
+    footer_style = styles['footer']
+    elements.append(Paragraph("Documento gerado automaticamente pelo Sistema de Orçamentação", footer_style))
+    elements.append(Paragraph(f"Data de geração: {datetime.now(timezone.utc).strftime('%d/%m/%Y %H:%M')}", footer_style))
+    
+    # Build PDF
+    doc.build(elements)
+    
+    return buffer.getvalue()
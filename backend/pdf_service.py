@@ -0,0 +1,132 @@
+"""Budget PDF rendering off the event loop, with a content-addressed disk cache.
+
+ReportLab is CPU bound, so ``doc.build`` runs in a bounded
+``ProcessPoolExecutor`` instead of inside the request handler. Rendered PDFs
+are stored under ``PDF_CACHE_DIR`` named by a hash of the budget content, so a
+repeat download of an unchanged budget is served straight from disk.
+Concurrent requests for the same budget share one render, and once
+``PDF_MAX_PENDING`` renders are queued new ones are refused with
+``PdfQueueFull`` (mapped to 429 + Retry-After by the route).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout changes so cached files are not reused
+RENDER_VERSION = "1"
+
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+PDF_MAX_PENDING = int(os.environ.get('PDF_MAX_PENDING', PDF_WORKERS * 4))
+PDF_CACHE_DIR = Path(os.environ.get('PDF_CACHE_DIR', Path(__file__).parent / 'pdf_cache'))
+PDF_CACHE_MAX_FILES = int(os.environ.get('PDF_CACHE_MAX_FILES', 5000))
+# Seconds a client is told to wait per queued render ahead of it
+RETRY_AFTER_PER_RENDER = 2
+
+class PdfQueueFull(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"PDF queue full, retry after {retry_after}s")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def content_hash(budget: Dict[str, Any]) -> str:
+    canonical = json.dumps(budget, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(f"{RENDER_VERSION}:{canonical}".encode()).hexdigest()
+
+def cache_path(digest: str) -> Path:
+    return PDF_CACHE_DIR / f"{digest}.pdf"
+
+# ReportLab is imported only inside the pool processes, so the API worker
+# never pays for it; these run in the pool, not in the caller
+def _warm_up_worker() -> None:
+    from pdf_render import warm_up
+    warm_up()
+
+def _render_in_worker(budget: Dict[str, Any]) -> bytes:
+    from pdf_render import render_budget_pdf
+    return render_budget_pdf(budget)
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that holds the event loop and Motor's
+        # threads is not safe
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up_worker,
+        )
+    return _executor
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _store(digest: str, content: bytes) -> Path:
+    PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = cache_path(digest)
+    fd, tmp = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    _prune()
+    return path
+
+def _prune() -> None:
+    files = list(PDF_CACHE_DIR.glob("*.pdf"))
+    if len(files) <= PDF_CACHE_MAX_FILES:
+        return
+    files.sort(key=lambda f: f.stat().st_mtime)
+    for f in files[:len(files) - PDF_CACHE_MAX_FILES]:
+        f.unlink(missing_ok=True)
+
+async def _render(budget: Dict[str, Any], digest: str) -> Path:
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    content = await loop.run_in_executor(get_executor(), _render_in_worker, budget)
+    metrics.PDF_RENDER_SECONDS.observe(time.perf_counter() - started)
+    return await loop.run_in_executor(None, _store, digest, content)
+
+async def get_or_render(budget: Dict[str, Any], digest: Optional[str] = None) -> Path:
+    """Path of the cached PDF for ``budget``, rendering it if needed."""
+    digest = digest or content_hash(budget)
+    path = cache_path(digest)
+    if path.exists():
+        os.utime(path)
+        metrics.CACHE_REQUESTS.inc("pdf", "hit")
+        return path
+
+    pending = _inflight.get(digest)
+    if pending is not None:
+        metrics.CACHE_REQUESTS.inc("pdf", "shared")
+    else:
+        if len(_inflight) >= PDF_MAX_PENDING:
+            queued_per_worker = len(_inflight) // PDF_WORKERS + 1
+            raise PdfQueueFull(retry_after=queued_per_worker * RETRY_AFTER_PER_RENDER)
+        metrics.CACHE_REQUESTS.inc("pdf", "miss")
+        pending = asyncio.ensure_future(_render(budget, digest))
+        _inflight[digest] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(digest, None))
+    # shield: a client disconnecting must not cancel a render others wait on
+    return await asyncio.shield(pending)
@@ -0,0 +1,145 @@
+"""Server-side budget pricing.
+
+Budget lines only name a catalog item (``item_type``/``item_id``) and a
+quantity; unit prices, codes and descriptions are resolved here from the
+catalog, either from the in-process ``CatalogCache`` or with one batched
+``$in`` query per collection. All money arithmetic uses ``Decimal`` rounded
+half-up to cents, so totals do not drift with float error on large budgets.
+"""
+import asyncio
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CENTS = Decimal("0.01")
+
+def to_money(value: Any) -> Decimal:
+    return Decimal(str(value)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def _describe_pole(doc: Dict[str, Any]) -> str:
+    return f"Poste {doc['type']} {doc['height']:g}m {doc['capacity']} daN"
+
+def _describe_conductor(doc: Dict[str, Any]) -> str:
+    return f"Condutor {doc['type']} {doc['section']} {doc['insulation']} {doc['configuration']}"
+
+@dataclass(frozen=True)
+class ItemSource:
+    collection: str
+    price_field: str
+    describe: Callable[[Dict[str, Any]], str]
+
+ITEM_SOURCES = {
+    "poles": ItemSource("poles", "unit_price", _describe_pole),
+    "conductors": ItemSource("conductors", "unit_price", _describe_conductor),
+    "equipment": ItemSource("equipment", "unit_price", lambda doc: doc['description']),
+    "medium_voltage_structures": ItemSource("medium_voltage_structures", "total_price", lambda doc: doc['description']),
+    "low_voltage_structures": ItemSource("low_voltage_structures", "total_price", lambda doc: doc['description']),
+}
+
+# The frontend stores the collection name as item_type, the BudgetItem model
+# documents the singular form; both are accepted.
+ITEM_TYPE_ALIASES = {
+    "pole": "poles",
+    "conductor": "conductors",
+    "medium_voltage_structure": "medium_voltage_structures",
+    "low_voltage_structure": "low_voltage_structures",
+}
+
+def item_source(item_type: str) -> Optional[ItemSource]:
+    return ITEM_SOURCES.get(ITEM_TYPE_ALIASES.get(item_type, item_type))
+
+@dataclass(frozen=True)
+class CatalogPrice:
+    code: str
+    description: str
+    unit_price: Decimal
+
+class PricingError(ValueError):
+    def __init__(self, missing: List[Tuple[str, str]]):
+        self.missing = missing
+        shown = ", ".join(f"{item_type}/{item_id}" for item_type, item_id in missing[:20])
+        more = f" (+{len(missing) - 20})" if len(missing) > 20 else ""
+        super().__init__(f"Itens não encontrados no catálogo: {shown}{more}")
+
+def _catalog_price(source: ItemSource, doc: Dict[str, Any]) -> CatalogPrice:
+    return CatalogPrice(doc['code'], source.describe(doc), to_money(doc[source.price_field]))
+
+async def _fetch_prices(db, source: ItemSource, ids: List[str], cache=None) -> Dict[str, CatalogPrice]:
+    if cache is not None and source.collection in cache.collections:
+        snapshot = await cache.get(source.collection)
+        found = (snapshot.by_id.get(item_id) for item_id in ids)
+        return {item.id: _catalog_price(source, item.model_dump()) for item in found if item is not None}
+
+    projection = {"_id": 0, "id": 1, "code": 1, "description": 1, "type": 1, "height": 1, "capacity": 1,
+                  "section": 1, "insulation": 1, "configuration": 1, source.price_field: 1}
+    docs = await db[source.collection].find({"id": {"$in": ids}}, projection).to_list(None)
+    return {doc['id']: _catalog_price(source, doc) for doc in docs}
+
+async def resolve_prices(db, lines: Iterable[Tuple[str, str]], cache=None) -> Dict[Tuple[str, str], CatalogPrice]:
+    """Resolve ``(item_type, item_id)`` pairs to catalog prices.
+
+    Issues at most one query per collection, all concurrently. Raises
+    ``PricingError`` listing every pair that is unknown or missing.
+    """
+    wanted: Dict[str, set] = {}
+    missing = []
+    for item_type, item_id in lines:
+        source = item_source(item_type)
+        if source is None:
+            missing.append((item_type, item_id))
+        else:
+            wanted.setdefault(source.collection, set()).add(item_id)
+
+    collections = list(wanted)
+    results = await asyncio.gather(*(
+        _fetch_prices(db, ITEM_SOURCES[name], sorted(wanted[name]), cache) for name in collections
+    ))
+    found = dict(zip(collections, results))
+
+    prices = {}
+    for item_type, item_id in lines:
+        source = item_source(item_type)
+        if source is None:
+            continue
+        price = found[source.collection].get(item_id)
+        if price is None:
+            missing.append((item_type, item_id))
+        else:
+            prices[(item_type, item_id)] = price
+    if missing:
+        raise PricingError(missing)
+    return prices
+
+@dataclass(frozen=True)
+class BudgetTotals:
+    subtotal: Decimal
+    bdi_value: Decimal
+    total: Decimal
+
+def compute_totals(item_totals: Iterable[Any], labor_cost: Any, additional_services: Any, bdi_percentage: Any) -> BudgetTotals:
+    """Subtotal, BDI and total exactly as the budget screen presents them."""
+    subtotal = sum((to_money(value) for value in item_totals), Decimal("0.00"))
+    subtotal_with_services = subtotal + to_money(labor_cost) + to_money(additional_services)
+    bdi_value = to_money(subtotal_with_services * Decimal(str(bdi_percentage)) / 100)
+    return BudgetTotals(subtotal, bdi_value, subtotal_with_services + bdi_value)
+
+async def price_lines(db, lines: List[Dict[str, Any]], cache=None) -> List[Dict[str, Any]]:
+    """Turn ``{item_type, item_id, quantity}`` lines into priced BudgetItem dicts."""
+    lines = list(lines)
+    prices = await resolve_prices(db, [(line['item_type'], line['item_id']) for line in lines], cache)
+    items = []
+    for line in lines:
+        price = prices[(line['item_type'], line['item_id'])]
+        quantity = Decimal(str(line['quantity']))
+        items.append({
+            "item_id": line['item_id'],
+            # Stored under the collection name whichever alias the client sent,
+            # so grouping by item_type does not split one catalog item
+            "item_type": item_source(line['item_type']).collection,
+            "code": price.code,
+            "description": price.description,
+            "quantity": line['quantity'],
+            "unit_price": float(price.unit_price),
+            "total_price": float(to_money(quantity * price.unit_price)),
+        })
+    return items
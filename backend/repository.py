@@ -0,0 +1,213 @@
+"""Generic data access for the collections addressed by the app-level ``id``.
+
+A ``Repository`` wraps one collection and its Pydantic model and owns the
+steps every CRUD handler used to repeat: building the stored document from
+the create payload, writing it, invalidating the catalog cache, running the
+side-effect hooks (material index, revision history), projecting and
+paginating list cursors and timing each operation. ``server.py`` generates
+the routes from it and sends every other write (budget updates, bulk
+imports) through it too, so a change here reaches every collection at once.
+"""
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+import bulk_import
+from catalog_cache import CatalogCache, CatalogSnapshot
+from indexes import INDEXES, ensure_collection_indexes
+
+logger = logging.getLogger(__name__)
+
+# Lists are read in (created_at, id) order, served by each collection's
+# created_at_id index
+LIST_SORT = [("created_at", 1), ("id", 1)]
+STREAM_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 1000
+SLOW_OPERATION_SECONDS = float(os.environ.get('SLOW_OPERATION_SECONDS', 0.5))
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Called with (collection, operation, seconds) after every repository operation
+_observers: List[Callable[[str, str, float], None]] = []
+
+def add_observer(observer: Callable[[str, str, float], None]) -> None:
+    _observers.append(observer)
+
+class DocumentNotFound(Exception):
+    pass
+
+class Repository(Generic[ModelT]):
+    def __init__(
+        self,
+        db,
+        name: str,
+        model: Type[ModelT],
+        cache: Optional[CatalogCache] = None,
+        # Fields derived from the create payload (e.g. a structure's total_price)
+        prepare: Optional[Callable[[BaseModel], Dict[str, Any]]] = None,
+        on_saved: Optional[Callable[[Any, str, Dict[str, Any]], Awaitable[None]]] = None,
+        # Batch form of ``on_saved`` for insert_many and bulk_upsert
+        on_saved_many: Optional[Callable[[Any, str, List[Dict[str, Any]]], Awaitable[None]]] = None,
+        on_deleted: Optional[Callable[[Any, str], Awaitable[None]]] = None,
+    ):
+        self.db = db
+        self.name = name
+        self.model = model
+        self.cache = cache if cache is not None and name in cache.collections else None
+        self.prepare = prepare
+        self.on_saved = on_saved
+        self.on_saved_many = on_saved_many
+        self.on_deleted = on_deleted
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    @property
+    def indexes(self):
+        return INDEXES.get(self.name, [])
+
+    async def ensure_indexes(self, dry_run: bool = False) -> List[Dict[str, Any]]:
+        return await ensure_collection_indexes(self.collection, self.indexes, dry_run)
+
+    @asynccontextmanager
+    async def _timed(self, operation: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= SLOW_OPERATION_SECONDS:
+                logger.warning("%s.%s levou %.3fs", self.name, operation, elapsed)
+            for observer in _observers:
+                observer(self.name, operation, elapsed)
+
+    def build(self, payload: BaseModel, **fields: Any) -> ModelT:
+        data = payload.model_dump()
+        if self.prepare is not None:
+            data.update(self.prepare(payload))
+        return self.model(**data, **fields)
+
+    async def _saved(self, doc: Dict[str, Any]) -> None:
+        if self.on_saved is not None:
+            await self.on_saved(self.db, self.name, doc)
+        if self.cache is not None:
+            self.cache.invalidate(self.name)
+
+    async def _saved_many(self, docs: List[Dict[str, Any]]) -> None:
+        if self.on_saved_many is not None:
+            await self.on_saved_many(self.db, self.name, docs)
+        elif self.on_saved is not None:
+            for doc in docs:
+                await self.on_saved(self.db, self.name, doc)
+        if self.cache is not None:
+            self.cache.invalidate(self.name)
+
+    async def insert(self, obj: ModelT) -> ModelT:
+        doc = obj.model_dump()
+        async with self._timed("insert"):
+            await self.collection.insert_one(doc)
+        await self._saved(doc)
+        return obj
+
+    async def insert_many(self, objs: List[ModelT], batch_size: int = INSERT_BATCH_SIZE) -> int:
+        docs = [obj.model_dump() for obj in objs]
+        async with self._timed("insert_many"):
+            for start in range(0, len(docs), batch_size):
+                await self.collection.insert_many(docs[start:start + batch_size], ordered=False)
+        await self._saved_many(docs)
+        return len(docs)
+
+    async def bulk_upsert(self, rows, create_model: Type[BaseModel]) -> bulk_import.ImportReport:
+        """Upsert parsed import rows by ``code``; see ``bulk_import.bulk_upsert``."""
+        def document(payload: BaseModel) -> Dict[str, Any]:
+            return {**payload.model_dump(), **(self.prepare(payload) if self.prepare is not None else {})}
+
+        async with self._timed("bulk_upsert"):
+            report = await bulk_import.bulk_upsert(self.collection, rows, create_model, document)
+        if report.upserted_codes and (self.on_saved is not None or self.on_saved_many is not None):
+            # The hooks need the stored documents (ids of new rows included)
+            for start in range(0, len(report.upserted_codes), INSERT_BATCH_SIZE):
+                codes = report.upserted_codes[start:start + INSERT_BATCH_SIZE]
+                docs = await self.collection.find({"code": {"$in": codes}}, {"_id": 0}).to_list(None)
+                await self._saved_many(docs)
+        elif report.upserted_codes and self.cache is not None:
+            self.cache.invalidate(self.name)
+        return report
+
+    async def create(self, payload: BaseModel) -> ModelT:
+        return await self.insert(self.build(payload))
+
+    async def replace(self, doc_id: str, payload: BaseModel) -> ModelT:
+        """Overwrite the content of ``doc_id``, keeping its ``created_at``.
+
+        ``created_at`` is the list order key, so a fresh one would move the
+        row between pages of a keyset pagination in progress.
+        """
+        fields = self.build(payload, id=doc_id).model_dump(exclude={"created_at"})
+        async with self._timed("replace"):
+            doc = await self.collection.find_one_and_update(
+                {"id": doc_id}, {"$set": fields}, projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+            )
+        if doc is None:
+            raise DocumentNotFound(doc_id)
+        await self._saved(doc)
+        return self.model.model_validate(doc)
+
+    async def replace_document(self, doc: Dict[str, Any], guard: Optional[Dict[str, Any]] = None) -> None:
+        """Store ``doc`` as is under its ``id``.
+
+        ``guard`` adds conditions on the stored document (e.g. the revision it
+        was read at); DocumentNotFound is raised when nothing matched.
+        """
+        async with self._timed("replace"):
+            result = await self.collection.replace_one({"id": doc["id"], **(guard or {})}, doc)
+        if result.matched_count == 0:
+            raise DocumentNotFound(doc["id"])
+        await self._saved(doc)
+
+    async def delete(self, doc_id: str) -> None:
+        async with self._timed("delete"):
+            result = await self.collection.delete_one({"id": doc_id})
+        if result.deleted_count == 0:
+            raise DocumentNotFound(doc_id)
+        if self.on_deleted is not None:
+            await self.on_deleted(self.db, doc_id)
+        if self.cache is not None:
+            self.cache.invalidate(self.name)
+
+    async def snapshot(self) -> CatalogSnapshot:
+        return await self.cache.get(self.name)
+
+    async def get(self, doc_id: str, projection: Optional[Dict[str, Any]] = None):
+        """The document with ``doc_id``: a model from the cached snapshot, else a dict."""
+        if self.cache is not None and projection is None:
+            item = (await self.snapshot()).by_id.get(doc_id)
+        else:
+            async with self._timed("get"):
+                item = await self.collection.find_one({"id": doc_id}, projection or {"_id": 0})
+        if item is None:
+            raise DocumentNotFound(doc_id)
+        return item
+
+    def cursor(self, query: Dict[str, Any], limit: Optional[int] = None, projection: Optional[Dict[str, Any]] = None):
+        """Documents matching ``query`` in list order, ``STREAM_BATCH_SIZE`` per round trip."""
+        if projection is None:
+            cursor = self.collection.find(query, {"_id": 0}).sort(LIST_SORT).batch_size(STREAM_BATCH_SIZE)
+            return cursor.limit(limit) if limit else cursor
+        # Computed fields (e.g. $size) need the aggregation pipeline
+        pipeline = [{"$match": query}, {"$sort": dict(LIST_SORT)}]
+        if limit:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": projection})
+        return self.collection.aggregate(pipeline, batchSize=STREAM_BATCH_SIZE)
+
+    async def find_page(self, query: Dict[str, Any], limit: int,
+                        projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        async with self._timed("find"):
+            return await self.cursor(query, limit, projection).to_list(limit)
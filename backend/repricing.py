@@ -0,0 +1,238 @@
+"""Bulk repricing of structures and stored budgets after catalog price changes.
+
+Structure materials and budget lines are flattened into columnar pandas
+frames and every total is recomputed with array operations; only documents
+whose numbers actually moved are written back, with targeted ``$set``
+updates sent through unordered ``bulk_write`` batches.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+import material_index
+from material_index import structures_using
+
+logger = logging.getLogger(__name__)
+
+STRUCTURE_COLLECTIONS = ("medium_voltage_structures", "low_voltage_structures")
+UNIT_PRICE_COLLECTIONS = ("poles", "conductors", "equipment")
+BUDGET_BATCH_SIZE = 20000
+WRITE_BATCH_SIZE = 1000
+# Anything below half a cent is float noise, not a price change
+TOLERANCE = 0.005
+BUDGET_DIFF_COLUMNS = ["id", "project_name", "old_total", "new_total", "delta"]
+
+def round_cents(values) -> np.ndarray:
+    """Half-up rounding to cents, matching ``pricing.to_money``."""
+    values = np.asarray(values, dtype=float)
+    return np.sign(values) * np.floor(np.abs(values) * 100 + 0.5 + 1e-9) / 100
+
+@dataclass
+class RepricingReport:
+    structures: pd.DataFrame
+    budgets: pd.DataFrame
+    budgets_scanned: int = 0
+    writes: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "structures_changed": len(self.structures),
+            "budgets_scanned": self.budgets_scanned,
+            "budgets_changed": len(self.budgets),
+            "budgets_total_delta": round(float(self.budgets["delta"].sum()), 2) if len(self.budgets) else 0.0,
+            "writes": self.writes,
+            "elapsed_seconds": round(self.elapsed, 3),
+        }
+
+async def _bulk_write(collection, ops: List[UpdateOne]) -> int:
+    modified = 0
+    for start in range(0, len(ops), WRITE_BATCH_SIZE):
+        result = await collection.bulk_write(ops[start:start + WRITE_BATCH_SIZE], ordered=False)
+        modified += result.modified_count
+    return modified
+
+async def _reprice_structures(db, material_prices: Dict[str, float], structure_ids: Optional[Dict[str, List[str]]] = None):
+    """Recompute structure totals; returns (diff frame, ops per collection, new totals by id)."""
+    frames, heads = [], []
+    for name in STRUCTURE_COLLECTIONS:
+        query = {} if structure_ids is None else {"id": {"$in": structure_ids[name]}}
+        docs = await db[name].find(query, {"_id": 0, "id": 1, "code": 1, "total_price": 1, "materials": 1}).to_list(None)
+        heads.append(pd.DataFrame({
+            "collection": name,
+            "id": [doc['id'] for doc in docs],
+            "code": [doc['code'] for doc in docs],
+            "old_total": [float(doc.get('total_price', 0.0)) for doc in docs],
+        }))
+        counts = [len(doc['materials']) for doc in docs]
+        materials = [mat for doc in docs for mat in doc['materials']]
+        frames.append(pd.DataFrame({
+            "collection": name,
+            "structure_id": np.repeat([doc['id'] for doc in docs], counts),
+            "position": np.concatenate([np.arange(n) for n in counts]) if counts else np.array([], dtype=int),
+            "code": [mat['code'] for mat in materials],
+            "quantity": np.array([mat['quantity'] for mat in materials], dtype=float),
+            "unit_price": np.array([mat['unit_price'] for mat in materials], dtype=float),
+        }))
+    head = pd.concat(heads, ignore_index=True)
+    mat = pd.concat(frames, ignore_index=True)
+
+    mat["new_unit_price"] = mat["code"].map(material_prices).fillna(mat["unit_price"]).astype(float)
+    mat["line"] = mat["quantity"] * mat["new_unit_price"]
+    totals = mat.groupby("structure_id", sort=False)["line"].sum()
+    head["new_total"] = head["id"].map(totals).fillna(0.0)
+
+    changed_mat = mat[np.abs(mat["new_unit_price"] - mat["unit_price"]) >= 1e-9]
+    changed = head[(np.abs(head["new_total"] - head["old_total"]) >= TOLERANCE) | head["id"].isin(changed_mat["structure_id"])]
+
+    ops: Dict[str, List[UpdateOne]] = {name: [] for name in STRUCTURE_COLLECTIONS}
+    changed_groups = {key: group for key, group in changed_mat.groupby("structure_id", sort=False)}
+    for row in changed.itertuples(index=False):
+        update = {"total_price": float(row.new_total)}
+        group = changed_groups.get(row.id)
+        if group is not None:
+            for position, price in zip(group["position"], group["new_unit_price"]):
+                update[f"materials.{int(position)}.unit_price"] = float(price)
+        ops[row.collection].append(UpdateOne({"id": row.id}, {"$set": update}))
+
+    diff = changed.assign(delta=changed["new_total"] - changed["old_total"]).reset_index(drop=True)
+    return diff, ops, head.set_index("id")["new_total"]
+
+async def _catalog_prices(db, structure_totals: pd.Series) -> pd.Series:
+    """Current price of every catalog id; recomputed structure totals win."""
+    prices = [structure_totals]
+    for name, price_field in [(n, "total_price") for n in STRUCTURE_COLLECTIONS] + [(n, "unit_price") for n in UNIT_PRICE_COLLECTIONS]:
+        docs = await db[name].find({}, {"_id": 0, "id": 1, price_field: 1}).to_list(None)
+        prices.append(pd.Series([float(d.get(price_field, 0.0)) for d in docs], index=[d['id'] for d in docs], dtype=float))
+    combined = pd.concat(prices)
+    return combined[~combined.index.duplicated(keep="first")]
+
+async def _reindex_structures(db, name: str, structure_ids: List[str]) -> None:
+    """Refresh the material usage entries, which carry each material's unit price."""
+    projection = {"_id": 0, "id": 1, "code": 1, "materials": 1}
+    for start in range(0, len(structure_ids), WRITE_BATCH_SIZE):
+        ids = structure_ids[start:start + WRITE_BATCH_SIZE]
+        structures = await db[name].find({"id": {"$in": ids}}, projection).to_list(None)
+        await material_index.index_structures(db, name, structures)
+
+def _empty_budget_diff() -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype=object if column in ("id", "project_name") else float)
+                         for column in BUDGET_DIFF_COLUMNS})
+
+def _reprice_budget_batch(docs: List[Dict[str, Any]], prices: pd.Series):
+    if not docs:
+        return _empty_budget_diff(), []
+    counts = np.array([len(doc.get('items', [])) for doc in docs], dtype=int)
+    items = [item for doc in docs for item in doc.get('items', [])]
+    lines = pd.DataFrame({
+        "budget": np.repeat(np.arange(len(docs)), counts),
+        "position": np.concatenate([np.arange(n) for n in counts]),
+        "item_id": [item['item_id'] for item in items],
+        "quantity": np.array([item['quantity'] for item in items], dtype=float),
+        "unit_price": np.array([item['unit_price'] for item in items], dtype=float),
+        "total_price": np.array([item['total_price'] for item in items], dtype=float),
+    })
+    # Lines whose catalog entry no longer exists keep the price they were sold at
+    lines["new_unit_price"] = round_cents(lines["item_id"].map(prices).fillna(lines["unit_price"]))
+    lines["new_total_price"] = round_cents(lines["quantity"] * lines["new_unit_price"])
+
+    budgets = pd.DataFrame({
+        "id": [doc['id'] for doc in docs],
+        "project_name": [doc.get('project_name') for doc in docs],
+        "labor_cost": [float(doc.get('labor_cost', 0.0)) for doc in docs],
+        "additional_services": [float(doc.get('additional_services', 0.0)) for doc in docs],
+        "bdi_percentage": [float(doc.get('bdi_percentage', 0.0)) for doc in docs],
+        "old_total": [float(doc.get('total', 0.0)) for doc in docs],
+    })
+    subtotal = lines.groupby("budget")["new_total_price"].sum().reindex(budgets.index, fill_value=0.0)
+    budgets["subtotal"] = round_cents(subtotal.to_numpy())
+    with_services = round_cents(budgets["subtotal"] + budgets["labor_cost"] + budgets["additional_services"])
+    budgets["bdi_value"] = round_cents(with_services * budgets["bdi_percentage"] / 100)
+    budgets["total"] = round_cents(with_services + budgets["bdi_value"])
+
+    moved = lines[(np.abs(lines["new_unit_price"] - lines["unit_price"]) >= TOLERANCE)
+                  | (np.abs(lines["new_total_price"] - lines["total_price"]) >= TOLERANCE)]
+    changed_mask = np.abs(budgets["total"] - budgets["old_total"]) >= TOLERANCE
+    changed_mask |= budgets.index.isin(moved["budget"])
+    changed = budgets[changed_mask]
+
+    moved_groups = {key: group for key, group in moved.groupby("budget", sort=False)}
+    ops = []
+    for index, row in zip(changed.index, changed.itertuples(index=False)):
+        update = {"subtotal": float(row.subtotal), "bdi_value": float(row.bdi_value), "total": float(row.total)}
+        group = moved_groups.get(index)
+        if group is not None:
+            for position, unit, line_total in zip(group["position"], group["new_unit_price"], group["new_total_price"]):
+                update[f"items.{int(position)}.unit_price"] = float(unit)
+                update[f"items.{int(position)}.total_price"] = float(line_total)
+        ops.append(UpdateOne({"id": row.id}, {"$set": update}))
+
+    diff = changed[["id", "project_name", "old_total", "total"]].rename(columns={"total": "new_total"})
+    return diff.assign(delta=round_cents(diff["new_total"] - diff["old_total"])), ops
+
+async def reprice(db, material_prices: Optional[Dict[str, float]] = None, dry_run: bool = False,
+                  targeted: bool = False) -> RepricingReport:
+    """Apply material price changes to structures and propagate to budgets.
+
+    ``material_prices`` maps ``StructureMaterial.code`` to its new unit price;
+    without it, stored totals are simply recomputed from the current catalog.
+    Budgets are streamed in batches of ``BUDGET_BATCH_SIZE`` and each batch is
+    written before the next one is read, so memory stays flat. With
+    ``dry_run`` nothing is written and the report only describes the changes.
+
+    ``targeted`` uses the material usage index to touch only the structures
+    containing the changed codes and the budgets referencing those structures.
+    """
+    started = time.perf_counter()
+    material_prices = material_prices or {}
+    structure_ids, budget_query = None, {}
+    if targeted:
+        structure_ids = await structures_using(db, list(material_prices))
+        affected = [structure_id for ids in structure_ids.values() for structure_id in ids]
+        budget_query = {"items.item_id": {"$in": affected}}
+    structure_diff, structure_ops, structure_totals = await _reprice_structures(db, material_prices, structure_ids)
+    prices = await _catalog_prices(db, structure_totals)
+
+    writes = {}
+    if not dry_run:
+        for name, ops in structure_ops.items():
+            if ops:
+                writes[name] = await _bulk_write(db[name], ops)
+                await _reindex_structures(db, name, list(structure_diff.loc[structure_diff["collection"] == name, "id"]))
+
+    budget_diffs, scanned = [], 0
+    projection = {"_id": 0, "id": 1, "project_name": 1, "labor_cost": 1, "additional_services": 1,
+                  "bdi_percentage": 1, "total": 1, "items.item_id": 1, "items.quantity": 1,
+                  "items.unit_price": 1, "items.total_price": 1}
+
+    async def flush(batch):
+        nonlocal scanned
+        diff, ops = _reprice_budget_batch(batch, prices)
+        budget_diffs.append(diff)
+        scanned += len(batch)
+        if ops and not dry_run:
+            writes["budgets"] = writes.get("budgets", 0) + await _bulk_write(db.budgets, ops)
+
+    batch = []
+    async for doc in db.budgets.find(budget_query, projection).batch_size(BUDGET_BATCH_SIZE):
+        batch.append(doc)
+        if len(batch) >= BUDGET_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    report = RepricingReport(
+        structures=structure_diff,
+        budgets=pd.concat(budget_diffs, ignore_index=True) if budget_diffs else _empty_budget_diff(),
+        budgets_scanned=scanned,
+        writes=writes,
+        elapsed=time.perf_counter() - started,
+    )
+    logger.info("Repricing %s: %s", "simulado" if dry_run else "aplicado", report.summary())
+    return report
@@ -0,0 +1,176 @@
+"""Budget revision history stored as deltas with periodic snapshots.
+
+Revision 1 is a full copy of the budget as it was before its first update;
+every later revision is a list of JSON-Patch style operations (RFC 6902
+``add``/``remove``/``replace``) against the revision before it, except every
+``SNAPSHOT_INTERVAL``-th revision, which is stored in full again. Rebuilding
+any revision therefore replays at most ``SNAPSHOT_INTERVAL - 1`` deltas, and
+storage grows with the size of the edits instead of the size of the budget.
+
+Item lists are diffed with ``difflib.SequenceMatcher``, so inserting or
+removing a line costs one operation, and a line edited in place only records
+the fields that changed.
+
+An update writes the live document first (guarded on its revision) and the
+history record after it, so history never holds a revision the budget did
+not reach. If the process dies in between, the live revision is missing from
+history; the next update finds it missing and stores the live document as a
+snapshot for it.
+"""
+import copy
+import difflib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+REVISIONS_COLLECTION = "budget_revisions"
+SNAPSHOT_INTERVAL = int(os.environ.get('BUDGET_SNAPSHOT_INTERVAL', 10))
+# Bookkeeping fields of the live document that are not part of its content
+UNVERSIONED_FIELDS = ("_id", "revision", "updated_at")
+
+def content(budget: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in budget.items() if key not in UNVERSIONED_FIELDS}
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+def _diff_dict(old: Dict[str, Any], new: Dict[str, Any], path: str) -> List[Dict[str, Any]]:
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{key}"})
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": f"{path}/{key}", "value": value})
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": f"{path}/{key}", "value": value})
+    return ops
+
+def _diff_list(old: List[Any], new: List[Any], path: str) -> List[Dict[str, Any]]:
+    matcher = difflib.SequenceMatcher(None, [_canonical(v) for v in old], [_canonical(v) for v in new], autojunk=False)
+    ops = []
+    # Walk the opcodes back to front so every index still refers to ``old``
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            for offset in range(i2 - i1):
+                before, after = old[i1 + offset], new[j1 + offset]
+                if isinstance(before, dict) and isinstance(after, dict):
+                    ops.extend(_diff_dict(before, after, f"{path}/{i1 + offset}"))
+                else:
+                    ops.append({"op": "replace", "path": f"{path}/{i1 + offset}", "value": after})
+            continue
+        for index in range(i2 - 1, i1 - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        for offset, value in enumerate(new[j1:j2]):
+            ops.append({"op": "add", "path": f"{path}/{i1 + offset}", "value": value})
+    return ops
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Operations that turn ``old`` into ``new`` (top-level fields and item lists)."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"/{key}"})
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": f"/{key}", "value": value})
+        elif isinstance(value, list) and isinstance(old[key], list):
+            ops.extend(_diff_list(old[key], value, f"/{key}"))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": f"/{key}", "value": value})
+    return ops
+
+def _resolve(doc: Any, path: str):
+    parts = [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+    parent = doc
+    for part in parts[:-1]:
+        parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+    return parent, parts[-1]
+
+def apply_patch(doc: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        parent, key = _resolve(doc, op["path"])
+        if isinstance(parent, list):
+            index = len(parent) if key == "-" else int(key)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[key]
+        else:
+            parent[key] = op["value"]
+    return doc
+
+async def rebuild(db, budget_id: str, revision: int) -> Optional[Dict[str, Any]]:
+    """Content of ``budget_id`` at ``revision``, or None if it was never stored."""
+    revisions = db[REVISIONS_COLLECTION]
+    snapshot = await revisions.find_one(
+        {"budget_id": budget_id, "revision": {"$lte": revision}, "kind": "snapshot"},
+        {"_id": 0}, sort=[("revision", -1)],
+    )
+    if snapshot is None:
+        return None
+    doc = snapshot["doc"]
+    applied = snapshot["revision"]
+    deltas = revisions.find(
+        {"budget_id": budget_id, "revision": {"$gt": applied, "$lte": revision}},
+        {"_id": 0, "revision": 1, "ops": 1},
+    ).sort("revision", 1)
+    async for delta in deltas:
+        if delta["revision"] != applied + 1:
+            return None
+        doc = apply_patch(doc, delta["ops"])
+        applied = delta["revision"]
+    return doc if applied == revision else None
+
+async def store_revision(db, record: Dict[str, Any]) -> None:
+    """Write ``record``, replacing whatever was stored under its revision.
+
+    Only called for a revision the live document holds (or just moved to),
+    so an existing record with the same number is a leftover of an
+    interrupted update and is stale.
+    """
+    await db[REVISIONS_COLLECTION].replace_one(
+        {"budget_id": record["budget_id"], "revision": record["revision"]}, record, upsert=True,
+    )
+
+async def prepare_update(db, current: Dict[str, Any], new_content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The revision record turning ``current`` (the live document) into ``new_content``.
+
+    Returns None when nothing changed. The caller stores the record with
+    ``store_revision`` once the live document has moved to its revision.
+    """
+    budget_id = current["id"]
+    revision = current.get("revision", 1)
+    now = datetime.now(timezone.utc)
+    previous = await rebuild(db, budget_id, revision)
+    if previous is None:
+        # First update of this budget, or an update whose history write never
+        # happened: the live document is the authority for its revision
+        previous = content(current)
+        await store_revision(db, {"budget_id": budget_id, "revision": revision, "kind": "snapshot",
+                                  "doc": previous, "created_at": now})
+
+    ops = diff(previous, new_content)
+    if not ops:
+        return None
+    revision += 1
+    if revision % SNAPSHOT_INTERVAL == 0:
+        record = {"kind": "snapshot", "doc": new_content}
+    else:
+        record = {"kind": "delta", "ops": ops}
+    return {"budget_id": budget_id, "revision": revision, "created_at": now, "op_count": len(ops), **record}
+
+async def list_revisions(db, budget_id: str) -> List[Dict[str, Any]]:
+    projection = {"_id": 0, "revision": 1, "kind": 1, "created_at": 1, "op_count": 1}
+    return await db[REVISIONS_COLLECTION].find({"budget_id": budget_id}, projection).sort("revision", 1).to_list(None)
+
+async def delete_history(db, budget_id: str) -> None:
+    await db[REVISIONS_COLLECTION].delete_many({"budget_id": budget_id})
@@ -0,0 +1,154 @@
+"""Idempotent seeding of catalog collections.
+
+Seed rows are matched to stored documents by a natural key (``code`` for the
+catalogs, ``(category, value)`` for dropdown options) and only the
+differences are written, in one ``bulk_write``: new rows are inserted,
+changed fields are ``$set`` on the existing document and everything else is
+left alone. Matched documents keep their ``id`` and ``created_at``, so
+budgets referencing them through ``BudgetItem.item_id`` stay valid, and
+re-running an unchanged seed performs no writes at all.
+
+By default the changes are written to the live collection; since only the
+differences are sent, concurrent API writes to other documents are kept.
+With ``swap=True`` they are applied to a staging copy that is then renamed
+over the live one, so readers never observe a half-applied seed, but writes
+made through the API while the swap is in progress are lost: use it only
+during a deploy, never under write traffic.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import DeleteOne, IndexModel, InsertOne, UpdateOne
+
+from indexes import INDEXES, ensure_collection_indexes
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUFFIX = "__seed_staging"
+# index_information() fields that are not IndexModel options
+_INDEX_INTERNAL_FIELDS = ("key", "v", "ns")
+
+@dataclass
+class SeedReport:
+    collection: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    extra: int = 0
+    swapped: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def summary(self) -> str:
+        text = (f"{self.collection}: {self.inserted} inseridos, {self.updated} atualizados, "
+                f"{self.unchanged} sem alteração, {self.deleted} removidos")
+        if self.extra:
+            text += f", {self.extra} fora da carga mantidos"
+        return f"{text} ({self.elapsed:.3f}s)"
+
+def _seed_key(doc: Dict[str, Any], key: Sequence[str]) -> Tuple[Any, ...]:
+    return tuple(doc.get(field) for field in key)
+
+def plan_seed(seed: List[Dict[str, Any]], stored: List[Dict[str, Any]], key: Sequence[str],
+              prune: bool = False, collection: str = "") -> Tuple[List[Any], SeedReport]:
+    """Write operations that bring ``stored`` in line with ``seed``.
+
+    ``stored`` must be ordered by ``(created_at, id)``: if several documents
+    share a key the oldest one is matched and the rest count as extras.
+    Extras are only deleted with ``prune=True``.
+    """
+    report = SeedReport(collection)
+    desired: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for doc in seed:
+        desired[_seed_key(doc, key)] = doc
+
+    current: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    ops: List[Any] = []
+    for doc in stored:
+        doc_key = _seed_key(doc, key)
+        if doc_key in desired and doc_key not in current:
+            current[doc_key] = doc
+        elif prune:
+            ops.append(DeleteOne({"_id": doc["_id"]}))
+            report.deleted += 1
+        else:
+            report.extra += 1
+
+    for doc_key, doc in desired.items():
+        existing = current.get(doc_key)
+        if existing is None:
+            ops.append(InsertOne({
+                **doc,
+                "id": str(uuid.uuid4()),
+                "created_at": datetime.now(timezone.utc),
+            }))
+            report.inserted += 1
+            continue
+        changes = {field: value for field, value in doc.items() if existing.get(field) != value}
+        if changes:
+            ops.append(UpdateOne({"_id": existing["_id"]}, {"$set": changes}))
+            report.updated += 1
+        else:
+            report.unchanged += 1
+    return ops, report
+
+def _index_models(info: Dict[str, Dict[str, Any]]) -> List[IndexModel]:
+    models = []
+    for name, spec in info.items():
+        if name == "_id_":
+            continue
+        options = {opt: value for opt, value in spec.items() if opt not in _INDEX_INTERNAL_FIELDS}
+        models.append(IndexModel(list(spec["key"]), name=name, **options))
+    return models
+
+async def _swap_in(db, name: str, ops: List[Any]) -> None:
+    """Apply ``ops`` to a copy of ``name`` and rename the copy over it."""
+    staging = db[name + STAGING_SUFFIX]
+    await staging.drop()
+    if name in await db.list_collection_names(filter={"name": name}):
+        await db[name].aggregate([{"$match": {}}, {"$out": staging.name}]).to_list(None)
+        existing_indexes = _index_models(await db[name].index_information())
+        if existing_indexes:
+            await staging.create_indexes(existing_indexes)
+    await ensure_collection_indexes(staging, INDEXES.get(name, []))
+    await staging.bulk_write(ops, ordered=False)
+    await staging.rename(name, dropTarget=True)
+
+async def seed_collection(db, name: str, seed: List[Dict[str, Any]], key: Sequence[str] = ("code",),
+                          prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                          prune: bool = False, swap: bool = False, dry_run: bool = False) -> SeedReport:
+    """Bring collection ``name`` in line with ``seed`` and report what changed.
+
+    ``prepare`` adds derived fields (e.g. a structure's ``total_price``) to
+    each seed row before comparing. With ``swap=True`` the operations go
+    through a staging copy renamed over the live collection (see the module
+    docstring for why that is unsafe under write traffic).
+    """
+    started = time.perf_counter()
+    if prepare is not None:
+        seed = [prepare(dict(doc)) for doc in seed]
+    stored = await db[name].find({}).sort([("created_at", 1), ("id", 1)]).to_list(None)
+    ops, report = plan_seed(seed, stored, key, prune=prune, collection=name)
+
+    if ops and not dry_run:
+        if swap:
+            await _swap_in(db, name, ops)
+            report.swapped = True
+        else:
+            await db[name].bulk_write(ops, ordered=False)
+    report.elapsed = time.perf_counter() - started
+    logger.info(report.summary())
+    return report
+
+def structure_totals(structure: Dict[str, Any]) -> Dict[str, Any]:
+    """``prepare`` hook for structures: adds ``total_price`` from the materials."""
+    structure["total_price"] = sum(mat['quantity'] * mat['unit_price'] for mat in structure['materials'])
+    return structure
@@ -1,33 +1,60 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from typing import List, Optional, Dict, Any, Literal, Tuple
 import uuid
 from datetime import datetime, timezone
-import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+import json
+import base64
+import binascii
+import hashlib
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from indexes import ensure_indexes
+from catalog_cache import CatalogCache, CatalogSnapshot
+from pricing import PricingError, compute_totals, price_lines
+import material_index
+from bom import build_xlsx, explode_budget, iter_csv
+import pdf_service
+import export_jobs
+import bulk_import
+import revisions
+import budget_search
+from http_cache import HttpCacheMiddleware, etag_matches
+from repository import DocumentNotFound, Repository, add_observer
+import metrics
+import mongo_pool
+import migrations
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection; Motor connects lazily, the lifespan warms the pool
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_options = mongo_pool.client_options()
+# tz_aware: BSON dates come back as UTC-aware datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[metrics.MongoCommandListener()], **mongo_options)
 db = client[os.environ['DB_NAME']]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup() and shutdown() live with the probes at the end of this module
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -165,6 +192,33 @@ class BudgetCreate(BaseModel):
     bdi_percentage: float = 0.0
     notes: Optional[str] = None
 
+# Linha de orçamento precificada no servidor a partir do catálogo
+class BudgetLine(BaseModel):
+    item_type: str
+    item_id: str
+    quantity: float = Field(gt=0)
+
+class PricedBudgetCreate(BaseModel):
+    project_name: str
+    client_name: str
+    lines: List[BudgetLine]
+    labor_cost: float = 0.0
+    additional_services: float = 0.0
+    bdi_percentage: float = 0.0
+    notes: Optional[str] = None
+
+class RepriceRequest(BaseModel):
+    material_prices: Dict[str, float] = Field(default_factory=dict)  # código do material -> novo preço
+    dry_run: bool = True
+    targeted: bool = False  # só estruturas/orçamentos que usam os materiais alterados
+
+# Exportação em lote de orçamentos (ZIP de PDFs)
+class ExportRequest(BaseModel):
+    budget_ids: Optional[List[str]] = None
+    client_name: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
 class Budget(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -179,6 +233,242 @@ class Budget(BaseModel):
     total: float
     notes: Optional[str]
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    revision: int = 1
+    updated_at: Optional[datetime] = None
+
+# Projeção de orçamento para listagens, sem a lista de itens
+class BudgetSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    project_name: str
+    client_name: str
+    total: float
+    created_at: datetime
+    item_count: int
+
+class BudgetSearchResult(BaseModel):
+    total_count: int
+    results: List[BudgetSummary]
+
+class BudgetRevision(BaseModel):
+    revision: int
+    kind: str  # snapshot (cópia completa) ou delta (operações sobre a revisão anterior)
+    created_at: datetime
+    op_count: Optional[int] = None
+
+# ============ CATALOG CACHE ============
+
+catalog_cache = CatalogCache(db, {
+    "poles": Pole,
+    "conductors": Conductor,
+    "equipment": Equipment,
+    "medium_voltage_structures": MediumVoltageStructure,
+    "low_voltage_structures": LowVoltageStructure,
+    "dropdown_options": DropdownOption,
+})
+
+# ============ REPOSITORIES ============
+
+def structure_total(structure) -> Dict[str, Any]:
+    return {"total_price": sum(mat.quantity * mat.unit_price for mat in structure.materials)}
+
+dropdown_options_repo = Repository(db, "dropdown_options", DropdownOption, cache=catalog_cache)
+poles_repo = Repository(db, "poles", Pole, cache=catalog_cache)
+conductors_repo = Repository(db, "conductors", Conductor, cache=catalog_cache)
+equipment_repo = Repository(db, "equipment", Equipment, cache=catalog_cache)
+medium_voltage_structures_repo = Repository(
+    db, "medium_voltage_structures", MediumVoltageStructure, cache=catalog_cache, prepare=structure_total,
+    on_saved=material_index.index_structure,
+    on_saved_many=material_index.index_structures,
+    on_deleted=material_index.remove_structure,
+)
+low_voltage_structures_repo = Repository(
+    db, "low_voltage_structures", LowVoltageStructure, cache=catalog_cache, prepare=structure_total,
+    on_saved=material_index.index_structure,
+    on_saved_many=material_index.index_structures,
+    on_deleted=material_index.remove_structure,
+)
+budgets_repo = Repository(db, "budgets", Budget, on_deleted=revisions.delete_history)
+
+# List routes served from the snapshots, for revalidation in HttpCacheMiddleware
+CATALOG_PATHS = {
+    "/api/poles": "poles",
+    "/api/conductors": "conductors",
+    "/api/equipment": "equipment",
+    "/api/medium-voltage-structures": "medium_voltage_structures",
+    "/api/low-voltage-structures": "low_voltage_structures",
+}
+
+CATALOG_BUNDLE_PATH = "/api/catalog/bundle"
+
+def bundle_etag(snapshots) -> str:
+    digest = hashlib.sha1()
+    for snapshot in snapshots:
+        digest.update(snapshot.etag.encode())
+    return f'"bundle-{digest.hexdigest()[:20]}"'
+
+def catalog_etag(path: str) -> Optional[str]:
+    """ETag of a loaded catalog snapshot (or of the bundle); never queries Mongo."""
+    path = path.rstrip("/")
+    if path == CATALOG_BUNDLE_PATH:
+        snapshots = [catalog_cache.peek(name) for name in catalog_cache.collections]
+        return bundle_etag(snapshots) if all(snapshots) else None
+    name = CATALOG_PATHS.get(path)
+    snapshot = catalog_cache.peek(name) if name else None
+    return snapshot.etag if snapshot else None
+
+# ============ PAGINATION ============
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# JSON or NDJSON is picked from the Accept header, so caches must key on it
+FORMAT_VARY = {"Vary": "Accept"}
+
+# Keyset pagination: documents are listed in (created_at, id) order (see
+# repository.LIST_SORT) and the cursor encodes the last key of the previous
+# page, so each page is a range scan instead of a skip over everything before it.
+
+# Read-heavy lists build their JSON body directly: cached snapshot bytes for
+# the catalogs, a single pydantic-core validate + dump for Mongo documents.
+# That skips FastAPI's response_model re-validation, jsonable_encoder and
+# json.dumps. FAST_JSON=0 restores the generic path (e.g. for benchmarking).
+FAST_JSON = os.environ.get('FAST_JSON', '1') != '0'
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    raw = json.dumps([doc['created_at'].isoformat(), doc['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at, doc_id
+
+class PageParams:
+    """Query parameters shared by every list endpoint.
+
+    ``limit`` and ``after`` drive keyset pagination; ``format=ndjson`` (or an
+    ``Accept: application/x-ndjson`` header) streams the documents one per line
+    straight from the Mongo cursor.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="Cursor retornado em X-Next-Cursor"),
+        format: Optional[Literal["json", "ndjson"]] = Query(None),
+    ):
+        self.request = request
+        self.limit = limit
+        self.after = after
+        if format is None:
+            format = "ndjson" if NDJSON_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+        self.format = format
+
+    def query(self, base: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.after:
+            return base
+        created_at, doc_id = decode_cursor(self.after)
+        keyset = {"$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "id": {"$gt": doc_id}},
+        ]}
+        return {"$and": [base, keyset]} if base else keyset
+
+    def snapshot_key(self):
+        if not self.after:
+            return None
+        return decode_cursor(self.after)
+
+    def next_url(self, cursor: str) -> str:
+        return str(self.request.url.include_query_params(after=cursor))
+
+@lru_cache(maxsize=None)
+def _item_adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+@lru_cache(maxsize=None)
+def _list_adapter(model) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+async def _stream_ndjson(cursor, model):
+    # Same serializer as the JSON body, so both formats write identical fields and timestamps
+    adapter = _item_adapter(model)
+    async for doc in cursor:
+        yield adapter.dump_json(adapter.validate_python(doc)) + b"\n"
+
+def json_bytes_response(body: bytes, response: Response) -> Response:
+    """Pre-serialized JSON body, keeping the headers set on the injected ``response``."""
+    headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def list_documents(repo: Repository, base_query: Dict[str, Any], page: PageParams, response: Response,
+                         projection: Optional[Dict[str, Any]] = None, model=None):
+    """List ``repo`` in keyset order; ``projection`` must keep ``created_at`` and ``id``.
+
+    The page is validated and serialized in one pass with ``model`` (the
+    route's item response model, ``repo.model`` by default) instead of
+    through ``response_model``.
+    """
+    query = page.query(base_query)
+    model = model or repo.model
+
+    if page.format == "ndjson":
+        cursor = repo.cursor(query, page.limit, projection)
+        return StreamingResponse(_stream_ndjson(cursor, model), media_type=NDJSON_MEDIA_TYPE, headers=FORMAT_VARY)
+
+    response.headers.update(FORMAT_VARY)
+
+    limit = page.limit or DEFAULT_PAGE_SIZE
+    docs = await repo.find_page(query, limit + 1, projection)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        _set_next_page(page, response, encode_cursor(docs[-1]))
+    if FAST_JSON:
+        adapter = _list_adapter(model)
+        return json_bytes_response(adapter.dump_json(adapter.validate_python(docs)), response)
+    return docs
+
+def _set_next_page(page: PageParams, response: Response, next_cursor: str):
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{page.next_url(next_cursor)}>; rel="next"'
+
+async def _stream_snapshot_ndjson(item_json):
+    for payload in item_json:
+        yield payload + b"\n"
+
+def list_snapshot(snapshot: CatalogSnapshot, page: PageParams, response: Response):
+    """Serve a list endpoint from a cached catalog snapshot.
+
+    Answers 304 when the client already holds the current version.
+    """
+    cache_headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", **FORMAT_VARY}
+    if etag_matches(page.request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    if page.format == "ndjson":
+        item_json, _ = snapshot.json_page_after(page.snapshot_key(), page.limit)
+        return StreamingResponse(_stream_snapshot_ndjson(item_json), media_type=NDJSON_MEDIA_TYPE, headers=cache_headers)
+
+    response.headers.update(cache_headers)
+    if not FAST_JSON:
+        items, has_more = snapshot.page_after(page.snapshot_key(), page.limit or DEFAULT_PAGE_SIZE)
+        if has_more:
+            _set_next_page(page, response, encode_cursor(items[-1].model_dump()))
+        return items
+
+    # Items were validated when the snapshot was loaded; serve their bytes
+    item_json, last = snapshot.json_page_after(page.snapshot_key(), page.limit or DEFAULT_PAGE_SIZE)
+    if last is not None:
+        _set_next_page(page, response, encode_cursor({"created_at": last.created_at, "id": last.id}))
+    return json_bytes_response(b"[" + b",".join(item_json) + b"]", response)
 
 # ============ ROUTES ============
 
@@ -186,461 +476,461 @@ class Budget(BaseModel):
 async def root():
     return {"message": "Sistema de Orçamentação - Estruturas de Média Tensão"}
 
+# Generated CRUD routes: every collection goes through its Repository
+CRUD_OPERATIONS = ("create", "list", "update", "delete")
+
+def add_crud_routes(repo: Repository, path: str, create_model, not_found: str, deleted: str,
+                    operations=CRUD_OPERATIONS):
+    """Register the standard routes of ``repo`` under ``path``.
+
+    ``operations`` picks from create, list, get, update and delete; cached
+    catalogs list (and get) from their snapshot.
+    """
+    model = repo.model
+
+    if "create" in operations:
+        async def create_item(payload: create_model):
+            return await repo.create(payload)
+        api_router.add_api_route(path, create_item, methods=["POST"], response_model=model,
+                                 name=f"create_{repo.name}")
+
+    if "list" in operations:
+        async def list_items(response: Response, page: PageParams = Depends()):
+            if repo.cache is not None:
+                return list_snapshot(await repo.snapshot(), page, response)
+            return await list_documents(repo, {}, page, response)
+        api_router.add_api_route(path, list_items, methods=["GET"], response_model=List[model],
+                                 name=f"list_{repo.name}")
+
+    if "get" in operations:
+        async def get_item(item_id: str):
+            try:
+                return await repo.get(item_id)
+            except DocumentNotFound:
+                raise HTTPException(status_code=404, detail=not_found)
+        api_router.add_api_route(f"{path}/{{item_id}}", get_item, methods=["GET"], response_model=model,
+                                 name=f"get_{repo.name}")
+
+    if "update" in operations:
+        async def update_item(item_id: str, payload: create_model):
+            try:
+                return await repo.replace(item_id, payload)
+            except DocumentNotFound:
+                raise HTTPException(status_code=404, detail=not_found)
+        api_router.add_api_route(f"{path}/{{item_id}}", update_item, methods=["PUT"], response_model=model,
+                                 name=f"update_{repo.name}")
+
+    if "delete" in operations:
+        async def delete_item(item_id: str):
+            try:
+                await repo.delete(item_id)
+            except DocumentNotFound:
+                raise HTTPException(status_code=404, detail=not_found)
+            return {"message": deleted}
+        api_router.add_api_route(f"{path}/{{item_id}}", delete_item, methods=["DELETE"],
+                                 name=f"delete_{repo.name}")
+
 # Dropdown Options Routes
 @api_router.get("/dropdown-options/{category}", response_model=List[DropdownOption])
-async def get_dropdown_options(category: str):
-    options = await db.dropdown_options.find({"category": category}, {"_id": 0}).to_list(1000)
-    for option in options:
-        if isinstance(option['created_at'], str):
-            option['created_at'] = datetime.fromisoformat(option['created_at'])
-    return options
-
-@api_router.post("/dropdown-options", response_model=DropdownOption)
-async def create_dropdown_option(option: DropdownOptionCreate):
-    option_obj = DropdownOption(**option.model_dump())
-    doc = option_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.dropdown_options.insert_one(doc)
-    return option_obj
-
-@api_router.delete("/dropdown-options/{option_id}")
-async def delete_dropdown_option(option_id: str):
-    result = await db.dropdown_options.delete_one({"id": option_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Opção não encontrada")
-    return {"message": "Opção deletada com sucesso"}
-
-# Pole Routes
-@api_router.post("/poles", response_model=Pole)
-async def create_pole(pole: PoleCreate):
-    pole_obj = Pole(**pole.model_dump())
-    doc = pole_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.poles.insert_one(doc)
-    return pole_obj
-
-@api_router.get("/poles", response_model=List[Pole])
-async def get_poles():
-    poles = await db.poles.find({}, {"_id": 0}).to_list(1000)
-    for pole in poles:
-        if isinstance(pole['created_at'], str):
-            pole['created_at'] = datetime.fromisoformat(pole['created_at'])
-    return poles
-
-@api_router.put("/poles/{pole_id}", response_model=Pole)
-async def update_pole(pole_id: str, pole: PoleCreate):
-    pole_obj = Pole(**pole.model_dump(), id=pole_id)
-    doc = pole_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    result = await db.poles.replace_one({"id": pole_id}, doc)
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Poste não encontrado")
-    return pole_obj
-
-@api_router.delete("/poles/{pole_id}")
-async def delete_pole(pole_id: str):
-    result = await db.poles.delete_one({"id": pole_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Poste não encontrado")
-    return {"message": "Poste deletado com sucesso"}
-
-# Medium Voltage Structure Routes
-@api_router.post("/medium-voltage-structures", response_model=MediumVoltageStructure)
-async def create_medium_voltage_structure(structure: MediumVoltageStructureCreate):
-    # Calculate total price
-    total_price = sum(mat.quantity * mat.unit_price for mat in structure.materials)
-    
-    structure_obj = MediumVoltageStructure(**structure.model_dump(), total_price=total_price)
-    doc = structure_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.medium_voltage_structures.insert_one(doc)
-    return structure_obj
-
-@api_router.get("/medium-voltage-structures", response_model=List[MediumVoltageStructure])
-async def get_medium_voltage_structures():
-    structures = await db.medium_voltage_structures.find({}, {"_id": 0}).to_list(1000)
-    for structure in structures:
-        if isinstance(structure['created_at'], str):
-            structure['created_at'] = datetime.fromisoformat(structure['created_at'])
-    return structures
-
-@api_router.get("/medium-voltage-structures/{structure_id}", response_model=MediumVoltageStructure)
-async def get_medium_voltage_structure(structure_id: str):
-    structure = await db.medium_voltage_structures.find_one({"id": structure_id}, {"_id": 0})
-    if not structure:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    if isinstance(structure['created_at'], str):
-        structure['created_at'] = datetime.fromisoformat(structure['created_at'])
-    return structure
-
-@api_router.put("/medium-voltage-structures/{structure_id}", response_model=MediumVoltageStructure)
-async def update_medium_voltage_structure(structure_id: str, structure: MediumVoltageStructureCreate):
-    # Calculate total price
-    total_price = sum(mat.quantity * mat.unit_price for mat in structure.materials)
-    
-    structure_obj = MediumVoltageStructure(**structure.model_dump(), id=structure_id, total_price=total_price)
-    doc = structure_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    result = await db.medium_voltage_structures.replace_one({"id": structure_id}, doc)
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    return structure_obj
-
-@api_router.delete("/medium-voltage-structures/{structure_id}")
-async def delete_medium_voltage_structure(structure_id: str):
-    result = await db.medium_voltage_structures.delete_one({"id": structure_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    return {"message": "Estrutura deletada com sucesso"}
-
-# Low Voltage Structure Routes
-@api_router.post("/low-voltage-structures", response_model=LowVoltageStructure)
-async def create_low_voltage_structure(structure: LowVoltageStructureCreate):
-    # Calculate total price
-    total_price = sum(mat.quantity * mat.unit_price for mat in structure.materials)
-    
-    structure_obj = LowVoltageStructure(**structure.model_dump(), total_price=total_price)
-    doc = structure_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.low_voltage_structures.insert_one(doc)
-    return structure_obj
-
-@api_router.get("/low-voltage-structures", response_model=List[LowVoltageStructure])
-async def get_low_voltage_structures():
-    structures = await db.low_voltage_structures.find({}, {"_id": 0}).to_list(1000)
-    for structure in structures:
-        if isinstance(structure['created_at'], str):
-            structure['created_at'] = datetime.fromisoformat(structure['created_at'])
-    return structures
-
-@api_router.get("/low-voltage-structures/{structure_id}", response_model=LowVoltageStructure)
-async def get_low_voltage_structure(structure_id: str):
-    structure = await db.low_voltage_structures.find_one({"id": structure_id}, {"_id": 0})
-    if not structure:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    if isinstance(structure['created_at'], str):
-        structure['created_at'] = datetime.fromisoformat(structure['created_at'])
-    return structure
-
-@api_router.put("/low-voltage-structures/{structure_id}", response_model=LowVoltageStructure)
-async def update_low_voltage_structure(structure_id: str, structure: LowVoltageStructureCreate):
-    # Calculate total price
-    total_price = sum(mat.quantity * mat.unit_price for mat in structure.materials)
-    
-    structure_obj = LowVoltageStructure(**structure.model_dump(), id=structure_id, total_price=total_price)
-    doc = structure_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    result = await db.low_voltage_structures.replace_one({"id": structure_id}, doc)
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    return structure_obj
-
-@api_router.delete("/low-voltage-structures/{structure_id}")
-async def delete_low_voltage_structure(structure_id: str):
-    result = await db.low_voltage_structures.delete_one({"id": structure_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Estrutura não encontrada")
-    return {"message": "Estrutura deletada com sucesso"}
-
-# Conductor Routes
-@api_router.post("/conductors", response_model=Conductor)
-async def create_conductor(conductor: ConductorCreate):
-    conductor_obj = Conductor(**conductor.model_dump())
-    doc = conductor_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.conductors.insert_one(doc)
-    return conductor_obj
-
-@api_router.get("/conductors", response_model=List[Conductor])
-async def get_conductors():
-    conductors = await db.conductors.find({}, {"_id": 0}).to_list(1000)
-    for conductor in conductors:
-        if isinstance(conductor['created_at'], str):
-            conductor['created_at'] = datetime.fromisoformat(conductor['created_at'])
-    return conductors
-
-@api_router.put("/conductors/{conductor_id}", response_model=Conductor)
-async def update_conductor(conductor_id: str, conductor: ConductorCreate):
-    conductor_obj = Conductor(**conductor.model_dump(), id=conductor_id)
-    doc = conductor_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    result = await db.conductors.replace_one({"id": conductor_id}, doc)
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Condutor não encontrado")
-    return conductor_obj
-
-@api_router.delete("/conductors/{conductor_id}")
-async def delete_conductor(conductor_id: str):
-    result = await db.conductors.delete_one({"id": conductor_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Condutor não encontrado")
-    return {"message": "Condutor deletado com sucesso"}
-
-# Equipment Routes
-@api_router.post("/equipment", response_model=Equipment)
-async def create_equipment(equipment: EquipmentCreate):
-    equipment_obj = Equipment(**equipment.model_dump())
-    doc = equipment_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.equipment.insert_one(doc)
-    return equipment_obj
-
-@api_router.get("/equipment", response_model=List[Equipment])
-async def get_equipment():
-    equipment_list = await db.equipment.find({}, {"_id": 0}).to_list(1000)
-    for equipment in equipment_list:
-        if isinstance(equipment['created_at'], str):
-            equipment['created_at'] = datetime.fromisoformat(equipment['created_at'])
-    return equipment_list
-
-@api_router.put("/equipment/{equipment_id}", response_model=Equipment)
-async def update_equipment(equipment_id: str, equipment: EquipmentCreate):
-    equipment_obj = Equipment(**equipment.model_dump(), id=equipment_id)
-    doc = equipment_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    result = await db.equipment.replace_one({"id": equipment_id}, doc)
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Equipamento não encontrado")
-    return equipment_obj
-
-@api_router.delete("/equipment/{equipment_id}")
-async def delete_equipment(equipment_id: str):
-    result = await db.equipment.delete_one({"id": equipment_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Equipamento não encontrado")
-    return {"message": "Equipamento deletado com sucesso"}
+async def get_dropdown_options(category: str, response: Response, page: PageParams = Depends()):
+    return await list_documents(dropdown_options_repo, {"category": category}, page, response)
+
+add_crud_routes(dropdown_options_repo, "/dropdown-options", DropdownOptionCreate,
+                "Opção não encontrada", "Opção deletada com sucesso", operations=("create", "delete"))
+
+add_crud_routes(poles_repo, "/poles", PoleCreate, "Poste não encontrado", "Poste deletado com sucesso")
+
+STRUCTURE_OPERATIONS = ("create", "list", "get", "update", "delete")
+add_crud_routes(medium_voltage_structures_repo, "/medium-voltage-structures", MediumVoltageStructureCreate,
+                "Estrutura não encontrada", "Estrutura deletada com sucesso", operations=STRUCTURE_OPERATIONS)
+add_crud_routes(low_voltage_structures_repo, "/low-voltage-structures", LowVoltageStructureCreate,
+                "Estrutura não encontrada", "Estrutura deletada com sucesso", operations=STRUCTURE_OPERATIONS)
+
+# Material Usage Routes
+@api_router.get("/materials/{code:path}/usage")
+async def get_material_usage(code: str):
+    return await material_index.material_usage(db, code)
+
+add_crud_routes(conductors_repo, "/conductors", ConductorCreate,
+                "Condutor não encontrado", "Condutor deletado com sucesso")
+add_crud_routes(equipment_repo, "/equipment", EquipmentCreate,
+                "Equipamento não encontrado", "Equipamento deletado com sucesso")
+
+# Catalog bundle: everything the budget editor needs in one round trip
+BUNDLE_CATALOGS = tuple(name for name in catalog_cache.collections if name != "dropdown_options")
+
+# (bundle etag, body) of the last bundle served; rebuilt when any snapshot changes
+_bundle_body: Optional[Tuple[str, bytes]] = None
+
+def _group_options(snapshot: CatalogSnapshot) -> Dict[str, List[int]]:
+    """Indexes of the dropdown options of each category, in list order."""
+    groups: Dict[str, List[int]] = {}
+    for index, option in enumerate(snapshot.items):
+        groups.setdefault(option.category, []).append(index)
+    return groups
+
+def build_bundle_json(etag: str, snapshots: Dict[str, CatalogSnapshot]) -> bytes:
+    parts = [b'{"version":', json.dumps(etag.strip('"')).encode(), b',"catalogs":{']
+    parts.append(b",".join(
+        json.dumps(name).encode() + b":[" + b",".join(snapshots[name].item_json) + b"]"
+        for name in BUNDLE_CATALOGS
+    ))
+    options = snapshots["dropdown_options"]
+    parts.append(b'},"dropdown_options":{')
+    parts.append(b",".join(
+        json.dumps(category).encode() + b":[" + b",".join(options.item_json[i] for i in indexes) + b"]"
+        for category, indexes in _group_options(options).items()
+    ))
+    parts.append(b"}}")
+    return b"".join(parts)
+
+@api_router.get("/catalog/bundle")
+async def get_catalog_bundle(request: Request, response: Response):
+    """All catalogs plus the dropdown options, under one combined ETag."""
+    global _bundle_body
+    loaded = await asyncio.gather(*(catalog_cache.get(name) for name in catalog_cache.collections))
+    snapshots = dict(zip(catalog_cache.collections, loaded))
+    etag = bundle_etag(loaded)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    response.headers.update(cache_headers)
+    if not FAST_JSON:
+        options = snapshots["dropdown_options"]
+        return {
+            "version": etag.strip('"'),
+            "catalogs": {name: snapshots[name].items for name in BUNDLE_CATALOGS},
+            "dropdown_options": {category: [options.items[i] for i in indexes]
+                                 for category, indexes in _group_options(options).items()},
+        }
+    if _bundle_body is None or _bundle_body[0] != etag:
+        _bundle_body = (etag, build_bundle_json(etag, snapshots))
+    return json_bytes_response(_bundle_body[1], response)
 
 # Budget Routes
-@api_router.post("/budgets", response_model=Budget)
-async def create_budget(budget: BudgetCreate):
-    # Calculate subtotal from items
-    subtotal = sum(item.total_price for item in budget.items)
-    subtotal_with_services = subtotal + budget.labor_cost + budget.additional_services
-    
-    # Calculate BDI
-    bdi_value = subtotal_with_services * (budget.bdi_percentage / 100)
-    total = subtotal_with_services + bdi_value
-    
-    budget_obj = Budget(
+def build_budget(budget: BudgetCreate) -> Budget:
+    totals = compute_totals(
+        (item.total_price for item in budget.items),
+        budget.labor_cost, budget.additional_services, budget.bdi_percentage
+    )
+    return Budget(
         **budget.model_dump(),
-        subtotal=subtotal,
-        bdi_value=bdi_value,
-        total=total
+        subtotal=float(totals.subtotal),
+        bdi_value=float(totals.bdi_value),
+        total=float(totals.total)
     )
-    doc = budget_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.budgets.insert_one(doc)
-    return budget_obj
+
+async def insert_budget(budget_obj: Budget) -> Budget:
+    return await budgets_repo.insert(budget_obj)
+
+async def price_budget(budget: PricedBudgetCreate) -> Budget:
+    try:
+        items = await price_lines(db, [line.model_dump() for line in budget.lines], catalog_cache)
+    except PricingError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return build_budget(BudgetCreate(**budget.model_dump(exclude={"lines"}), items=items))
+
+@api_router.post("/budgets", response_model=Budget)
+async def create_budget(budget: BudgetCreate):
+    return await insert_budget(build_budget(budget))
+
+@api_router.post("/budgets/quote", response_model=Budget)
+async def quote_budget(budget: PricedBudgetCreate):
+    # Precifica as linhas pelo catálogo sem gravar o orçamento
+    return await price_budget(budget)
+
+@api_router.post("/budgets/priced", response_model=Budget)
+async def create_priced_budget(budget: PricedBudgetCreate):
+    return await insert_budget(await price_budget(budget))
+
+class BudgetFilters:
+    """Query filters shared by budget search and aggregates."""
+
+    def __init__(
+        self,
+        q: Optional[str] = Query(None, description="busca no nome do projeto e do cliente"),
+        client_name: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        total_min: Optional[float] = None,
+        total_max: Optional[float] = None,
+    ):
+        self.q = q.strip() if q else None
+        self.match = budget_search.build_match(self.q, client_name, created_from, created_to, total_min, total_max)
+
+@api_router.get("/budgets/search", response_model=BudgetSearchResult)
+async def search_budgets(
+    filters: BudgetFilters = Depends(),
+    sort: Optional[Literal["relevance", "created_at", "total", "project_name", "client_name"]] = None,
+    order: Literal["asc", "desc"] = "desc",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    sort = sort or ("relevance" if filters.q else "created_at")
+    return await budget_search.search(db, filters.match, sort, order == "desc", offset, limit)
+
+@api_router.get("/budgets/aggregates/clients")
+async def get_budget_totals_by_client(filters: BudgetFilters = Depends(), limit: int = Query(20, ge=1, le=1000)):
+    return await budget_search.totals_by_client(db, filters.match, limit)
+
+@api_router.get("/budgets/aggregates/months")
+async def get_budget_totals_by_month(filters: BudgetFilters = Depends()):
+    return await budget_search.totals_by_month(db, filters.match)
+
+@api_router.get("/budgets/aggregates/items")
+async def get_budget_top_items(filters: BudgetFilters = Depends(), limit: int = Query(20, ge=1, le=1000)):
+    return await budget_search.top_items(db, filters.match, limit)
+
+@api_router.get("/budgets/summary", response_model=List[BudgetSummary])
+async def get_budget_summaries(response: Response, page: PageParams = Depends()):
+    # Mesma paginação de /budgets, sem os itens: o custo não cresce com o número de linhas
+    return await list_documents(budgets_repo, {}, page, response, budget_search.SUMMARY_PROJECTION, BudgetSummary)
 
 @api_router.get("/budgets", response_model=List[Budget])
-async def get_budgets():
-    budgets = await db.budgets.find({}, {"_id": 0}).to_list(1000)
-    for budget in budgets:
-        if isinstance(budget['created_at'], str):
-            budget['created_at'] = datetime.fromisoformat(budget['created_at'])
-    return budgets
+async def get_budgets(response: Response, page: PageParams = Depends()):
+    return await list_documents(budgets_repo, {}, page, response)
 
 @api_router.get("/budgets/{budget_id}", response_model=Budget)
 async def get_budget(budget_id: str):
-    budget = await db.budgets.find_one({"id": budget_id}, {"_id": 0})
-    if not budget:
+    try:
+        return await budgets_repo.get(budget_id)
+    except DocumentNotFound:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
-    if isinstance(budget['created_at'], str):
-        budget['created_at'] = datetime.fromisoformat(budget['created_at'])
-    return budget
+
+@api_router.put("/budgets/{budget_id}", response_model=Budget)
+async def update_budget(budget_id: str, budget: BudgetCreate):
+    try:
+        current = await budgets_repo.get(budget_id)
+    except DocumentNotFound:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+    budget_obj = build_budget(budget).model_copy(update={"id": budget_id, "created_at": current['created_at']})
+    doc = budget_obj.model_dump()
+    record = await revisions.prepare_update(db, current, revisions.content(doc))
+    if record is None:
+        return Budget(**current)
+
+    budget_obj = budget_obj.model_copy(update={"revision": record["revision"], "updated_at": datetime.now(timezone.utc)})
+    doc.update(revision=record["revision"], updated_at=budget_obj.updated_at)
+    try:
+        # Only replace the revision the history was computed from
+        await budgets_repo.replace_document(doc, guard={"revision": current.get('revision')})
+    except DocumentNotFound:
+        raise HTTPException(status_code=409, detail="Orçamento alterado por outra requisição, recarregue e tente novamente")
+    # History follows the live write; see revisions for recovery when this never runs
+    await revisions.store_revision(db, record)
+    return budget_obj
+
+@api_router.get("/budgets/{budget_id}/revisions", response_model=List[BudgetRevision])
+async def get_budget_revisions(budget_id: str):
+    if not await db.budgets.find_one({"id": budget_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+    return await revisions.list_revisions(db, budget_id)
+
+@api_router.get("/budgets/{budget_id}/revisions/{revision}", response_model=Budget)
+async def get_budget_revision(budget_id: str, revision: int):
+    doc = await revisions.rebuild(db, budget_id, revision)
+    if doc is None:
+        current = await db.budgets.find_one({"id": budget_id}, {"_id": 0})
+        # Budgets never updated have only their live document as revision 1
+        if current and current.get('revision', 1) == revision:
+            return current
+        raise HTTPException(status_code=404, detail="Revisão não encontrada")
+    return {**doc, "revision": revision}
 
 @api_router.delete("/budgets/{budget_id}")
 async def delete_budget(budget_id: str):
-    result = await db.budgets.delete_one({"id": budget_id})
-    if result.deleted_count == 0:
+    try:
+        await budgets_repo.delete(budget_id)
+    except DocumentNotFound:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
     return {"message": "Orçamento deletado com sucesso"}
 
+@api_router.get("/budgets/{budget_id}/bom")
+async def get_budget_bom(budget_id: str, format: Literal["json", "csv", "xlsx"] = "json"):
+    budget = await db.budgets.find_one({"id": budget_id}, {"_id": 0, "project_name": 1, "items": 1})
+    if not budget:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+    lines = await explode_budget(budget, catalog_cache)
+
+    filename = f"materiais_{budget['project_name'].replace(' ', '_')}_{budget_id[:8]}"
+    if format == "csv":
+        return StreamingResponse(
+            iter_csv(lines),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f"attachment; filename={filename}.csv"}
+        )
+    if format == "xlsx":
+        try:
+            content = build_xlsx(lines)
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Exportação XLSX indisponível: instale o pacote openpyxl")
+        return Response(
+            content,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": f"attachment; filename={filename}.xlsx"}
+        )
+    return {
+        "budget_id": budget_id,
+        "project_name": budget['project_name'],
+        "lines": lines,
+        "total": sum(line['extended_price'] for line in lines),
+    }
+
+# Catalog Repricing Routes
+REPRICE_DIFF_LIMIT = 100
+
+@api_router.post("/catalog/reprice")
+async def reprice_catalog(request: RepriceRequest):
+    # pandas/numpy load on first use instead of at worker startup
+    from repricing import reprice
+    report = await reprice(db, request.material_prices, dry_run=request.dry_run, targeted=request.targeted)
+    if not request.dry_run:
+        catalog_cache.invalidate("medium_voltage_structures")
+        catalog_cache.invalidate("low_voltage_structures")
+    return {
+        **report.summary(),
+        "dry_run": request.dry_run,
+        "structures": report.structures.head(REPRICE_DIFF_LIMIT).to_dict("records"),
+        "budgets": report.budgets.head(REPRICE_DIFF_LIMIT).to_dict("records"),
+    }
+
 @api_router.get("/budgets/{budget_id}/export-pdf")
-async def export_budget_pdf(budget_id: str):
+async def export_budget_pdf(budget_id: str, request: Request):
     budget = await db.budgets.find_one({"id": budget_id}, {"_id": 0})
     if not budget:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
-    
-    # Create PDF in memory
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1e3a8a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#334155'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    normal_style = styles['Normal']
-    
-    # Title
-    elements.append(Paragraph("ORÇAMENTO", title_style))
-    elements.append(Paragraph(f"Sistema de Orçamentação - Estruturas de Média Tensão", normal_style))
-    elements.append(Spacer(1, 0.5*cm))
-    
-    # Project Info
-    elements.append(Paragraph("INFORMAÇÕES DO PROJETO", heading_style))
-    
-    info_data = [
-        ['Projeto:', budget['project_name']],
-        ['Cliente:', budget['client_name']],
-        ['Data:', datetime.fromisoformat(budget['created_at']).strftime('%d/%m/%Y %H:%M')],
-        ['Orçamento Nº:', budget_id[:8].upper()]
-    ]
-    
-    info_table = Table(info_data, colWidths=[4*cm, 13*cm])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-    ]))
-    
-    elements.append(info_table)
-    elements.append(Spacer(1, 0.8*cm))
-    
-    # Items Table
-    elements.append(Paragraph("LISTA DE MATERIAIS E SERVIÇOS", heading_style))
-    
-    items_data = [['Item', 'Código', 'Descrição', 'Qtd', 'Preço Unit.', 'Total']]
-    
-    for idx, item in enumerate(budget['items'], 1):
-        items_data.append([
-            str(idx),
-            item['code'],
-            item['description'][:40] + '...' if len(item['description']) > 40 else item['description'],
-            str(item['quantity']),
-            f"R$ {item['unit_price']:.2f}",
-            f"R$ {item['total_price']:.2f}"
-        ])
-    
-    items_table = Table(items_data, colWidths=[1*cm, 2.5*cm, 7*cm, 1.5*cm, 2.5*cm, 2.5*cm])
-    items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (2, 1), (2, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')])
-    ]))
-    
-    elements.append(items_table)
-    elements.append(Spacer(1, 0.5*cm))
-    
-    # Summary Table
-    elements.append(Paragraph("RESUMO FINANCEIRO", heading_style))
-    
-    summary_data = [
-        ['Subtotal (Materiais):', f"R$ {budget['subtotal']:.2f}"],
-        ['Mão de Obra:', f"R$ {budget['labor_cost']:.2f}"],
-        ['Serviços Adicionais:', f"R$ {budget['additional_services']:.2f}"],
-    ]
-    
-    subtotal_with_services = budget['subtotal'] + budget['labor_cost'] + budget['additional_services']
-    summary_data.append(['Subtotal com Serviços:', f"R$ {subtotal_with_services:.2f}"])
-    
-    if budget.get('bdi_percentage', 0) > 0:
-        summary_data.append([f"BDI ({budget['bdi_percentage']:.2f}%):", f"R$ {budget['bdi_value']:.2f}"])
-    
-    summary_data.append(['', ''])  # Empty row
-    summary_data.append(['TOTAL:', f"R$ {budget['total']:.2f}"])
-    
-    summary_table = Table(summary_data, colWidths=[13*cm, 4*cm])
-    summary_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (0, -2), 'Helvetica'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -2), 10),
-        ('FONTSIZE', (0, -1), (-1, -1), 12),
-        ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#2563eb')),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#2563eb')),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#eff6ff'))
-    ]))
-    
-    elements.append(summary_table)
-    elements.append(Spacer(1, 0.5*cm))
-    
-    # Notes
-    if budget.get('notes'):
-        elements.append(Paragraph("OBSERVAÇÕES", heading_style))
-        elements.append(Paragraph(budget['notes'], normal_style))
-        elements.append(Spacer(1, 0.5*cm))
-    
-    # Footer
-    elements.append(Spacer(1, 1*cm))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
-    elements.append(Paragraph("Documento gerado automaticamente pelo Sistema de Orçamentação", footer_style))
-    elements.append(Paragraph(f"Data de geração: {datetime.now(timezone.utc).strftime('%d/%m/%Y %H:%M')}", footer_style))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get PDF from buffer
-    buffer.seek(0)
-    
-    # Return as streaming response
+
+    # The cache key is a hash of the budget itself, so an unchanged budget
+    # always maps to the same file and ETag.
+    digest = pdf_service.content_hash(budget)
+    etag = f'"{digest}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        path = await pdf_service.get_or_render(budget, digest)
+    except pdf_service.PdfQueueFull as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitos PDFs em geração, tente novamente em instantes",
+            headers={"Retry-After": str(exc.retry_after)}
+        )
+
     filename = f"orcamento_{budget['project_name'].replace(' ', '_')}_{budget_id[:8]}.pdf"
-    
-    return StreamingResponse(
-        buffer,
+    return FileResponse(
+        path,
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f"attachment; filename={filename}"
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": etag
         }
     )
 
+# Bulk Import Routes
+BULK_IMPORTS = {
+    "poles": (poles_repo, PoleCreate),
+    "conductors": (conductors_repo, ConductorCreate),
+    "equipment": (equipment_repo, EquipmentCreate),
+    "medium-voltage-structures": (medium_voltage_structures_repo, MediumVoltageStructureCreate),
+    "low-voltage-structures": (low_voltage_structures_repo, LowVoltageStructureCreate),
+}
+
+def make_bulk_import_route(repo: Repository, model):
+    async def bulk_import_route(request: Request, format: Optional[Literal["csv", "ndjson", "xlsx"]] = None):
+        fmt = format or bulk_import.detect_format(request.headers.get("content-type"))
+        if fmt is None:
+            raise HTTPException(status_code=415, detail="Envie CSV, NDJSON ou XLSX (Content-Type ou ?format=)")
+        body = await request.body() if fmt == "xlsx" else request.stream()
+        try:
+            report = await repo.bulk_upsert(bulk_import.rows_for_format(fmt, body), model)
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Importação XLSX indisponível: instale o pacote openpyxl")
+        except bulk_import.ImportFormatError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return report.as_dict()
+    return bulk_import_route
+
+for path, (repo, model) in BULK_IMPORTS.items():
+    api_router.add_api_route(
+        f"/{path}/bulk",
+        make_bulk_import_route(repo, model),
+        methods=["POST"],
+        name=f"bulk_import_{repo.name}",
+    )
+
+# Batch Export Routes
+def export_query(request: ExportRequest) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if request.budget_ids is not None:
+        query['id'] = {"$in": request.budget_ids}
+    if request.client_name:
+        query['client_name'] = request.client_name
+    created_at = {}
+    if request.created_from:
+        created_at['$gte'] = request.created_from
+    if request.created_to:
+        created_at['$lte'] = request.created_to
+    if created_at:
+        query['created_at'] = created_at
+    return query
+
+def export_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    if job['status'] == 'done':
+        job['download_url'] = f"/api/exports/{job['id']}/download"
+    return job
+
+@api_router.post("/exports", status_code=202)
+async def create_export(request: ExportRequest):
+    job = await export_jobs.start_export(db, export_query(request), request.model_dump(mode="json", exclude_none=True))
+    return export_status(job)
+
+@api_router.get("/exports/{job_id}")
+async def get_export(job_id: str):
+    job = await export_jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Exportação não encontrada")
+    return export_status(job)
+
+@api_router.get("/exports/{job_id}/download")
+async def download_export(job_id: str):
+    job = await export_jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Exportação não encontrada")
+    if job['status'] != 'done':
+        raise HTTPException(status_code=409, detail="Exportação ainda não concluída")
+    path = export_jobs.archive_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Arquivo da exportação não está mais disponível")
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={path.name}"}
+    )
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Compression and conditional GETs; added before CORS so CORS wraps it
+app.add_middleware(HttpCacheMiddleware, prefix="/api", precheck=catalog_etag)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag"],
 )
 
+# Outermost, so latencies include compression and CORS
+app.add_middleware(metrics.MetricsMiddleware)
+add_observer(metrics.observe_repository)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -648,6 +938,106 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
+# ============ LIFECYCLE ============
+
+# Readiness fails when a Mongo ping takes longer than this
+READY_MAX_LATENCY_MS = float(os.environ.get('READY_MAX_LATENCY_MS', 500))
+PROBE_TIMEOUT_SECONDS = float(os.environ.get('PROBE_TIMEOUT_SECONDS', 2))
+app.state.ready = False
+
+async def check_migrations():
+    """Refuse to start while stored data needs a migration this code relies on.
+
+    Reads assume BSON dates, BDI fields and so on; a budget still holding an
+    ISO string timestamp would break pagination cursors, the PDF and the
+    monthly totals. REQUIRE_MIGRATIONS=0 skips the check.
+    """
+    if os.environ.get('REQUIRE_MIGRATIONS', '1') == '0':
+        return
+    try:
+        left = await migrations.outstanding(db)
+    except PyMongoError:
+        # Mongo is unreachable; readiness reports it
+        logger.exception("Não foi possível verificar as migrações pendentes")
+        return
+    if left:
+        versions = ", ".join(migration.version for migration in left)
+        raise RuntimeError(f"Migrações pendentes: {versions}. Rode scripts/migrate_budgets.py antes de iniciar o servidor")
+
+async def ensure_db_indexes():
+    if os.environ.get('MONGO_AUTO_INDEXES', '1') == '0':
+        return
+    try:
+        report = await ensure_indexes(db)
+    except Exception:
+        logger.exception("Não foi possível reconciliar os índices do MongoDB")
+        return
+    created = [f"{e['collection']}.{e['index']}" for e in report if e['action'] == 'created']
+    if created:
+        logger.info("Índices criados: %s", ", ".join(created))
+
+async def ensure_material_index():
+    try:
+        await material_index.rebuild_if_empty(db)
+    except Exception:
+        logger.exception("Não foi possível reconstruir o índice de materiais")
+
+async def warm_up_mongo():
+    connections = mongo_pool.warm_connection_count(mongo_options)
+    try:
+        slowest = await mongo_pool.warm_up(db, connections)
+    except Exception:
+        logger.exception("Não foi possível aquecer o pool de conexões do MongoDB")
+        return
+    logger.info("Pool do MongoDB aquecido: %d conexões (ping mais lento %.1f ms)", connections, slowest)
+
+async def preload_catalog_cache():
+    if os.environ.get('CATALOG_CACHE_PRELOAD', '0') != '1':
+        return
+    try:
+        await asyncio.gather(*(catalog_cache.get(name) for name in catalog_cache.collections))
+    except Exception:
+        logger.exception("Não foi possível pré-carregar o cache de catálogos")
+
+async def startup():
+    await warm_up_mongo()
+    await check_migrations()
+    await ensure_db_indexes()
+    await ensure_material_index()
+    await preload_catalog_cache()
+    # Change streams need a replica set; single-node deployments rely on the
+    # invalidation done by the write handlers of this process.
+    if os.environ.get('CATALOG_CACHE_CHANGE_STREAM', '0') == '1':
+        app.state.catalog_watcher = asyncio.create_task(catalog_cache.watch())
+    app.state.ready = True
+
+async def shutdown():
+    app.state.ready = False
+    watcher = getattr(app.state, 'catalog_watcher', None)
+    if watcher:
+        watcher.cancel()
+    export_jobs.cancel_all()
+    pdf_service.shutdown()
     client.close()
+
+async def mongo_status() -> Dict[str, Any]:
+    try:
+        latency = await mongo_pool.ping(db, PROBE_TIMEOUT_SECONDS)
+    except Exception as exc:
+        return {"ok": False, "error": str(exc) or type(exc).__name__}
+    return {"ok": latency <= READY_MAX_LATENCY_MS, "latency_ms": round(latency, 2)}
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    # Liveness: the process answers; Mongo is reported but never fails it,
+    # so a database outage does not restart every worker
+    return {"status": "ok", "mongo": await mongo_status()}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    if not app.state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    mongo = await mongo_status()
+    if not mongo["ok"]:
+        return JSONResponse({"status": "unavailable", "mongo": mongo}, status_code=503)
+    return {"status": "ready", "mongo": mongo}
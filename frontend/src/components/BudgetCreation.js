@@ -33,20 +33,16 @@ function BudgetCreation() {
 
   const loadAvailableItems = async () => {
     try {
-      const [poles, mediumVoltage, lowVoltage, conductors, equipment] = await Promise.all([
-        axios.get(`${API}/poles`),
-        axios.get(`${API}/medium-voltage-structures`),
-        axios.get(`${API}/low-voltage-structures`),
-        axios.get(`${API}/conductors`),
-        axios.get(`${API}/equipment`)
-      ]);
-      
+      // Todos os catálogos em uma única requisição
+      const response = await axios.get(`${API}/catalog/bundle`);
+      const { catalogs } = response.data;
+
       setAvailableItems({
-        poles: poles.data,
-        medium_voltage_structures: mediumVoltage.data,
-        low_voltage_structures: lowVoltage.data,
-        conductors: conductors.data,
-        equipment: equipment.data
+        poles: catalogs.poles,
+        medium_voltage_structures: catalogs.medium_voltage_structures,
+        low_voltage_structures: catalogs.low_voltage_structures,
+        conductors: catalogs.conductors,
+        equipment: catalogs.equipment
       });
     } catch (error) {
       toast.error('Erro ao carregar itens disponíveis');
@@ -1,27 +1,54 @@
 import { useState, useEffect } from 'react';
-import { FileText, Eye, Trash2, Download } from 'lucide-react';
+import { FileText, Eye, Trash2, Download, Search } from 'lucide-react';
 import { API } from '../App';
 import axios from 'axios';
 import { toast } from 'sonner';
 
+const PAGE_SIZE = 200;
+
 function BudgetList() {
   const [budgets, setBudgets] = useState([]);
+  const [totalCount, setTotalCount] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [searchTerm, setSearchTerm] = useState('');
   const [selectedBudget, setSelectedBudget] = useState(null);
   const [showDetails, setShowDetails] = useState(false);
 
   useEffect(() => {
-    loadBudgets();
-  }, []);
+    // Debounce: busca no servidor só depois que o usuário para de digitar
+    const timeout = setTimeout(() => loadBudgets(searchTerm), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
+
+  const searchPage = async (term, offset) => {
+    const params = { limit: PAGE_SIZE, offset };
+    if (term.trim()) params.q = term.trim();
+    const response = await axios.get(`${API}/budgets/search`, { params });
+    setTotalCount(response.data.total_count);
+    return response.data.results;
+  };
 
-  const loadBudgets = async () => {
+  const loadBudgets = async (term = searchTerm) => {
     try {
-      const response = await axios.get(`${API}/budgets`);
-      setBudgets(response.data);
+      setBudgets(await searchPage(term, 0));
     } catch (error) {
       toast.error('Erro ao carregar orçamentos');
     }
   };
 
+  // A busca é paginada: as próximas páginas são acrescentadas à lista
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const results = await searchPage(searchTerm, budgets.length);
+      setBudgets((current) => [...current, ...results]);
+    } catch (error) {
+      toast.error('Erro ao carregar orçamentos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id) => {
     if (window.confirm('Deseja realmente excluir este orçamento?')) {
       try {
@@ -88,6 +115,23 @@ function BudgetList() {
         <p className="text-slate-600">Visualize e gerencie orçamentos criados</p>
       </div>
 
+      <div className="mb-4 flex items-center gap-3">
+        <div className="relative flex-1 max-w-md">
+          <Search size={18} className="absolute left-3 top-1/2 -translate-y-1/2 text-slate-400" />
+          <input
+            type="text"
+            value={searchTerm}
+            onChange={(e) => setSearchTerm(e.target.value)}
+            placeholder="Buscar por projeto ou cliente"
+            className="w-full pl-10"
+            data-testid="budget-search-input"
+          />
+        </div>
+        {totalCount > budgets.length && (
+          <span className="text-sm text-slate-500">Mostrando {budgets.length} de {totalCount}</span>
+        )}
+      </div>
+
       <div className="table-container" data-testid="budgets-table">
         <table>
           <thead>
@@ -113,7 +157,7 @@ function BudgetList() {
                   <td className="font-medium">{budget.project_name}</td>
                   <td>{budget.client_name}</td>
                   <td className="font-semibold text-blue-600">R$ {budget.total.toFixed(2)}</td>
-                  <td>{budget.items.length}</td>
+                  <td>{budget.item_count}</td>
                   <td className="text-sm text-slate-600">{formatDate(budget.created_at)}</td>
                   <td>
                     <div className="flex gap-2">
@@ -150,6 +194,19 @@ function BudgetList() {
         </table>
       </div>
 
+      {totalCount > budgets.length && (
+        <div className="mt-4 flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="btn-secondary"
+            data-testid="load-more-budgets-btn"
+          >
+            {loadingMore ? 'Carregando...' : `Carregar mais (${totalCount - budgets.length} restantes)`}
+          </button>
+        </div>
+      )}
+
       {/* Details Modal */}
       {showDetails && selectedBudget && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50 p-4" data-testid="budget-details-modal">
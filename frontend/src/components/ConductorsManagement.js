@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Plus, Trash2, Zap, Edit } from 'lucide-react';
 import { API } from '../App';
 import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function ConductorsManagement() {
@@ -28,20 +29,20 @@ function ConductorsManagement() {
   const loadDropdownOptions = async () => {
     try {
       const [types, insulation, config] = await Promise.all([
-        axios.get(`${API}/dropdown-options/conductor_types`),
-        axios.get(`${API}/dropdown-options/conductor_insulation`),
-        axios.get(`${API}/dropdown-options/conductor_configuration`)
+        fetchAll(`${API}/dropdown-options/conductor_types`),
+        fetchAll(`${API}/dropdown-options/conductor_insulation`),
+        fetchAll(`${API}/dropdown-options/conductor_configuration`)
       ]);
-      setConductorTypes(types.data);
-      setInsulationTypes(insulation.data);
-      setConfigurationTypes(config.data);
+      setConductorTypes(types);
+      setInsulationTypes(insulation);
+      setConfigurationTypes(config);
       
       if (!editingId) {
         setFormData(prev => ({
           ...prev,
-          type: types.data[0]?.value || 'Cobre',
-          insulation: insulation.data[0]?.value || 'XLPE',
-          configuration: config.data[0]?.value || 'Simples'
+          type: types[0]?.value || 'Cobre',
+          insulation: insulation[0]?.value || 'XLPE',
+          configuration: config[0]?.value || 'Simples'
         }));
       }
     } catch (error) {
@@ -51,8 +52,7 @@ function ConductorsManagement() {
 
   const loadConductors = async () => {
     try {
-      const response = await axios.get(`${API}/conductors`);
-      setConductors(response.data);
+      setConductors(await fetchAll(`${API}/conductors`));
     } catch (error) {
       toast.error('Erro ao carregar condutores');
     }
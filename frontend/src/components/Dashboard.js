@@ -20,23 +20,22 @@ function Dashboard() {
 
   const loadStats = async () => {
     try {
-      const [poles, mediumVoltage, lowVoltage, conductors, equipment, budgets] = await Promise.all([
-        axios.get(`${API}/poles`),
-        axios.get(`${API}/medium-voltage-structures`),
-        axios.get(`${API}/low-voltage-structures`),
-        axios.get(`${API}/conductors`),
-        axios.get(`${API}/equipment`),
-        axios.get(`${API}/budgets`)
+      const [bundle, budgets] = await Promise.all([
+        // Catálogos completos; as rotas de listagem param na primeira página
+        axios.get(`${API}/catalog/bundle`),
+        // Só a contagem: evita baixar todos os orçamentos com seus itens
+        axios.get(`${API}/budgets/search`, { params: { limit: 1 } })
       ]);
+      const { catalogs } = bundle.data;
 
       setStats({
-        poles: poles.data.length,
-        primaryStructures: mediumVoltage.data.length,
-        secondaryStructures: lowVoltage.data.length,
-        conductors: conductors.data.length,
-        equipment: equipment.data.length,
+        poles: catalogs.poles.length,
+        primaryStructures: catalogs.medium_voltage_structures.length,
+        secondaryStructures: catalogs.low_voltage_structures.length,
+        conductors: catalogs.conductors.length,
+        equipment: catalogs.equipment.length,
         hardware: 0,
-        budgets: budgets.data.length
+        budgets: budgets.data.total_count
       });
     } catch (error) {
       console.error('Erro ao carregar estatísticas:', error);
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Plus, Trash2, Settings } from 'lucide-react';
 import { API } from '../App';
 import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function DropdownManager() {
@@ -27,8 +28,7 @@ function DropdownManager() {
 
   const loadOptions = async () => {
     try {
-      const response = await axios.get(`${API}/dropdown-options/${selectedCategory}`);
-      setOptions(response.data);
+      setOptions(await fetchAll(`${API}/dropdown-options/${selectedCategory}`));
     } catch (error) {
       toast.error('Erro ao carregar opções');
     }
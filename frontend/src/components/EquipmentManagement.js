@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Plus, Trash2, Wrench, Edit } from 'lucide-react';
 import { API } from '../App';
 import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function EquipmentManagement() {
@@ -24,10 +25,10 @@ function EquipmentManagement() {
 
   const loadCategories = async () => {
     try {
-      const response = await axios.get(`${API}/dropdown-options/equipment_categories`);
-      setEquipmentCategories(response.data);
-      if (response.data.length > 0 && !editingId) {
-        setFormData(prev => ({ ...prev, category: response.data[0].value }));
+      const categories = await fetchAll(`${API}/dropdown-options/equipment_categories`);
+      setEquipmentCategories(categories);
+      if (categories.length > 0 && !editingId) {
+        setFormData(prev => ({ ...prev, category: categories[0].value }));
       }
     } catch (error) {
       console.error('Erro ao carregar categorias:', error);
@@ -36,8 +37,7 @@ function EquipmentManagement() {
 
   const loadEquipment = async () => {
     try {
-      const response = await axios.get(`${API}/equipment`);
-      setEquipment(response.data);
+      setEquipment(await fetchAll(`${API}/equipment`));
     } catch (error) {
       toast.error('Erro ao carregar equipamentos');
     }
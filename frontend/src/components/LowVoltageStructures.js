@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Package, ChevronDown, ChevronUp } from 'lucide-react';
 import { API } from '../App';
-import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function LowVoltageStructures() {
@@ -14,8 +14,7 @@ function LowVoltageStructures() {
 
   const loadStructures = async () => {
     try {
-      const response = await axios.get(`${API}/low-voltage-structures`);
-      setStructures(response.data);
+      setStructures(await fetchAll(`${API}/low-voltage-structures`));
     } catch (error) {
       toast.error('Erro ao carregar estruturas');
     }
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Package, ChevronDown, ChevronUp } from 'lucide-react';
 import { API } from '../App';
-import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function MediumVoltageStructures() {
@@ -14,8 +14,7 @@ function MediumVoltageStructures() {
 
   const loadStructures = async () => {
     try {
-      const response = await axios.get(`${API}/medium-voltage-structures`);
-      setStructures(response.data);
+      setStructures(await fetchAll(`${API}/medium-voltage-structures`));
     } catch (error) {
       toast.error('Erro ao carregar estruturas');
     }
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Plus, Trash2, Database, Edit } from 'lucide-react';
 import { API } from '../App';
 import axios from 'axios';
+import { fetchAll } from '../lib/api';
 import { toast } from 'sonner';
 
 function PolesManagement() {
@@ -24,10 +25,10 @@ function PolesManagement() {
 
   const loadPoleTypes = async () => {
     try {
-      const response = await axios.get(`${API}/dropdown-options/pole_types`);
-      setPoleTypes(response.data);
-      if (response.data.length > 0 && !editingId) {
-        setFormData(prev => ({ ...prev, type: response.data[0].value }));
+      const options = await fetchAll(`${API}/dropdown-options/pole_types`);
+      setPoleTypes(options);
+      if (options.length > 0 && !editingId) {
+        setFormData(prev => ({ ...prev, type: options[0].value }));
       }
     } catch (error) {
       console.error('Erro ao carregar tipos de postes:', error);
@@ -36,8 +37,7 @@ function PolesManagement() {
 
   const loadPoles = async () => {
     try {
-      const response = await axios.get(`${API}/poles`);
-      setPoles(response.data);
+      setPoles(await fetchAll(`${API}/poles`));
     } catch (error) {
       toast.error('Erro ao carregar postes');
     }
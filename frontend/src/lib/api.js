@@ -0,0 +1,19 @@
+import axios from 'axios';
+
+// Maior página aceita pelas rotas de listagem (MAX_PAGE_SIZE no backend)
+const MAX_PAGE_SIZE = 5000;
+
+// As rotas de listagem são paginadas: segue o cursor X-Next-Cursor até a
+// última página e devolve a lista completa
+export async function fetchAll(url, params = {}) {
+  const items = [];
+  let after = null;
+  do {
+    const pageParams = { ...params, limit: MAX_PAGE_SIZE };
+    if (after) pageParams.after = after;
+    const response = await axios.get(url, { params: pageParams });
+    items.push(...response.data);
+    after = response.headers['x-next-cursor'];
+  } while (after);
+  return items;
+}
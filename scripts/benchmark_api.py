@@ -0,0 +1,517 @@
+import asyncio
+import argparse
+import json
+import math
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+sys.path.append('/app/backend')
+
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+import seed_data
+
+# Load environment
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+# Benchmark against a scratch database, never the real one
+BENCH_DB = os.environ['DB_NAME'] + '_bench'
+os.environ['DB_NAME'] = BENCH_DB
+
+# Imported in main(), once MONGO_URL points at the database to measure
+server = None
+
+DEFAULT_ITEM_COUNTS = (10, 100, 1000, 5000)
+DEFAULT_CONDUCTORS = 10000
+IMPORT_PROFILE_NAME = "import server"
+# Relative change of p95 latency or throughput reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# ============ LOCAL MONGOD ============
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_mongod(binary: str):
+    """Start a throwaway mongod on a free port; returns (process, dbpath, url)."""
+    dbpath = tempfile.mkdtemp(prefix="benchmark_mongod_")
+    port = _free_port()
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"mongod terminou com código {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process, dbpath, f"mongodb://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("mongod não respondeu em 30s")
+
+def stop_mongod(process, dbpath: str) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    shutil.rmtree(dbpath, ignore_errors=True)
+
+# ============ IN-MEMORY MONGO ============
+
+def use_mongomock():
+    """Point the app at an in-memory mongomock-motor database, as the tests do.
+
+    Handy without a mongod; latencies then leave out the real database, so
+    compare such reports only with each other.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+    from repository import Repository
+
+    server.client = AsyncMongoMockClient(tz_aware=True)
+    server.db = server.client[BENCH_DB]
+    server.catalog_cache.db = server.db
+    server.catalog_cache.invalidate_all()
+    for value in vars(server).values():
+        if isinstance(value, Repository):
+            value.db = server.db
+
+# ============ ASGI DRIVER ============
+
+async def asgi_request(method, path, params=None, body=None, headers=()):
+    """Run one request through the ASGI app in-process (no network, no HTTP server)."""
+    query = urlencode(params or {}).encode()
+    payload = json.dumps(body).encode() if body is not None else b""
+    request_headers = [(b"host", b"benchmark"), *headers]
+    if body is not None:
+        request_headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+        "root_path": "", "headers": request_headers,
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    status, response_headers, chunks = None, {}, []
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await server.app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+async def asgi_get(path, params=None):
+    return await asgi_request("GET", path, params)
+
+def _check(path, status, body, expected=200):
+    if status != expected:
+        raise RuntimeError(f"{path} respondeu {status}: {body[:200]!r}")
+
+async def fetch_all(path):
+    """Follow X-Next-Cursor until the whole list was read; returns the bytes read."""
+    params = {"limit": server.MAX_PAGE_SIZE}
+    size = 0
+    while True:
+        status, headers, body = await asgi_get(path, params)
+        _check(path, status, body)
+        size += len(body)
+        if "x-next-cursor" not in headers:
+            return size
+        params["after"] = headers["x-next-cursor"]
+
+# ============ SYNTHETIC DATA ============
+
+def _scaled(rows, scale, rng, start):
+    """``scale`` copies of the seed_data catalog rows, with unique codes and jittered prices."""
+    docs = []
+    for copy in range(scale):
+        for row in rows:
+            doc = json.loads(json.dumps(row))
+            doc["id"] = str(uuid.UUID(int=rng.getrandbits(128)))
+            if copy:
+                doc["code"] = f"{row['code']}-{copy:05d}"
+            if "unit_price" in doc:
+                doc["unit_price"] = round(row["unit_price"] * rng.uniform(0.8, 1.2), 2)
+            if "materials" in doc:
+                doc["total_price"] = round(sum(m["quantity"] * m["unit_price"] for m in doc["materials"]), 2)
+            doc["created_at"] = start + timedelta(milliseconds=len(docs))
+            docs.append(doc)
+    return docs
+
+def _budget_item(item_type, doc, rng):
+    descriptions = {
+        "pole": lambda d: f"Poste {d['type']} {d['height']}m {d['capacity']}daN",
+        "conductor": lambda d: f"Condutor {d['type']} {d['section']} {d['insulation']}",
+    }
+    quantity = rng.randint(1, 20)
+    unit_price = doc.get("unit_price", doc.get("total_price", 0.0))
+    return {
+        "item_id": doc["id"],
+        "item_type": item_type,
+        "code": doc["code"],
+        "description": descriptions.get(item_type, lambda d: d["description"])(doc),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_price": round(quantity * unit_price, 2),
+    }
+
+def budget_payload(catalog, items, rng, name="Benchmark"):
+    item_types = list(catalog)
+    lines = []
+    for _ in range(items):
+        item_type = rng.choice(item_types)
+        lines.append(_budget_item(item_type, rng.choice(catalog[item_type]), rng))
+    return {"project_name": f"{name} {items} itens", "client_name": f"Cliente {rng.randint(1, 50):02d}", "items": lines}
+
+async def seed(args, rng):
+    # The catalogs shipped by the populate scripts, scaled up
+    await server.client.drop_database(BENCH_DB)
+    await server.ensure_indexes(server.db)
+
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    catalogs = {
+        ("poles", "pole"): seed_data.postes_data,
+        ("conductors", "conductor"): seed_data.conductors_data,
+        ("equipment", "equipment"): seed_data.equipment_data,
+        ("medium_voltage_structures", "medium_voltage_structure"): seed_data.medium_voltage_structures,
+        ("low_voltage_structures", "low_voltage_structure"): seed_data.low_voltage_structures,
+    }
+    catalog = {}
+    for (collection, item_type), rows in catalogs.items():
+        if collection == "conductors":
+            # Sized for the FAST_JSON comparison rather than by --scale
+            docs = _scaled(rows, math.ceil(args.conductors / len(rows)), rng, start)[:args.conductors]
+        else:
+            docs = _scaled(rows, args.scale, rng, start)
+        for offset in range(0, len(docs), 1000):
+            await server.db[collection].insert_many(docs[offset:offset + 1000], ordered=False)
+        catalog[item_type] = docs
+        server.catalog_cache.invalidate(collection)
+
+    budgets = []
+    for i in range(args.budgets):
+        budget = server.build_budget(server.BudgetCreate(**budget_payload(catalog, rng.randint(5, 60), rng, f"Obra {i:05d}")))
+        budget = budget.model_copy(update={"created_at": start + timedelta(seconds=i)})
+        budgets.append(budget.model_dump())
+    for offset in range(0, len(budgets), 1000):
+        await server.db.budgets.insert_many(budgets[offset:offset + 1000], ordered=False)
+    return catalog
+
+# ============ MEASUREMENT ============
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def measure(operation, requests, concurrency=1, warmup=1):
+    """Run ``operation`` ``requests`` times; latency percentiles and throughput."""
+    for _ in range(warmup):
+        await operation()
+    latencies = []
+    sizes = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            sizes.append(await operation())
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "req_per_s": round(requests / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "bytes": int(sum(sizes) / len(sizes)),
+    }
+
+def scenarios(args, catalog, rng):
+    async def get_poles():
+        return await fetch_all("/api/poles")
+
+    async def get_bundle():
+        status, _, body = await asgi_get("/api/catalog/bundle")
+        _check("/api/catalog/bundle", status, body)
+        return len(body)
+
+    async def get_budgets():
+        status, _, body = await asgi_get("/api/budgets", {"limit": args.page_size})
+        _check("/api/budgets", status, body)
+        return len(body)
+
+    def post_budget(items):
+        payload = budget_payload(catalog, items, rng)
+
+        async def run():
+            status, _, body = await asgi_request("POST", "/api/budgets", body=payload)
+            _check("/api/budgets", status, body)
+            return len(body)
+        return run
+
+    pdf_budget = {}
+
+    async def export_pdf(cold):
+        if not pdf_budget:
+            status, _, body = await asgi_request("POST", "/api/budgets", body=budget_payload(catalog, args.pdf_items, rng))
+            _check("/api/budgets", status, body)
+            pdf_budget.update(json.loads(body))
+        path = f"/api/budgets/{pdf_budget['id']}/export-pdf"
+        if cold:
+            # Drop the cached file so every request renders
+            for cached in server.pdf_service.PDF_CACHE_DIR.glob("*.pdf"):
+                cached.unlink(missing_ok=True)
+        status, _, body = await asgi_get(path)
+        _check(path, status, body)
+        return len(body)
+
+    plan = [
+        ("GET /api/poles", get_poles, args.requests),
+        ("GET /api/catalog/bundle", get_bundle, args.requests),
+        ("GET /api/budgets", get_budgets, args.requests),
+    ]
+    for items in args.item_counts:
+        plan.append((f"POST /api/budgets ({items} itens)", post_budget(items), max(1, args.requests // max(1, items // 100))))
+    plan.append(("GET export-pdf (cache)", lambda: export_pdf(False), args.requests))
+    plan.append(("GET export-pdf (render)", lambda: export_pdf(True), args.pdf_requests))
+    return plan
+
+def fast_json_name(fast):
+    return f"GET /api/conductors (FAST_JSON={int(fast)})"
+
+async def compare_fast_json(args, report):
+    """Full conductor listing through response_model (FAST_JSON=0), then from pre-serialized JSON (FAST_JSON=1)."""
+    async def get_conductors():
+        return await fetch_all("/api/conductors")
+
+    configured = server.FAST_JSON
+    try:
+        for fast in (False, True):
+            server.FAST_JSON = fast
+            print(f"  {fast_json_name(fast)}...")
+            report["results"][fast_json_name(fast)] = await measure(get_conductors, args.requests, args.concurrency)
+    finally:
+        server.FAST_JSON = configured
+    before, after = (report["results"][fast_json_name(fast)]["req_per_s"] for fast in (False, True))
+    report["fast_json"] = {"rows": args.conductors, "speedup": round(after / before, 2) if before else None}
+
+# ============ STARTUP ============
+
+def _importtime_rows(stderr):
+    """(cumulative µs, depth, module) per ``-X importtime`` line."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        yield int(cumulative_us), depth, name.strip()
+
+def profile_import(runs, top=10):
+    """Cold ``import server`` time in a fresh interpreter (best of ``runs``) and its slowest imports."""
+    timings, slowest = [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import server"],
+                                cwd=ROOT_DIR, capture_output=True, text=True, env=os.environ.copy())
+        if result.returncode != 0:
+            raise RuntimeError(f"import server falhou: {result.stderr[-500:]}")
+        rows = list(_importtime_rows(result.stderr))
+        index = next(i for i, row in enumerate(rows) if row[2] == "server")
+        cumulative_us, depth, _ = rows[index]
+        timings.append(cumulative_us / 1000)
+        if timings[-1] == min(timings):
+            # A module's imports are listed before it; walk back to server.py's direct ones
+            children = []
+            for row in reversed(rows[:index]):
+                if row[1] <= depth:
+                    break
+                if row[1] == depth + 1:
+                    children.append(row)
+            slowest = [{"module": name, "ms": round(us / 1000, 1)} for us, _, name in sorted(children, reverse=True)[:top]]
+    return {"import_ms": round(min(timings), 1), "runs_ms": [round(t, 1) for t in timings], "slowest_imports": slowest}
+
+# ============ REPORT ============
+
+def compare(report, baseline, threshold):
+    """Regressions of ``report`` against ``baseline``: slower p95 or lower throughput."""
+    regressions = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        throughput_change = result["req_per_s"] / before["req_per_s"] - 1 if before["req_per_s"] else 0.0
+        result["baseline"] = {"p95_ms": before["p95_ms"], "req_per_s": before["req_per_s"],
+                              "p95_change": round(p95_change, 4), "throughput_change": round(throughput_change, 4)}
+        if p95_change > threshold or throughput_change < -threshold:
+            regressions.append(name)
+    startup, before = report.get("startup"), baseline.get("startup")
+    if startup and before and before.get("import_ms"):
+        change = startup["import_ms"] / before["import_ms"] - 1
+        startup["baseline"] = {"import_ms": before["import_ms"], "import_change": round(change, 4)}
+        if change > threshold:
+            regressions.append(IMPORT_PROFILE_NAME)
+    return regressions
+
+def print_startup(report, max_import_ms):
+    startup = report["startup"]
+    line = f"\n{IMPORT_PROFILE_NAME}: {startup['import_ms']:.0f} ms (melhor de {len(startup['runs_ms'])})"
+    if "baseline" in startup:
+        line += f", {startup['baseline']['import_change']:+.1%} vs. baseline"
+    if max_import_ms:
+        line += f", limite {max_import_ms:.0f} ms"
+    if IMPORT_PROFILE_NAME in report.get("regressions", []):
+        line += "  REGRESSÃO"
+    print(line)
+    for entry in startup["slowest_imports"]:
+        print(f"  {entry['module']:<30} {entry['ms']:>8.1f} ms")
+
+def print_report(report):
+    print(f"\n{'cenário':<36} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}   vs. baseline")
+    for name, result in report["results"].items():
+        line = (f"{name:<36} {result['req_per_s']:>9.1f} {result['p50_ms']:>9.2f} "
+                f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+        if "baseline" in result:
+            base = result["baseline"]
+            flag = "  REGRESSÃO" if name in report.get("regressions", []) else ""
+            line += f"   p95 {base['p95_change']:+.1%}, req/s {base['throughput_change']:+.1%}{flag}"
+        print(line)
+    if report.get("fast_json", {}).get("speedup"):
+        fast_json = report["fast_json"]
+        print(f"\nFAST_JSON com {fast_json['rows']} condutores: {fast_json['speedup']:.1f}x mais listagens por segundo")
+
+async def run_api_scenarios(args, report):
+    rng = random.Random(args.seed)
+    print(f"Populando {BENCH_DB} (escala {args.scale}, {args.budgets} orçamentos)...")
+    catalog = await seed(args, rng)
+    server.pdf_service.PDF_CACHE_DIR = Path(tempfile.mkdtemp(prefix="benchmark_pdf_"))
+    report["config"]["fast_json"] = server.FAST_JSON
+    try:
+        for name, operation, requests in scenarios(args, catalog, rng):
+            print(f"  {name}...")
+            report["results"][name] = await measure(operation, requests, args.concurrency)
+        await compare_fast_json(args, report)
+    finally:
+        server.pdf_service.shutdown()
+        shutil.rmtree(server.pdf_service.PDF_CACHE_DIR, ignore_errors=True)
+        if not args.keep:
+            await server.client.drop_database(BENCH_DB)
+        server.client.close()
+
+def finish(args, report):
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.threshold)
+    if args.max_import_ms and report["startup"]["import_ms"] > args.max_import_ms \
+            and IMPORT_PROFILE_NAME not in regressions:
+        regressions.append(IMPORT_PROFILE_NAME)
+    report["regressions"] = regressions
+
+    print_startup(report, args.max_import_ms)
+    if report["results"]:
+        print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\nRelatório gravado em {args.output}")
+    if regressions:
+        print(f"\n{len(regressions)} regressões: {', '.join(regressions)}")
+        return 1
+    return 0
+
+def main(args):
+    global server
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "scale": args.scale, "conductors": args.conductors, "budgets": args.budgets, "requests": args.requests,
+            "concurrency": args.concurrency, "seed": args.seed,
+            "mongo": "mongomock" if args.mongomock else "mongod",
+        },
+        "results": {},
+    }
+    # Each run is a fresh interpreter, i.e. what a new worker pays before serving
+    print("Medindo o tempo de importação do servidor...")
+    report["startup"] = profile_import(args.import_runs)
+    if args.import_only:
+        return finish(args, report)
+
+    mongod = None
+    if args.mongod:
+        mongod = start_mongod(args.mongod)
+        os.environ['MONGO_URL'] = mongod[2]
+        print(f"mongod local em {mongod[2]}")
+    try:
+        import server as app_server
+        server = app_server
+        if args.mongomock:
+            use_mongomock()
+        asyncio.run(run_api_scenarios(args, report))
+    finally:
+        if mongod:
+            stop_mongod(*mongod[:2])
+    return finish(args, report)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede vazão e latência (p50/p95/p99) das rotas críticas da API")
+    parser.add_argument('--mongod', nargs='?', const='mongod', default=None,
+                        help="inicia um mongod temporário (caminho do binário opcional) em vez de usar MONGO_URL")
+    parser.add_argument('--mongomock', action='store_true',
+                        help="usa um banco em memória (mongomock-motor); não compare com relatórios de um mongod")
+    parser.add_argument('--scale', type=int, default=100, help="cópias de cada item dos catálogos de seed_data.py")
+    parser.add_argument('--conductors', type=int, default=DEFAULT_CONDUCTORS,
+                        help="condutores listados com FAST_JSON=0 e FAST_JSON=1 (antes/depois)")
+    parser.add_argument('--budgets', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--pdf-requests', type=int, default=5, help="requisições do cenário de PDF sem cache")
+    parser.add_argument('--pdf-items', type=int, default=100)
+    parser.add_argument('--item-counts', type=int, nargs='+', default=list(DEFAULT_ITEM_COUNTS))
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="grava o relatório JSON neste arquivo")
+    parser.add_argument('--baseline', help="relatório JSON anterior para comparação")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="variação tolerada (0.10 = 10%%)")
+    parser.add_argument('--keep', action='store_true', help=f"mantém o banco {BENCH_DB} ao final")
+    parser.add_argument('--import-runs', type=int, default=3, help="execuções de python -X importtime")
+    parser.add_argument('--max-import-ms', type=float, help="falha se importar o servidor levar mais que isso")
+    parser.add_argument('--import-only', action='store_true', help="mede apenas o tempo de importação, sem MongoDB")
+    args = parser.parse_args()
+    if args.mongod and args.mongomock:
+        parser.error("use --mongod ou --mongomock, não os dois")
+    sys.exit(main(args))
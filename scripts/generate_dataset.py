@@ -0,0 +1,327 @@
+import asyncio
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import uuid
+sys.path.append('/app/backend')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+import material_index
+from indexes import ensure_indexes
+from pricing import ITEM_SOURCES, compute_totals
+import seed_data
+
+try:
+    import orjson
+except ImportError:  # optional: only speeds up the NDJSON output
+    orjson = None
+
+# Load environment
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_ITEMS_PER_BUDGET = 5000
+
+POLE_TYPES = ("Concreto", "Duplo T", "Fibra", "Especial")
+POLE_HEIGHTS = (7, 8, 9, 10, 11, 12, 13, 14, 15)
+POLE_CAPACITIES = (150, 300, 400, 600, 1000, 1500)
+CONDUCTOR_TYPES = ("Alumínio", "Cobre", "AAAC", "CAA")
+CONDUCTOR_SECTIONS = ("16 mm²", "25 mm²", "35 mm²", "50 mm²", "70 mm²", "95 mm²", "120 mm²", "185 mm²",
+                      "2 AWG", "1/0 AWG", "4/0 AWG", "336,4 MCM")
+CONDUCTOR_INSULATIONS = ("XLPE", "PVC", "EPR", "Nu")
+CONDUCTOR_CONFIGURATIONS = ("Simples", "Multiplexado", "Duplex", "Triplex", "Quadruplex")
+VOLTAGE_CLASSES = {"medium_voltage_structures": ("13.8kV", "15kV", "34.5kV"),
+                   "low_voltage_structures": ("220V", "380V")}
+
+def _populate_catalogs():
+    # Base rows shipped with the populate scripts, used as templates
+    materials = {}
+    for structure in seed_data.medium_voltage_structures + seed_data.low_voltage_structures:
+        for material in structure['materials']:
+            materials.setdefault(material['code'], material)
+    return seed_data.equipment_data, list(materials.values())
+
+class ItemCountDistribution:
+    """Items per budget: ``fixed:N``, ``uniform:MIN-MAX`` or ``lognormal:MEDIAN[:SIGMA]``."""
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        try:
+            if kind == "fixed":
+                count = int(params)
+                self._sample = lambda rng: count
+            elif kind == "uniform":
+                low, high = (int(v) for v in params.split("-"))
+                self._sample = lambda rng: rng.randint(low, high)
+            elif kind == "lognormal":
+                median, _, sigma = params.partition(":")
+                mu, sigma = math.log(float(median)), float(sigma or 0.8)
+                self._sample = lambda rng: round(rng.lognormvariate(mu, sigma))
+            else:
+                raise ValueError(kind)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"distribuição inválida: {spec}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> int:
+        return min(MAX_ITEMS_PER_BUDGET, max(1, self._sample(rng)))
+
+class Generator:
+    """Deterministic documents: the same seed always yields the same dataset."""
+
+    def __init__(self, seed: int, start: datetime, days: int):
+        self.rng = random.Random(seed)
+        self.start = start
+        self.span_ms = days * 86_400_000
+        self.equipment_templates, self.materials = _populate_catalogs()
+
+    def _id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _created_at(self, index: int, count: int) -> datetime:
+        # Spread evenly (in insertion order) over the period, like real growth
+        return self.start + timedelta(milliseconds=index * self.span_ms // max(1, count))
+
+    def _price(self, base: float) -> float:
+        return round(base * self.rng.uniform(0.8, 1.25), 2)
+
+    def poles(self, count: int):
+        rng = self.rng
+        for i in range(count):
+            pole_type, height, capacity = rng.choice(POLE_TYPES), rng.choice(POLE_HEIGHTS), rng.choice(POLE_CAPACITIES)
+            yield {
+                "id": self._id(), "type": pole_type, "height": height, "capacity": capacity,
+                "code": f"GEN-P-{i:07d}", "unit_price": self._price(150 * height + capacity),
+                "created_at": self._created_at(i, count),
+            }
+
+    def conductors(self, count: int):
+        rng = self.rng
+        for i in range(count):
+            yield {
+                "id": self._id(), "type": rng.choice(CONDUCTOR_TYPES),
+                "insulation": rng.choice(CONDUCTOR_INSULATIONS), "section": rng.choice(CONDUCTOR_SECTIONS),
+                "code": f"GEN-C-{i:07d}", "configuration": rng.choice(CONDUCTOR_CONFIGURATIONS),
+                "unit_price": self._price(rng.uniform(5, 60)), "created_at": self._created_at(i, count),
+            }
+
+    def equipment(self, count: int):
+        for i in range(count):
+            template = self.rng.choice(self.equipment_templates)
+            yield {
+                "id": self._id(), "category": template['category'], "type": template['type'],
+                "code": f"GEN-E-{i:07d}", "description": f"{template['description']} #{i}",
+                "unit_price": self._price(template['unit_price']), "created_at": self._created_at(i, count),
+            }
+
+    def structures(self, collection: str, count: int):
+        rng = self.rng
+        prefix = "CE" if collection == "medium_voltage_structures" else "S"
+        for i in range(count):
+            materials = [
+                {**material, "quantity": rng.randint(1, 4), "unit_price": self._price(material['unit_price'])}
+                for material in rng.sample(self.materials, rng.randint(3, min(15, len(self.materials))))
+            ]
+            code = f"GEN-{prefix}{i:07d}"
+            yield {
+                "id": self._id(), "code": code, "description": f"Estrutura {code}",
+                "voltage_class": rng.choice(VOLTAGE_CLASSES[collection]), "materials": materials,
+                "total_price": round(sum(m['quantity'] * m['unit_price'] for m in materials), 2),
+                "created_at": self._created_at(i, count),
+            }
+
+    def budgets(self, count: int, catalogs, distribution: ItemCountDistribution):
+        rng = self.rng
+        # One (item_id, item_type, code, description, unit_price) row per catalog item,
+        # so each budget line is a lookup plus two multiplications
+        choices = []
+        for collection, docs in catalogs.items():
+            source = ITEM_SOURCES[collection]
+            choices += [(doc['id'], collection, doc['code'], source.describe(doc), doc[source.price_field]) for doc in docs]
+        if not choices:
+            raise ValueError("Gere ao menos um item de catálogo para compor os orçamentos")
+        for i in range(count):
+            items = []
+            for item_id, item_type, code, description, unit_price in rng.choices(choices, k=distribution.sample(rng)):
+                quantity = rng.randint(1, 50)
+                items.append({
+                    "item_id": item_id, "item_type": item_type, "code": code, "description": description,
+                    "quantity": quantity, "unit_price": unit_price, "total_price": round(quantity * unit_price, 2),
+                })
+            labor_cost = round(rng.uniform(0, 20000), 2)
+            bdi_percentage = rng.choice((0.0, 15.0, 20.0, 25.0))
+            totals = compute_totals((item['total_price'] for item in items), labor_cost, 0.0, bdi_percentage)
+            yield {
+                "id": self._id(), "project_name": f"Obra {i:07d}", "client_name": f"Cliente {rng.randint(1, 500):03d}",
+                "items": items, "labor_cost": labor_cost, "additional_services": 0.0,
+                "bdi_percentage": bdi_percentage, "bdi_value": float(totals.bdi_value),
+                "subtotal": float(totals.subtotal), "total": float(totals.total), "notes": None,
+                "created_at": self._created_at(i, count), "revision": 1, "updated_at": None,
+            }
+
+def _batches(docs, size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class MongoWriter:
+    """``insert_many`` batches, ``concurrency`` of them in flight at once."""
+
+    def __init__(self, db, batch_size: int, concurrency: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    async def write(self, collection: str, docs) -> int:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+        failures = []
+        written = 0
+
+        async def insert(batch):
+            try:
+                await self.db[collection].insert_many(batch, ordered=False)
+            finally:
+                semaphore.release()
+
+        def finished(task):
+            pending.discard(task)
+            # A failed batch stops the run instead of being dropped silently
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
+
+        for batch in _batches(docs, self.batch_size):
+            await semaphore.acquire()
+            if failures:
+                semaphore.release()
+                break
+            task = asyncio.ensure_future(insert(batch))
+            pending.add(task)
+            task.add_done_callback(finished)
+            written += len(batch)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if failures:
+            raise failures[0]
+        return written
+
+class NdjsonWriter:
+    """One ``<collection>.ndjson`` per collection, dates as extended JSON for mongoimport."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _line(doc) -> bytes:
+        doc = dict(doc)
+        for field in ("created_at", "updated_at"):
+            if isinstance(doc.get(field), datetime):
+                doc[field] = {"$date": doc[field].isoformat().replace("+00:00", "Z")}
+        if orjson is not None:
+            return orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(doc, ensure_ascii=False) + "\n").encode()
+
+    async def write(self, collection: str, docs) -> int:
+        written = 0
+        with open(self.directory / f"{collection}.ndjson", "wb") as f:
+            for doc in docs:
+                f.write(self._line(doc))
+                written += 1
+        return written
+
+CATALOG_COLLECTIONS = ("poles", "conductors", "equipment", "medium_voltage_structures", "low_voltage_structures")
+
+async def generate_dataset(args):
+    start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+    generator = Generator(args.seed, start, args.days)
+    client = None
+    if args.output_dir:
+        writer = NdjsonWriter(Path(args.output_dir))
+        print(f"Gerando NDJSON em {args.output_dir} (semente {args.seed})...")
+    else:
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+        db = client[args.db or os.environ['DB_NAME']]
+        writer = MongoWriter(db, args.batch_size, args.concurrency)
+        print(f"Gerando dados em {db.name} (semente {args.seed})...")
+        if args.drop:
+            for collection in CATALOG_COLLECTIONS + ("budgets", material_index.USAGE_COLLECTION):
+                await db[collection].drop()
+
+    counts = {
+        "poles": args.poles,
+        "conductors": args.conductors,
+        "equipment": args.equipment,
+        "medium_voltage_structures": args.structures // 2,
+        "low_voltage_structures": args.structures - args.structures // 2,
+    }
+    catalogs = {}
+    for collection, count in counts.items():
+        started = time.perf_counter()
+        if collection.endswith("structures"):
+            docs = list(generator.structures(collection, count))
+        else:
+            docs = list(getattr(generator, collection)(count))
+        await writer.write(collection, docs)
+        catalogs[collection] = docs
+        print(f"  {collection}: {count} em {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    lines = 0
+
+    def counted(budgets):
+        nonlocal lines
+        for budget in budgets:
+            lines += len(budget['items'])
+            yield budget
+
+    written = await writer.write("budgets", counted(generator.budgets(args.budgets, catalogs, args.items)))
+    elapsed = time.perf_counter() - started
+    print(f"  budgets: {written} orçamentos, {lines} linhas em {elapsed:.1f}s "
+          f"({lines / elapsed if elapsed else 0:.0f} linhas/s)")
+
+    if client is not None:
+        print("\nReconciliando índices e reconstruindo o índice de materiais...")
+        await ensure_indexes(db)
+        print(f"  {await material_index.rebuild(db)} entradas no índice de materiais")
+        client.close()
+
+    print("\n✅ Dados gerados!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera catálogos e orçamentos sintéticos, determinísticos, para testes em escala")
+    parser.add_argument('--poles', type=int, default=10000)
+    parser.add_argument('--conductors', type=int, default=10000)
+    parser.add_argument('--equipment', type=int, default=10000)
+    parser.add_argument('--structures', type=int, default=10000, help="divididas entre média e baixa tensão")
+    parser.add_argument('--budgets', type=int, default=100000)
+    parser.add_argument('--items', type=ItemCountDistribution, default=ItemCountDistribution("lognormal:40"),
+                        help="itens por orçamento: fixed:N, uniform:MIN-MAX ou lognormal:MEDIANA[:SIGMA]")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default="2023-01-01", help="data do primeiro registro")
+    parser.add_argument('--days', type=int, default=730, help="período coberto pelos registros")
+    parser.add_argument('--output-dir', help="grava arquivos NDJSON (para mongoimport) em vez de gravar no MongoDB")
+    parser.add_argument('--db', help="banco de destino (padrão: DB_NAME)")
+    parser.add_argument('--drop', action='store_true',
+                        help="apaga catálogos e orçamentos existentes antes de gerar (exige --db)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=4, help="lotes de insert_many em paralelo")
+    args = parser.parse_args()
+    if args.drop and not args.db and not args.output_dir:
+        # Never wipe the database the app is configured with by default
+        parser.error("--drop exige o banco de destino explícito em --db")
+    asyncio.run(generate_dataset(args))
@@ -0,0 +1,37 @@
+import asyncio
+import argparse
+import sys
+sys.path.append('/app/backend')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+
+from indexes import ensure_indexes, format_report
+
+# Load environment
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+
+async def manage_indexes(dry_run):
+    if dry_run:
+        print("Modo dry-run: nenhum índice será criado\n")
+
+    report = await ensure_indexes(db, dry_run=dry_run)
+    print(format_report(report))
+
+    conflicts = [e for e in report if e['action'] in ('conflict', 'failed')]
+    print(f"\n{len(report)} índices verificados, {len(conflicts)} conflitos")
+    client.close()
+    return 1 if conflicts else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcilia os índices declarados em backend/indexes.py")
+    parser.add_argument('--dry-run', action='store_true', help="apenas mostra o que seria criado")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(manage_indexes(args.dry_run)))
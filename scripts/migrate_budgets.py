@@ -1,4 +1,6 @@
 import asyncio
+import argparse
+import logging
 import sys
 sys.path.append('/app/backend')
 
@@ -7,33 +9,48 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from migrations import DEFAULT_BATCH_SIZE, MIGRATIONS, applied_versions, migrate
+
 # Load environment
 ROOT_DIR = Path('/app/backend')
 load_dotenv(ROOT_DIR / '.env')
 
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
-async def migrate_budgets():
-    print("Migrando orçamentos antigos...")
-    
-    # Find all budgets without bdi_percentage
-    budgets = await db.budgets.find({"bdi_percentage": {"$exists": False}}).to_list(1000)
-    
-    print(f"Encontrados {len(budgets)} orçamentos para migrar")
-    
-    for budget in budgets:
-        # Add missing fields
-        budget['bdi_percentage'] = 0.0
-        budget['bdi_value'] = 0.0
-        
-        # Update the budget
-        await db.budgets.replace_one({"id": budget['id']}, budget)
-        print(f"  ✓ Migrado orçamento {budget['id']}")
-    
+async def list_migrations():
+    records = await applied_versions(db)
+    for migration in MIGRATIONS:
+        record = records.get(migration.version, {})
+        status = record.get('status', 'pending')
+        print(f"  {migration.version} [{status:<8}] {migration.description} "
+              f"({record.get('processed', 0)} lidos, {record.get('modified', 0)} alterados)")
+
+async def migrate_budgets(args):
+    if args.list:
+        await list_migrations()
+        client.close()
+        return
+
+    print(f"Aplicando migrações pendentes{' (dry-run)' if args.dry_run else ''}...")
+    results = await migrate(db, batch_size=args.batch_size, pause=args.pause, dry_run=args.dry_run)
+    if not results:
+        print("Nenhuma migração pendente")
+    for result in results:
+        if args.dry_run:
+            print(f"  {result.version}: {result.processed} documentos a migrar")
+        else:
+            print(f"  ✓ {result.summary()}")
+
     print("\n✅ Migração concluída!")
     client.close()
 
 if __name__ == "__main__":
-    asyncio.run(migrate_budgets())
+    parser = argparse.ArgumentParser(description="Aplica as migrações de esquema pendentes, retomando do último checkpoint")
+    parser.add_argument('--list', action='store_true', help="mostra o estado de cada migração")
+    parser.add_argument('--dry-run', action='store_true', help="apenas conta os documentos a migrar")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=0.0, help="segundos de espera entre lotes")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    asyncio.run(migrate_budgets(parser.parse_args()))
@@ -0,0 +1,59 @@
+import asyncio
+import argparse
+import csv
+import sys
+sys.path.append('/app/backend')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+
+from repricing import reprice
+
+# Load environment
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+
+def load_prices(args):
+    prices = {}
+    if args.prices_file:
+        # CSV com colunas code,unit_price
+        with open(args.prices_file, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                prices[row['code'].strip()] = float(row['unit_price'])
+    for item in args.price:
+        code, _, value = item.partition('=')
+        prices[code.strip()] = float(value)
+    return prices
+
+async def reprice_catalog(args):
+    prices = load_prices(args)
+    print(f"Reprecificando com {len(prices)} preços de materiais{' (dry-run)' if args.dry_run else ''}...")
+
+    report = await reprice(db, prices, dry_run=args.dry_run, targeted=args.targeted)
+
+    for row in report.structures.itertuples(index=False):
+        print(f"  {row.code:<12} R$ {row.old_total:>12.2f} -> R$ {row.new_total:>12.2f}")
+    summary = report.summary()
+    print(f"\n{summary['structures_changed']} estruturas e {summary['budgets_changed']} de "
+          f"{summary['budgets_scanned']} orçamentos alterados "
+          f"(variação total R$ {summary['budgets_total_delta']:.2f}) em {summary['elapsed_seconds']}s")
+
+    if args.report:
+        report.budgets.to_csv(args.report, index=False)
+        print(f"Diferenças dos orçamentos gravadas em {args.report}")
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualiza preços de materiais e recalcula estruturas e orçamentos")
+    parser.add_argument('--price', action='append', default=[], metavar='CODIGO=PRECO')
+    parser.add_argument('--prices-file', help="CSV com colunas code,unit_price")
+    parser.add_argument('--dry-run', action='store_true', help="apenas calcula as diferenças")
+    parser.add_argument('--targeted', action='store_true', help="usa o índice de materiais para limitar o recálculo")
+    parser.add_argument('--report', help="grava o diff dos orçamentos em CSV")
+    asyncio.run(reprice_catalog(parser.parse_args()))
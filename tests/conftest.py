@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other by their flat names (``import pricing``)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def db():
+    """An in-memory Motor database; no mongod needed."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test_database"]
+
+@pytest.fixture
+def server(db, monkeypatch):
+    """The API module with every database handle pointed at ``db``."""
+    import server as server_module
+    from repository import Repository
+
+    monkeypatch.setattr(server_module, "db", db)
+    monkeypatch.setattr(server_module.catalog_cache, "db", db)
+    server_module.catalog_cache.invalidate_all()
+    for value in vars(server_module).values():
+        if isinstance(value, Repository):
+            monkeypatch.setattr(value, "db", db)
+    return server_module
+
+@pytest.fixture
+async def api(server):
+    """HTTP client calling the app in-process (the lifespan is not run)."""
+    httpx = pytest.importorskip("httpx")
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
@@ -0,0 +1,72 @@
+import csv
+import io
+
+import pytest
+
+from bom import explode_budget
+
+pytestmark = pytest.mark.anyio
+
+def structure(code, materials):
+    return {"code": code, "description": code, "voltage_class": "15kV", "materials": [
+        {"code": material_code, "description": material_code, "unit": unit, "quantity": quantity, "unit_price": price}
+        for material_code, unit, quantity, price in materials
+    ]}
+
+def item(item_id, item_type, quantity, unit_price, code="X"):
+    return {"item_id": item_id, "item_type": item_type, "code": code, "description": code,
+            "quantity": quantity, "unit_price": unit_price, "total_price": round(quantity * unit_price, 2)}
+
+@pytest.fixture
+async def structures(api):
+    ce1 = (await api.post("/api/medium-voltage-structures", json=structure("CE1", [
+        ("PARAF", "pç", 4, 2.5), ("ISOL", "pç", 3, 10.0)]))).json()
+    si1 = (await api.post("/api/low-voltage-structures", json=structure("SI1", [
+        ("PARAF", "pç", 2, 2.5), ("CABO", "m", 0.1, 3.33)]))).json()
+    return ce1, si1
+
+async def test_structures_expand_into_aggregated_materials(server, structures):
+    ce1, si1 = structures
+    budget = {"items": [
+        item(ce1["id"], "medium_voltage_structures", 2, 40.0),
+        item(si1["id"], "low_voltage_structure", 3, 5.33),
+        # The same structure on two lines is expanded once
+        item(ce1["id"], "medium_voltage_structures", 1, 40.0),
+        item("pole-1", "poles", 2, 800.0, code="P11"),
+        item("cond-1", "conductors", 150, 4.2, code="CA50"),
+    ]}
+
+    lines = {line["code"]: line for line in await explode_budget(budget, server.catalog_cache)}
+
+    assert list(lines) == sorted(lines)
+    assert (lines["PARAF"]["quantity"], lines["PARAF"]["extended_price"]) == (18.0, 45.0)
+    assert (lines["ISOL"]["quantity"], lines["ISOL"]["extended_price"]) == (9.0, 90.0)
+    # 0.3 m at 3.33, without float drift
+    assert (lines["CABO"]["quantity"], lines["CABO"]["unit"], lines["CABO"]["extended_price"]) == (0.3, "m", 1.0)
+    assert (lines["P11"]["unit"], lines["P11"]["extended_price"]) == ("pç", 1600.0)
+    assert (lines["CA50"]["unit"], lines["CA50"]["quantity"]) == ("m", 150.0)
+
+async def test_deleted_structures_are_listed_as_sold(server):
+    budget = {"items": [item("gone", "medium_voltage_structures", 2, 40.0, code="CE9")]}
+
+    lines = await explode_budget(budget, server.catalog_cache)
+
+    assert lines == [{"code": "CE9", "description": "CE9", "unit": "pç", "quantity": 2.0,
+                      "unit_price": 40.0, "extended_price": 80.0}]
+
+async def test_bom_route_formats(api, structures):
+    ce1, _ = structures
+    budget = {"project_name": "Rede Centro", "client_name": "Cliente",
+              "items": [item(ce1["id"], "medium_voltage_structures", 2, 40.0)]}
+    budget_id = (await api.post("/api/budgets", json=budget)).json()["id"]
+
+    as_json = (await api.get(f"/api/budgets/{budget_id}/bom")).json()
+    as_csv = await api.get(f"/api/budgets/{budget_id}/bom", params={"format": "csv"})
+    missing = await api.get("/api/budgets/missing/bom")
+
+    assert as_json["total"] == 80.0
+    assert [line["code"] for line in as_json["lines"]] == ["ISOL", "PARAF"]
+    assert "materiais_Rede_Centro" in as_csv.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(as_csv.text)))
+    assert [(row["code"], row["quantity"]) for row in rows] == [("ISOL", "6.0"), ("PARAF", "8.0")]
+    assert missing.status_code == 404
@@ -0,0 +1,115 @@
+import pytest
+
+import revisions
+
+pytestmark = pytest.mark.anyio
+
+def payload(project_name, quantities=(1,)):
+    items = [{"item_id": f"item-{i}", "item_type": "pole", "code": f"P{i}", "description": "Poste",
+              "quantity": quantity, "unit_price": 100.0, "total_price": 100.0 * quantity}
+             for i, quantity in enumerate(quantities)]
+    return {"project_name": project_name, "client_name": "Cliente", "items": items}
+
+async def create(api, project_name="Projeto"):
+    response = await api.post("/api/budgets", json=payload(project_name))
+    assert response.status_code == 200
+    return response.json()["id"]
+
+async def history(db, budget_id):
+    return [record["revision"] for record in await revisions.list_revisions(db, budget_id)]
+
+def test_diff_and_patch_round_trip():
+    old = {"name": "a", "items": [{"code": "X", "quantity": 1}, {"code": "Y", "quantity": 2}], "gone": 1}
+    new = {"name": "b", "items": [{"code": "X", "quantity": 3}, {"code": "Z", "quantity": 1},
+                                  {"code": "Y", "quantity": 2}], "added": True}
+
+    ops = revisions.diff(old, new)
+
+    assert revisions.apply_patch(old, ops) == new
+    assert revisions.diff(new, new) == []
+
+async def test_updates_are_versioned(api, db):
+    budget_id = await create(api)
+
+    first = await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (2,)))
+    second = await api.put(f"/api/budgets/{budget_id}", json=payload("Renomeado", (2,)))
+
+    assert first.json()["revision"] == 2
+    assert second.json()["revision"] == 3
+    assert await history(db, budget_id) == [1, 2, 3]
+    response = await api.get(f"/api/budgets/{budget_id}/revisions/2")
+    assert response.json()["project_name"] == "Projeto"
+    assert response.json()["items"][0]["quantity"] == 2
+
+async def test_unchanged_update_stores_no_revision(api, db):
+    budget_id = await create(api)
+
+    response = await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto"))
+
+    assert response.json()["revision"] == 1
+    assert await history(db, budget_id) == [1]
+
+async def test_orphan_revision_is_overwritten(api, db):
+    budget_id = await create(api)
+    await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (2,)))
+    # Left behind by an update that stored history but never moved the live document
+    await db[revisions.REVISIONS_COLLECTION].insert_one(
+        {"budget_id": budget_id, "revision": 3, "kind": "delta", "op_count": 1,
+         "ops": [{"op": "replace", "path": "/project_name", "value": "Nunca gravado"}]})
+
+    response = await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (5,)))
+
+    assert response.status_code == 200
+    assert response.json()["revision"] == 3
+    rebuilt = await revisions.rebuild(db, budget_id, 3)
+    assert rebuilt["project_name"] == "Projeto"
+    assert rebuilt["items"][0]["quantity"] == 5
+    again = await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (6,)))
+    assert again.json()["revision"] == 4
+
+async def test_missing_history_is_recovered_on_the_next_update(api, db, server, monkeypatch):
+    budget_id = await create(api)
+    store_revision = revisions.store_revision
+
+    async def crash_after_live_write(db, record):
+        if record["revision"] == 2:
+            raise RuntimeError("processo interrompido")
+        await store_revision(db, record)
+
+    monkeypatch.setattr(revisions, "store_revision", crash_after_live_write)
+    with pytest.raises(RuntimeError):
+        await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (2,)))
+    monkeypatch.setattr(revisions, "store_revision", store_revision)
+
+    live = await db.budgets.find_one({"id": budget_id})
+    assert live["revision"] == 2
+    assert await history(db, budget_id) == [1]
+
+    response = await api.put(f"/api/budgets/{budget_id}", json=payload("Projeto", (3,)))
+
+    assert response.status_code == 200
+    assert response.json()["revision"] == 3
+    assert await history(db, budget_id) == [1, 2, 3]
+    assert (await revisions.rebuild(db, budget_id, 2))["items"][0]["quantity"] == 2
+    assert (await revisions.rebuild(db, budget_id, 3))["items"][0]["quantity"] == 3
+
+async def test_concurrent_update_gets_409(api, db, server, monkeypatch):
+    budget_id = await create(api)
+    prepare_update = revisions.prepare_update
+
+    async def racing_prepare(db, current, new_content):
+        record = await prepare_update(db, current, new_content)
+        # Another request updates the budget after this one read it
+        monkeypatch.setattr(revisions, "prepare_update", prepare_update)
+        winner = await api.put(f"/api/budgets/{budget_id}", json=payload("Vencedor", (4,)))
+        assert winner.status_code == 200
+        return record
+
+    monkeypatch.setattr(revisions, "prepare_update", racing_prepare)
+    response = await api.put(f"/api/budgets/{budget_id}", json=payload("Perdedor", (9,)))
+
+    assert response.status_code == 409
+    live = await db.budgets.find_one({"id": budget_id})
+    assert (live["revision"], live["project_name"]) == (2, "Vencedor")
+    assert await history(db, budget_id) == [1, 2]
+    assert (await revisions.rebuild(db, budget_id, 2))["project_name"] == "Vencedor"
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import budget_search
+
+pytestmark = pytest.mark.anyio
+
+def line(code, quantity, total_price, item_type="poles"):
+    return {"item_id": code.lower(), "item_type": item_type, "code": code, "description": f"Item {code}",
+            "quantity": quantity, "unit_price": total_price / quantity, "total_price": total_price}
+
+@pytest.fixture
+async def budgets(db):
+    await db.budgets.insert_many([
+        {"id": "b1", "project_name": "Rede Centro", "client_name": "Alfa", "total": 1000.10,
+         "created_at": datetime(2024, 1, 10, tzinfo=timezone.utc),
+         "items": [line("P11", 1, 800.0), line("CA50", 100, 200.10, "conductors")]},
+        {"id": "b2", "project_name": "Rede Norte", "client_name": "Beta", "total": 2500.0,
+         "created_at": datetime(2024, 1, 20, tzinfo=timezone.utc), "items": [line("P11", 3, 2400.0)]},
+        {"id": "b3", "project_name": "Ampliação", "client_name": "Alfa", "total": 300.0,
+         "created_at": datetime(2024, 2, 5, tzinfo=timezone.utc), "items": []},
+    ])
+
+def test_build_match():
+    start, end = datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    assert budget_search.build_match() == {}
+    assert budget_search.build_match("rede", "Alfa", start, end, 0, 500.0) == {
+        "$text": {"$search": "rede"},
+        "client_name": "Alfa",
+        "created_at": {"$gte": start, "$lte": end},
+        "total": {"$gte": 0, "$lte": 500.0},
+    }
+
+async def test_search_pages_sorted_summaries(db, budgets):
+    page = await budget_search.search(db, {}, sort="total", descending=True, skip=1, limit=1)
+
+    assert page["total_count"] == 3
+    assert page["results"] == [{"id": "b1", "project_name": "Rede Centro", "client_name": "Alfa", "total": 1000.10,
+                                "created_at": datetime(2024, 1, 10, tzinfo=timezone.utc), "item_count": 2}]
+
+async def test_totals_by_client(db, budgets):
+    assert await budget_search.totals_by_client(db, {}, limit=10) == [
+        {"client_name": "Beta", "budget_count": 1, "total": 2500.0},
+        {"client_name": "Alfa", "budget_count": 2, "total": 1300.1},
+    ]
+    assert len(await budget_search.totals_by_client(db, {}, limit=1)) == 1
+
+async def test_totals_by_month(db, budgets):
+    assert await budget_search.totals_by_month(db, {}) == [
+        {"month": "2024-01", "budget_count": 2, "total": 3500.1},
+        {"month": "2024-02", "budget_count": 1, "total": 300.0},
+    ]
+
+async def test_top_items(db, budgets):
+    assert await budget_search.top_items(db, {}, limit=10) == [
+        {"item_type": "poles", "code": "P11", "description": "Item P11", "quantity": 4, "spend": 3200.0,
+         "budget_count": 2},
+        {"item_type": "conductors", "code": "CA50", "description": "Item CA50", "quantity": 100, "spend": 200.1,
+         "budget_count": 1},
+    ]
+
+async def test_routes_apply_the_shared_filters(api, server, budgets):
+    # ``q`` needs a Mongo text index, which the in-memory database lacks
+    search = await api.get("/api/budgets/search", params={"client_name": "Alfa", "order": "asc"})
+    assert search.status_code == 200
+    assert [row["id"] for row in search.json()["results"]] == ["b1", "b3"]
+
+    params = {"created_from": "2024-01-15T00:00:00Z", "total_max": 2000}
+    months = await api.get("/api/budgets/aggregates/months", params=params)
+    assert months.json() == [{"month": "2024-02", "budget_count": 1, "total": 300.0}]
+    clients = await api.get("/api/budgets/aggregates/clients", params=params)
+    assert [row["client_name"] for row in clients.json()] == ["Alfa"]
+    items = await api.get("/api/budgets/aggregates/items", params={"limit": 1})
+    assert [row["code"] for row in items.json()] == ["P11"]
+
+    assert (await api.get("/api/budgets/search", params={"limit": 0})).status_code == 422
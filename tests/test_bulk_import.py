@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import bulk_import
+
+pytestmark = pytest.mark.anyio
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+async def collect(rows):
+    return [row async for row in rows]
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("text/csv; charset=utf-8", "csv"),
+    ("Application/X-NDJSON", "ndjson"),
+    ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    ("application/json", None),
+    (None, None),
+])
+def test_detect_format(content_type, expected):
+    assert bulk_import.detect_format(content_type) == expected
+
+async def test_csv_rows_survive_chunk_boundaries_and_multiline_quotes():
+    body = (
+        '\ufeffcode, type ,height\r\n'
+        'P11,"Concreto\nDuplo T",11\r\n'
+        '\r\n'
+        'P12,"Fibra, ""leve""",\n'
+        'P13,Ação,9'
+    ).encode()
+
+    rows = await collect(bulk_import.iter_csv_rows(chunked(body, 3)))
+
+    assert rows == [
+        (1, {"code": "P11", "type": "Concreto\nDuplo T", "height": "11"}),
+        (2, {"code": "P12", "type": 'Fibra, "leve"'}),
+        (3, {"code": "P13", "type": "Ação", "height": "9"}),
+    ]
+
+async def test_csv_ending_inside_quotes_is_rejected():
+    with pytest.raises(bulk_import.ImportFormatError):
+        await collect(bulk_import.iter_csv_rows(chunked(b'code,type\nP11,"Concreto\n')))
+
+async def test_ndjson_bad_lines_become_row_errors():
+    body = b'{"code": "P11"}\n\n{broken\n[1, 2]\n{"code": "P12"}'
+
+    rows = await collect(bulk_import.iter_ndjson_rows(chunked(body)))
+
+    assert [number for number, _ in rows] == [1, 2, 3, 4]
+    assert rows[0][1] == {"code": "P11"}
+    assert rows[1][1]["__error__"].startswith("JSON inválido")
+    assert rows[2][1] == {"__error__": "linha não é um objeto JSON"}
+    assert rows[3][1] == {"code": "P12"}
+
+async def test_upsert_keeps_id_and_created_at(api, db):
+    created = (await api.post("/api/poles", json={
+        "type": "Concreto", "height": 11, "capacity": 300, "code": "P11", "unit_price": 800.0})).json()
+    body = ("code,type,height,capacity,unit_price\n"
+            "P11,Concreto,11,300,850.0\n"
+            "P12,Fibra,12,400,900.0\n"
+            "P13,Fibra,doze,400,900.0\n"
+            "P12,Fibra,12,400,950.0\n")
+
+    response = await api.post("/api/poles/bulk", content=body, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert {key: report[key] for key in ("received", "valid", "inserted", "updated", "error_count")} == {
+        "received": 4, "valid": 3, "inserted": 1, "updated": 1, "error_count": 1}
+    assert report["errors"][0]["row"] == 3
+    assert report["errors"][0]["code"] == "P13"
+    assert report["errors"][0]["errors"][0].startswith("height:")
+
+    stored = {doc["code"]: doc async for doc in db.poles.find({}, {"_id": 0})}
+    assert stored["P11"]["id"] == created["id"]
+    assert stored["P11"]["created_at"].isoformat().startswith(created["created_at"][:19])
+    assert stored["P11"]["unit_price"] == 850.0
+    # The last row for a repeated code wins
+    assert stored["P12"]["unit_price"] == 950.0
+    assert stored["P12"]["id"] and stored["P12"]["created_at"]
+
+async def test_structure_materials_travel_as_a_json_column(api, db):
+    materials = json.dumps([{"code": "PARAF", "description": "Parafuso", "unit": "pç",
+                             "quantity": 4, "unit_price": 2.5}])
+    body = json.dumps({"code": "CE1", "description": "CE1", "voltage_class": "15kV",
+                       "materials": materials}) + "\n"
+
+    response = await api.post("/api/medium-voltage-structures/bulk?format=ndjson", content=body)
+
+    assert response.json()["inserted"] == 1
+    stored = await db.medium_voltage_structures.find_one({"code": "CE1"})
+    assert stored["materials"][0]["code"] == "PARAF"
+
+async def test_route_errors(api):
+    unsupported = await api.post("/api/poles/bulk", content=b"{}", headers={"Content-Type": "application/json"})
+    assert unsupported.status_code == 415
+
+    unterminated = await api.post("/api/poles/bulk?format=csv", content=b'code,type\nP11,"Concreto\n')
+    assert unterminated.status_code == 400
+
+async def test_xlsx_without_openpyxl_is_501(api, monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_openpyxl(name, *args, **kwargs):
+        if name == "openpyxl":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_openpyxl)
+    response = await api.post("/api/poles/bulk?format=xlsx", content=b"PK")
+    assert response.status_code == 501
@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import BaseModel, Field
+
+from catalog_cache import CatalogCache
+
+pytestmark = pytest.mark.anyio
+
+class Item(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    code: str
+    unit_price: float
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+async def insert(db, code, price, minutes=0):
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+    item = Item(code=code, unit_price=price, created_at=created_at)
+    await db["items"].insert_one(item.model_dump())
+    return item
+
+async def test_snapshot_is_sorted_and_indexed(db):
+    second = await insert(db, "B", 2.0, minutes=1)
+    first = await insert(db, "A", 1.0)
+    cache = CatalogCache(db, {"items": Item})
+
+    snapshot = await cache.get("items")
+
+    assert [item.code for item in snapshot.items] == ["A", "B"]
+    assert snapshot.by_id[second.id].unit_price == 2.0
+    assert snapshot.keys[0] == (first.created_at, first.id)
+    assert cache.peek("items") is snapshot
+
+async def test_invalidate_reloads(db):
+    await insert(db, "A", 1.0)
+    cache = CatalogCache(db, {"items": Item})
+    before = await cache.get("items")
+    await insert(db, "B", 2.0, minutes=1)
+
+    assert await cache.get("items") is before
+    cache.invalidate("items")
+    assert cache.peek("items") is None
+    after = await cache.get("items")
+
+    assert len(after.items) == 2
+    assert after.etag != before.etag
+
+async def test_writes_the_cache_did_not_see_show_up_after_the_ttl(db):
+    await insert(db, "A", 1.0)
+    cache = CatalogCache(db, {"items": Item}, ttl=3600)
+    before = await cache.get("items")
+    # e.g. reprice_catalog.py or another worker, with no change stream
+    await db["items"].update_one({"code": "A"}, {"$set": {"unit_price": 5.0}})
+
+    assert (await cache.get("items")).items[0].unit_price == 1.0
+    cache.ttl = 0
+    assert cache.peek("items") is None
+    after = await cache.get("items")
+
+    assert after.items[0].unit_price == 5.0
+    assert after.etag != before.etag
+
+async def test_unchanged_collection_keeps_its_etag_across_reloads(db):
+    await insert(db, "A", 1.0)
+    cache = CatalogCache(db, {"items": Item}, ttl=0)
+
+    first = await cache.get("items")
+    second = await cache.get("items")
+
+    assert first is not second
+    assert first.etag == second.etag
+
+async def test_page_after_slices_by_key(db):
+    items = [await insert(db, code, 1.0, minutes=i) for i, code in enumerate("ABCDE")]
+    snapshot = await CatalogCache(db, {"items": Item}).get("items")
+
+    page, has_more = snapshot.page_after(None, 2)
+    assert [item.code for item in page] == ["A", "B"] and has_more
+    page, has_more = snapshot.page_after((items[1].created_at, items[1].id), 10)
+    assert [item.code for item in page] == ["C", "D", "E"] and not has_more
@@ -0,0 +1,151 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+
+import export_jobs
+import pdf_service
+
+pytestmark = pytest.mark.anyio
+
+def budget(budget_id, project_name, client_name="Cliente", day=1):
+    return {"id": budget_id, "project_name": project_name, "client_name": client_name, "items": [],
+            "total": 100.0, "created_at": datetime(2024, 5, day, tzinfo=timezone.utc)}
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    """Fake ``pdf_service`` renders; a budget named "falha" fails to render."""
+    calls = []
+
+    async def fake_get_or_render(doc, digest=None):
+        calls.append(doc["id"])
+        if doc["project_name"] == "falha":
+            raise RuntimeError("render failed")
+        path = tmp_path / f"{doc['id']}.pdf"
+        path.write_bytes(b"%PDF " + doc["id"].encode())
+        return path
+
+    monkeypatch.setattr(export_jobs, "EXPORT_DIR", tmp_path / "exports")
+    monkeypatch.setattr(pdf_service, "get_or_render", fake_get_or_render)
+    return calls
+
+async def run_job(db, query):
+    job = await export_jobs.start_export(db, query, {})
+    await export_jobs._tasks[job["id"]]
+    return await export_jobs.get_job(db, job["id"])
+
+async def test_export_writes_every_rendered_budget(db, renders):
+    await db.budgets.insert_many([
+        budget("aaaaaaaa-1", "Rede Centro", day=2),
+        budget("bbbbbbbb-2", "Rede/Norte", day=1),
+        budget("cccccccc-3", "falha", day=3),
+    ])
+
+    job = await run_job(db, {})
+
+    assert (job["status"], job["total"], job["done"], job["failed"]) == ("done", 3, 2, 1)
+    assert job["finished_at"] is not None
+    assert export_jobs._tasks == {}
+    path = export_jobs.archive_path(job["id"])
+    assert job["size_bytes"] == path.stat().st_size
+    assert not path.with_suffix(".zip.part").exists()
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == ["orcamento_Rede_Centro_aaaaaaaa.pdf", "orcamento_Rede_Norte_bbbbbbbb.pdf"]
+        assert archive.read("orcamento_Rede_Centro_aaaaaaaa.pdf") == b"%PDF aaaaaaaa-1"
+        assert {info.compress_type for info in archive.infolist()} == {zipfile.ZIP_STORED}
+
+async def test_export_honours_the_query(db, renders):
+    await db.budgets.insert_many([budget("aaaaaaaa-1", "A"), budget("bbbbbbbb-2", "B", client_name="Outro")])
+
+    job = await run_job(db, {"client_name": "Outro"})
+
+    assert (job["total"], job["done"]) == (1, 1)
+    assert renders == ["bbbbbbbb-2"]
+
+async def test_full_pdf_queue_is_retried(db, renders, monkeypatch):
+    fake = pdf_service.get_or_render
+    refusals = []
+
+    async def busy_once(doc, digest=None):
+        if not refusals:
+            refusals.append(doc["id"])
+            raise pdf_service.PdfQueueFull(retry_after=0)
+        return await fake(doc, digest)
+
+    monkeypatch.setattr(pdf_service, "get_or_render", busy_once)
+    await db.budgets.insert_one(budget("aaaaaaaa-1", "A"))
+
+    job = await run_job(db, {})
+
+    assert (job["status"], job["done"], job["failed"]) == ("done", 1, 0)
+    assert refusals == ["aaaaaaaa-1"]
+
+async def test_cancelled_job_is_marked_failed(db, monkeypatch, tmp_path):
+    async def never_finishes(doc, digest=None):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(export_jobs, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(pdf_service, "get_or_render", never_finishes)
+    await db.budgets.insert_one(budget("aaaaaaaa-1", "A"))
+
+    job = await export_jobs.start_export(db, {}, {})
+    task = export_jobs._tasks[job["id"]]
+    await asyncio.sleep(0.05)
+    export_jobs.cancel_all()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    stored = await export_jobs.get_job(db, job["id"])
+    assert (stored["status"], stored["error"]) == ("failed", "cancelado")
+
+async def test_export_routes(api, server, renders):
+    await server.db.budgets.insert_many([
+        budget("aaaaaaaa-1", "A", client_name="Alvo"), budget("bbbbbbbb-2", "B"),
+    ])
+
+    created = await api.post("/api/exports", json={"client_name": "Alvo"})
+    assert created.status_code == 202
+    job = created.json()
+    assert (job["status"], job["filter"]) == ("queued", {"client_name": "Alvo"})
+    assert "download_url" not in job
+    await export_jobs._tasks[job["id"]]
+
+    status = (await api.get(f"/api/exports/{job['id']}")).json()
+    assert (status["status"], status["done"]) == ("done", 1)
+    assert status["download_url"] == f"/api/exports/{job['id']}/download"
+
+    download = await api.get(status["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        assert archive.namelist() == ["orcamento_A_aaaaaaaa.pdf"]
+
+    export_jobs.archive_path(job["id"]).unlink()
+    assert (await api.get(status["download_url"])).status_code == 410
+
+async def test_export_route_errors(api, server):
+    assert (await api.get("/api/exports/missing")).status_code == 404
+    assert (await api.get("/api/exports/missing/download")).status_code == 404
+
+    await server.db[export_jobs.JOBS_COLLECTION].insert_one({"id": "job-1", "status": "running"})
+    assert (await api.get("/api/exports/job-1/download")).status_code == 409
+
+async def test_pdf_evicted_before_archiving_counts_as_failed(db, renders, monkeypatch):
+    fake = pdf_service.get_or_render
+
+    async def evicted(doc, digest=None):
+        path = await fake(doc, digest)
+        if doc["id"] == "bbbbbbbb-2":
+            path.unlink()
+        return path
+
+    monkeypatch.setattr(pdf_service, "get_or_render", evicted)
+    await db.budgets.insert_many([budget("aaaaaaaa-1", "A"), budget("bbbbbbbb-2", "B")])
+
+    job = await run_job(db, {})
+
+    assert (job["status"], job["done"], job["failed"]) == ("done", 1, 1)
+    with zipfile.ZipFile(export_jobs.archive_path(job["id"])) as archive:
+        assert archive.namelist() == ["orcamento_A_aaaaaaaa.pdf"]
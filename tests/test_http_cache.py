@@ -0,0 +1,232 @@
+import gzip
+import json
+import zlib
+from datetime import datetime, timezone
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import http_cache
+from http_cache import HttpCacheMiddleware, etag_matches
+
+pytestmark = pytest.mark.anyio
+
+ROWS = [{"id": f"row-{number}", "description": "Poste de concreto " * 4} for number in range(50)]
+
+async def rows(request):
+    return JSONResponse(ROWS)
+
+async def tagged(request):
+    return JSONResponse(ROWS, headers={"ETag": '"v1"'})
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+async def stream(request):
+    async def lines():
+        for row in ROWS:
+            yield (json.dumps(row) + "\n").encode()
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def created(request):
+    return JSONResponse(ROWS, status_code=201)
+
+async def binary(request):
+    return Response(b"%PDF" * 1000, media_type="application/pdf")
+
+async def outside(request):
+    return PlainTextResponse("x" * 5000)
+
+def make_app(precheck=None):
+    app = Starlette(routes=[
+        Route("/api/rows", rows, methods=["GET", "HEAD", "POST"]),
+        Route("/api/tagged", tagged),
+        Route("/api/small", small),
+        Route("/api/stream", stream),
+        Route("/api/created", created, methods=["POST"]),
+        Route("/api/binary", binary),
+        Route("/outside", outside),
+    ])
+    return HttpCacheMiddleware(app, prefix="/api", precheck=precheck, minimum_size=1024)
+
+async def call(app, path, method="GET", headers=None):
+    """Raw ASGI messages sent by ``app``, to see exactly what goes on the wire."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "server": ("testserver", 80), "client": ("test", 1), "root_path": "",
+        "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+    messages, requested = [], []
+
+    async def receive():
+        if requested:
+            # Streaming responses listen for a disconnect that never comes
+            await anyio.sleep_forever()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start, *bodies = messages
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, [m["body"] for m in bodies]
+
+@pytest.mark.parametrize("if_none_match, etag, expected", [
+    (None, '"abc"', False),
+    ('"abc"', '"abc"', True),
+    ('"abc-gzip"', '"abc"', True),
+    ('"abc"', '"abc-br"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"other", "abc-gzip"', '"abc"', True),
+    ("*", '"abc"', True),
+    ('"abcd"', '"abc"', False),
+    ('"abc-zstd"', '"abc"', False),
+])
+def test_etag_matches(if_none_match, etag, expected):
+    assert etag_matches(if_none_match, etag) is expected
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=bad", None),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(accept, expected, monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+    assert http_cache.choose_encoding(accept) == expected
+
+async def test_json_gets_a_body_etag_and_304():
+    status, headers, (body,) = await call(make_app(), "/api/rows")
+
+    assert status == 200
+    assert json.loads(body) == ROWS
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    etag = headers["etag"]
+
+    status, headers, (body,) = await call(make_app(), "/api/rows", headers={"If-None-Match": etag})
+    assert (status, body) == (304, b"")
+    assert headers["etag"] == etag
+    assert "content-length" not in headers and "content-type" not in headers
+
+async def test_gzip_tags_the_etag_with_the_encoding(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+    _, plain, _ = await call(make_app(), "/api/rows")
+
+    status, headers, (body,) = await call(make_app(), "/api/rows", headers={"Accept-Encoding": "gzip, br"})
+
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"] == plain["etag"][:-1] + '-gzip"'
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == ROWS
+
+    # The compressed tag revalidates both representations
+    for encoding in ("gzip", "identity"):
+        status, _, _ = await call(make_app(), "/api/rows", headers={
+            "Accept-Encoding": encoding, "If-None-Match": headers["etag"]})
+        assert status == 304
+
+async def test_route_etag_is_kept():
+    status, headers, _ = await call(make_app(), "/api/tagged", headers={"Accept-Encoding": "gzip"})
+    assert (status, headers["etag"]) == (200, '"v1-gzip"')
+
+    status, _, _ = await call(make_app(), "/api/tagged", headers={"If-None-Match": '"v1"'})
+    assert status == 304
+
+async def test_small_and_non_json_bodies_are_not_compressed():
+    _, headers, (body,) = await call(make_app(), "/api/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in headers
+    assert json.loads(body) == {"ok": True}
+
+    _, headers, (body,) = await call(make_app(), "/api/binary", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in headers and "vary" not in headers and "etag" not in headers
+    assert body == b"%PDF" * 1000
+
+    _, headers, _ = await call(make_app(), "/outside", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in headers
+
+async def test_only_successful_gets_are_cached():
+    status, headers, _ = await call(make_app(), "/api/created", method="POST", headers={"Accept-Encoding": "gzip"})
+    assert status == 201
+    assert "etag" not in headers and "content-encoding" not in headers
+
+    _, headers, _ = await call(make_app(), "/api/rows", method="POST", headers={"Accept-Encoding": "gzip"})
+    assert "etag" not in headers and "content-encoding" not in headers
+
+async def test_streamed_ndjson_is_compressed_chunk_by_chunk():
+    status, headers, chunks = await call(make_app(), "/api/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers and "etag" not in headers
+    # Each sync-flushed chunk decodes on arrival, before the stream ends
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first_line = decoder.decompress(chunks[0])
+    assert json.loads(first_line) == ROWS[0]
+    rest = decoder.decompress(b"".join(chunks[1:])) + decoder.flush()
+    assert [json.loads(line) for line in (first_line + rest).splitlines()] == ROWS
+    assert decoder.eof
+
+async def test_streamed_ndjson_without_gzip_passes_through():
+    _, headers, chunks = await call(make_app(), "/api/stream")
+
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert [json.loads(line) for line in b"".join(chunks).splitlines()] == ROWS
+
+async def test_head_is_never_compressed():
+    status, headers, chunks = await call(make_app(), "/api/rows", method="HEAD", headers={"Accept-Encoding": "gzip"})
+
+    # The server drops the body of a HEAD response; its headers must describe the identity body
+    assert status == 200
+    assert "content-encoding" not in headers and "etag" not in headers
+    assert int(headers["content-length"]) == len(json.dumps(ROWS, separators=(",", ":")))
+
+async def test_precheck_answers_without_running_the_route():
+    prechecked = []
+
+    def precheck(path):
+        prechecked.append(path)
+        return '"snapshot-1"' if path == "/api/rows" else None
+
+    app = make_app(precheck)
+    status, headers, (body,) = await call(app, "/api/rows", headers={"If-None-Match": '"snapshot-1-gzip"'})
+    assert (status, body) == (304, b"")
+    assert (headers["etag"], headers["cache-control"]) == ('"snapshot-1"', "no-cache")
+
+    status, _, _ = await call(app, "/api/rows", method="HEAD", headers={"If-None-Match": '"snapshot-1"'})
+    assert status == 304
+
+    status, _, _ = await call(app, "/api/rows", headers={"If-None-Match": '"snapshot-0"'})
+    assert status == 200
+    # No If-None-Match, no precheck
+    await call(app, "/api/rows")
+    assert prechecked == ["/api/rows"] * 3
+
+async def test_catalog_revalidation_does_not_touch_mongo(api, server, db, monkeypatch):
+    await db.poles.insert_many([
+        {"id": f"p{number}", "type": "Concreto", "height": 11.0, "capacity": 300, "code": f"P{number}",
+         "unit_price": 800.0, "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+        for number in range(30)
+    ])
+    catalog = await api.get("/api/poles", headers={"Accept-Encoding": "gzip"})
+    bundle = await api.get("/api/catalog/bundle")
+    assert catalog.headers["etag"].endswith('-gzip"')
+
+    class Unreachable:
+        def __getattr__(self, name):
+            raise AssertionError("Mongo accessed during revalidation")
+
+        __getitem__ = __getattr__
+
+    monkeypatch.setattr(server.catalog_cache, "db", Unreachable())
+    for response in (catalog, bundle):
+        revalidated = await api.get(response.url.path, headers={"If-None-Match": response.headers["etag"]})
+        assert revalidated.status_code == 304
@@ -0,0 +1,96 @@
+import pytest
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+import indexes
+
+pytestmark = pytest.mark.anyio
+
+DECLARED = [
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel(indexes.LISTING_KEY, name="created_at_id"),
+]
+
+def actions(plan):
+    return {entry["index"]: (entry["action"], entry["detail"]) for entry in plan}
+
+def test_plan_creates_missing_and_keeps_matching_indexes():
+    existing = {
+        "_id_": {"key": [("_id", 1)], "v": 2},
+        # Same key under another name still counts as present
+        "legacy_id": {"key": [("id", 1)], "unique": True, "v": 2},
+        "by_status": {"key": [("status", 1)], "v": 2},
+    }
+
+    plan = indexes.plan_collection("poles", DECLARED, existing)
+
+    assert actions(plan) == {
+        "id_unique": ("exists", "índice 'legacy_id'"),
+        "created_at_id": ("create", None),
+        "by_status": ("unmanaged", None),
+    }
+    assert plan[1]["key"] == [("created_at", 1), ("id", 1)]
+
+def test_plan_reports_conflicts():
+    same_key_other_options = {"id_unique": {"key": [("id", 1)], "v": 2}}
+    same_name_other_key = {"created_at_id": {"key": [("created_at", -1)], "v": 2}}
+
+    options_conflict = actions(indexes.plan_collection("poles", DECLARED, same_key_other_options))
+    key_conflict = actions(indexes.plan_collection("poles", DECLARED, same_name_other_key))
+
+    assert options_conflict["id_unique"] == (
+        "conflict", "índice 'id_unique' existe com opções {}, esperado {'unique': True}")
+    assert key_conflict["created_at_id"] == (
+        "conflict", "índice 'created_at_id' existe com chave [('created_at', -1)]")
+
+def test_plan_matches_text_indexes_as_mongo_reports_them():
+    (declared,) = [m for m in indexes.INDEXES["budgets"] if m.document["name"] == "project_client_text"]
+    existing = {"project_client_text": {
+        "key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"client_name": 1, "project_name": 1},
+        "default_language": "portuguese", "language_override": "language", "textIndexVersion": 3, "v": 2,
+    }}
+
+    assert actions(indexes.plan_collection("budgets", [declared], existing)) == {
+        "project_client_text": ("exists", "índice 'project_client_text'")}
+
+    existing["project_client_text"]["default_language"] = "english"
+    (entry,) = indexes.plan_collection("budgets", [declared], existing)
+    assert entry["action"] == "conflict"
+
+async def test_ensure_creates_only_what_is_missing(db):
+    await db.poles.create_index([("id", ASCENDING)], name="id_unique", unique=True)
+
+    report = await indexes.ensure_collection_indexes(db.poles, DECLARED)
+
+    assert [(e["index"], e["action"]) for e in report] == [("id_unique", "exists"), ("created_at_id", "created")]
+    assert "created_at_id" in await db.poles.index_information()
+    again = await indexes.ensure_collection_indexes(db.poles, DECLARED)
+    assert {e["action"] for e in again} == {"exists"}
+
+async def test_conflicts_are_left_untouched(db):
+    await db.poles.create_index([("id", ASCENDING)], name="id_unique")
+
+    report = await indexes.ensure_collection_indexes(db.poles, DECLARED)
+
+    assert actions(report)["id_unique"][0] == "conflict"
+    assert "unique" not in (await db.poles.index_information())["id_unique"]
+
+async def test_failed_creation_is_reported(db, monkeypatch):
+    async def refuse(collection, models):
+        raise OperationFailure("índices demais")
+
+    monkeypatch.setattr(type(db.poles), "create_indexes", refuse)
+
+    report = await indexes.ensure_collection_indexes(db.poles, DECLARED)
+
+    assert {e["action"] for e in report} == {"failed"}
+    assert report[0]["detail"] == "índices demais"
+
+async def test_dry_run_reports_without_creating(db):
+    report = await indexes.ensure_indexes(db, dry_run=True)
+
+    assert {e["action"] for e in report} == {"create"}
+    assert len(report) == sum(len(declared) for declared in indexes.INDEXES.values())
+    assert await db.list_collection_names() == []
+    lines = indexes.format_report(report).splitlines()
+    assert lines[0] == "create     poles.id_unique (id:1)"
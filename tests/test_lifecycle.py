@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+import export_jobs
+import mongo_pool
+import pdf_service
+
+pytestmark = pytest.mark.anyio
+
+class StubClient:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def app_server(server, monkeypatch):
+    """The API module before startup, with a client that can be closed safely."""
+    monkeypatch.setattr(server.app.state, "ready", False)
+    monkeypatch.setattr(server, "client", StubClient())
+    monkeypatch.setattr(server.app.state, "catalog_watcher", None, raising=False)
+    for name in ("REQUIRE_MIGRATIONS", "MONGO_AUTO_INDEXES", "CATALOG_CACHE_PRELOAD", "CATALOG_CACHE_CHANGE_STREAM"):
+        monkeypatch.delenv(name, raising=False)
+    return server
+
+@pytest.fixture
+def ping(monkeypatch):
+    """Replace the Mongo ping with a stub returning ``ping.latency`` or raising ``ping.error``."""
+    class Ping:
+        latency = 1.0
+        error = None
+
+        async def __call__(self, db, timeout):
+            if self.error is not None:
+                raise self.error
+            return self.latency
+
+    stub = Ping()
+    monkeypatch.setattr(mongo_pool, "ping", stub)
+    return stub
+
+async def test_startup_steps_run_in_order(app_server, monkeypatch):
+    calls = []
+    for step in ("warm_up_mongo", "check_migrations", "ensure_db_indexes", "ensure_material_index",
+                 "preload_catalog_cache"):
+        async def record(step=step):
+            assert not app_server.app.state.ready
+            calls.append(step)
+        monkeypatch.setattr(app_server, step, record)
+
+    async with app_server.lifespan(app_server.app):
+        assert app_server.app.state.ready
+    assert calls == ["warm_up_mongo", "check_migrations", "ensure_db_indexes", "ensure_material_index",
+                     "preload_catalog_cache"]
+    assert not app_server.app.state.ready
+    assert app_server.client.closed
+
+async def test_startup_prepares_the_database(app_server, db, ping, monkeypatch):
+    monkeypatch.setenv("CATALOG_CACHE_PRELOAD", "1")
+    await db.medium_voltage_structures.insert_one({"id": "mv-1", "code": "CE1", "description": "CE1",
+                                                   "voltage_class": "15kV", "total_price": 10.0, "materials": [
+        {"code": "PARAF", "description": "Parafuso", "unit": "pç", "quantity": 4, "unit_price": 2.5}]})
+
+    await app_server.startup()
+
+    assert app_server.app.state.ready
+    assert "id_unique" in await db.poles.index_information()
+    assert await db.material_usage.count_documents({"code": "PARAF"}) == 1
+    assert all(app_server.catalog_cache.peek(name) for name in app_server.catalog_cache.collections)
+
+async def test_outstanding_migrations_stop_startup_before_indexes(app_server, db, ping):
+    await db.budgets.insert_one({"id": "old", "created_at": "2024-01-01T00:00:00", "bdi_percentage": 0.0})
+
+    with pytest.raises(RuntimeError, match="0002-budgets"):
+        await app_server.startup()
+
+    assert not app_server.app.state.ready
+    assert "id_unique" not in await db.budgets.index_information()
+
+async def test_readyz_waits_for_startup(api, app_server, ping):
+    starting = await api.get("/readyz")
+    assert (starting.status_code, starting.json()) == (503, {"status": "starting"})
+
+    await app_server.startup()
+    ready = await api.get("/readyz")
+    assert ready.status_code == 200
+    assert ready.json() == {"status": "ready", "mongo": {"ok": True, "latency_ms": 1.0}}
+
+async def test_readyz_fails_when_mongo_does(api, app_server, ping):
+    await app_server.startup()
+
+    ping.error = asyncio.TimeoutError()
+    down = await api.get("/readyz")
+    assert down.status_code == 503
+    assert down.json() == {"status": "unavailable", "mongo": {"ok": False, "error": "TimeoutError"}}
+
+    ping.error, ping.latency = None, app_server.READY_MAX_LATENCY_MS + 1
+    slow = await api.get("/readyz")
+    assert slow.status_code == 503
+    assert slow.json()["mongo"]["ok"] is False
+
+async def test_healthz_reports_mongo_without_failing(api, app_server, ping):
+    ping.error = ConnectionError("sem conexão")
+
+    response = await api.get("/healthz")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "mongo": {"ok": False, "error": "sem conexão"}}
+
+async def test_shutdown_cancels_background_work(app_server, ping, monkeypatch):
+    monkeypatch.setenv("CATALOG_CACHE_CHANGE_STREAM", "1")
+    watching = asyncio.Event()
+
+    async def watch():
+        watching.set()
+        await asyncio.Event().wait()
+
+    stopped = []
+    monkeypatch.setattr(app_server.catalog_cache, "watch", watch)
+    monkeypatch.setattr(export_jobs, "cancel_all", lambda: stopped.append("exports"))
+    monkeypatch.setattr(pdf_service, "shutdown", lambda: stopped.append("pdf"))
+
+    await app_server.startup()
+    watcher = app_server.app.state.catalog_watcher
+    await watching.wait()
+    await app_server.shutdown()
+
+    with pytest.raises(asyncio.CancelledError):
+        await watcher
+    assert watcher.cancelled()
+    assert stopped == ["exports", "pdf"]
+    assert not app_server.app.state.ready
+    assert app_server.client.closed
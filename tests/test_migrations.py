@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import migrations
+
+pytestmark = pytest.mark.anyio
+
+def date_migrations(collection):
+    return [m for m in migrations.MIGRATIONS if m.version == f"0002-{collection}"]
+
+async def test_string_timestamps_become_dates(db):
+    await db.budgets.insert_many([
+        {"id": "naive", "created_at": "2024-03-01T12:30:00", "bdi_percentage": 0.0},
+        {"id": "aware", "created_at": "2024-03-02T08:00:00+00:00", "updated_at": "2024-03-05T08:00:00+00:00",
+         "bdi_percentage": 0.0},
+        {"id": "bson", "created_at": datetime(2024, 3, 3, tzinfo=timezone.utc), "bdi_percentage": 0.0},
+    ])
+
+    result = await migrations.run_migration(db, date_migrations("budgets")[0])
+
+    assert (result.status, result.processed, result.modified) == ("applied", 2, 2)
+    docs = {doc["id"]: doc async for doc in db.budgets.find({})}
+    assert docs["naive"]["created_at"] == datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert docs["aware"]["updated_at"] == datetime(2024, 3, 5, 8, 0, tzinfo=timezone.utc)
+    assert docs["bson"]["created_at"] == datetime(2024, 3, 3, tzinfo=timezone.utc)
+
+async def test_outstanding_ignores_migrations_with_nothing_to_do(db):
+    assert await migrations.outstanding(db) == []
+
+    await db.poles.insert_one({"id": "p", "created_at": "2024-01-01T00:00:00"})
+
+    assert [m.version for m in await migrations.outstanding(db)] == ["0002-poles"]
+
+async def test_startup_refuses_unmigrated_timestamps(db, server):
+    await db.budgets.insert_one({"id": "old", "created_at": "2024-01-01T00:00:00", "bdi_percentage": 0.0})
+
+    with pytest.raises(RuntimeError, match="0002-budgets"):
+        await server.check_migrations()
+
+    await migrations.migrate(db)
+    await server.check_migrations()
+
+async def test_startup_check_can_be_disabled(db, server, monkeypatch):
+    await db.budgets.insert_one({"id": "old", "created_at": "2024-01-01T00:00:00", "bdi_percentage": 0.0})
+    monkeypatch.setenv("REQUIRE_MIGRATIONS", "0")
+
+    await server.check_migrations()
+
+def bdi_migration(**overrides):
+    return migrations.Migration(**{**vars(migrations.MIGRATIONS[0]), **overrides})
+
+async def test_interrupted_migration_resumes_after_the_checkpoint(db):
+    await db.budgets.insert_many([{"_id": number, "id": f"b{number}"} for number in range(1, 6)])
+    seen = []
+
+    def crash_on_fifth(doc):
+        seen.append(doc["_id"])
+        if doc["_id"] == 5:
+            raise RuntimeError("interrupted")
+        return {"bdi_percentage": 0.0, "bdi_value": 0.0}
+
+    with pytest.raises(RuntimeError):
+        await migrations.run_migration(db, bdi_migration(transform=crash_on_fifth), batch_size=2)
+
+    record = await db[migrations.MIGRATIONS_COLLECTION].find_one({"version": "0001"})
+    assert (record["status"], record["last_id"], record["processed"]) == ("running", 4, 4)
+    dry = await migrations.run_migration(db, migrations.MIGRATIONS[0], dry_run=True)
+    assert (dry.status, dry.processed) == ("pending", 1)
+
+    def record_and_fill(doc):
+        seen.append(doc["_id"])
+        return {"bdi_percentage": 0.0, "bdi_value": 0.0}
+
+    seen.clear()
+    result = await migrations.run_migration(db, bdi_migration(transform=record_and_fill), batch_size=2)
+
+    assert seen == [5]
+    assert (result.status, result.processed, result.modified) == ("applied", 1, 1)
+    record = await db[migrations.MIGRATIONS_COLLECTION].find_one({"version": "0001"})
+    assert (record["status"], record["processed"], record["modified"]) == ("applied", 5, 5)
+    assert await db.budgets.count_documents({"bdi_percentage": {"$exists": False}}) == 0
+
+async def test_applied_migrations_are_not_run_again(db):
+    await db.budgets.insert_one({"id": "old"})
+    await migrations.migrate(db)
+    await db.budgets.insert_one({"id": "newer"})
+
+    result = await migrations.run_migration(db, migrations.MIGRATIONS[0])
+
+    assert (result.status, result.processed) == ("applied", 0)
+    assert await db.budgets.count_documents({"bdi_percentage": {"$exists": False}}) == 1
+    assert "0001" not in [m.version for m in await migrations.pending(db)]
+
+async def test_dry_run_only_counts(db):
+    await db.budgets.insert_many([{"id": "a"}, {"id": "b", "bdi_percentage": 5.0}])
+
+    results = await migrations.migrate(db, dry_run=True)
+
+    counts = {result.version: (result.status, result.processed) for result in results}
+    assert counts["0001"] == ("pending", 1)
+    assert await db[migrations.MIGRATIONS_COLLECTION].count_documents({}) == 0
+    assert await db.budgets.count_documents({"bdi_percentage": {"$exists": False}}) == 1
+
+async def test_string_dates_written_after_the_migration_are_caught_again(db, server):
+    await db.poles.insert_one({"_id": 5, "id": "p5", "created_at": "2024-01-01T00:00:00"})
+    await migrations.migrate(db)
+    assert await migrations.outstanding(db) == []
+
+    # e.g. a restored dump: an old _id, below the migration's last checkpoint
+    await db.poles.insert_one({"_id": 1, "id": "p1", "created_at": "2023-06-01T00:00:00"})
+
+    assert [m.version for m in await migrations.outstanding(db)] == ["0002-poles"]
+    with pytest.raises(RuntimeError, match="0002-poles"):
+        await server.check_migrations()
+
+    results = {result.version: result for result in await migrations.migrate(db)}
+    assert (results["0002-poles"].status, results["0002-poles"].modified) == ("applied", 1)
+    assert (await db.poles.find_one({"id": "p1"}))["created_at"] == datetime(2023, 6, 1, tzinfo=timezone.utc)
+    await server.check_migrations()
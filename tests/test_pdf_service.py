@@ -0,0 +1,105 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+import pdf_service
+
+pytestmark = pytest.mark.anyio
+
+def budget(**overrides):
+    doc = {
+        "id": "b1a2c3d4-0000-0000-0000-000000000000", "project_name": "Rede Centro", "client_name": "Cliente",
+        "items": [{"item_id": "pole-1", "item_type": "poles", "code": "P11", "description": "Poste 11m",
+                   "quantity": 2, "unit_price": 800.0, "total_price": 1600.0}],
+        "subtotal": 1600.0, "labor_cost": 0.0, "additional_services": 0.0,
+        "bdi_percentage": 0.0, "bdi_value": 0.0, "total": 1600.0, "notes": None,
+        "created_at": datetime(2024, 5, 1, 12, tzinfo=timezone.utc), "revision": 1,
+    }
+    doc.update(overrides)
+    return doc
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    """Render in a thread instead of the spawn pool, recording each call."""
+    calls = []
+
+    def fake_render(doc):
+        calls.append(doc["id"])
+        return b"%PDF-fake " + doc["project_name"].encode()
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pdf_service, "PDF_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pdf_service, "get_executor", lambda: executor)
+    monkeypatch.setattr(pdf_service, "_render_in_worker", fake_render)
+    yield calls
+    executor.shutdown()
+
+def test_content_hash_follows_the_budget_content():
+    assert pdf_service.content_hash(budget()) == pdf_service.content_hash(budget())
+    assert pdf_service.content_hash(budget()) != pdf_service.content_hash(budget(total=1700.0))
+
+def test_content_hash_changes_with_the_render_version(monkeypatch):
+    before = pdf_service.content_hash(budget())
+    monkeypatch.setattr(pdf_service, "RENDER_VERSION", "test")
+    assert pdf_service.content_hash(budget()) != before
+
+def test_worker_renders_a_pdf():
+    content = pdf_service._render_in_worker(budget(notes="Entrega em 30 dias"))
+    assert content.startswith(b"%PDF")
+
+async def test_repeat_requests_are_served_from_disk(renders):
+    first = await pdf_service.get_or_render(budget())
+    second = await pdf_service.get_or_render(budget())
+
+    assert first == second
+    assert first.read_bytes() == b"%PDF-fake Rede Centro"
+    assert renders == [budget()["id"]]
+
+async def test_concurrent_requests_share_one_render(renders):
+    paths = await asyncio.gather(*(pdf_service.get_or_render(budget()) for _ in range(5)))
+
+    assert len(set(paths)) == 1
+    assert len(renders) == 1
+    assert pdf_service._inflight == {}
+
+async def test_full_queue_is_refused(renders, monkeypatch):
+    monkeypatch.setattr(pdf_service, "PDF_MAX_PENDING", 0)
+
+    with pytest.raises(pdf_service.PdfQueueFull) as exc:
+        await pdf_service.get_or_render(budget())
+    assert exc.value.retry_after == pdf_service.RETRY_AFTER_PER_RENDER
+    assert renders == []
+
+async def test_cache_is_pruned_to_the_limit(renders, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_service, "PDF_CACHE_MAX_FILES", 2)
+
+    for total in (1.0, 2.0, 3.0):
+        await pdf_service.get_or_render(budget(total=total))
+
+    assert len(list(tmp_path.glob("*.pdf"))) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+async def test_export_route_sets_etag_and_honours_if_none_match(api, server, renders):
+    await server.db.budgets.insert_one(budget())
+
+    response = await api.get(f"/api/budgets/{budget()['id']}/export-pdf")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert "orcamento_Rede_Centro_b1a2c3d4.pdf" in response.headers["content-disposition"]
+    etag = response.headers["etag"]
+
+    cached = await api.get(f"/api/budgets/{budget()['id']}/export-pdf", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert len(renders) == 1
+
+async def test_export_route_errors(api, server, renders, monkeypatch):
+    assert (await api.get("/api/budgets/missing/export-pdf")).status_code == 404
+
+    await server.db.budgets.insert_one(budget())
+    monkeypatch.setattr(pdf_service, "PDF_MAX_PENDING", 0)
+    response = await api.get(f"/api/budgets/{budget()['id']}/export-pdf")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(pdf_service.RETRY_AFTER_PER_RENDER)
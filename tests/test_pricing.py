@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+
+import budget_search
+from pricing import PricingError, compute_totals, price_lines, resolve_prices, to_money
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def catalog(db):
+    await db.poles.insert_one({"id": "pole-1", "code": "P11", "type": "Concreto", "height": 11.0,
+                               "capacity": 300, "unit_price": 812.345})
+    await db.equipment.insert_one({"id": "eq-1", "code": "CH1", "description": "Chave fusível", "unit_price": 0.1})
+    await db.medium_voltage_structures.insert_one({"id": "mv-1", "code": "CE1", "description": "Estrutura CE1",
+                                                   "total_price": 40.0})
+    return db
+
+@pytest.mark.parametrize("value, expected", [
+    (0.125, "0.13"), (2.675, "2.68"), (1.005, "1.01"), (-0.125, "-0.13"), ("10", "10.00"), (0, "0.00"),
+])
+def test_to_money_rounds_half_up(value, expected):
+    assert to_money(value) == Decimal(expected)
+
+def test_totals_do_not_drift_on_large_budgets():
+    totals = compute_totals([0.1] * 10000, labor_cost=0.0, additional_services=0.0, bdi_percentage=0)
+
+    assert totals.subtotal == Decimal("1000.00")
+    assert float(sum([0.1] * 10000)) != 1000.0
+
+def test_bdi_applies_to_subtotal_with_services():
+    totals = compute_totals([100.0, 50.55], labor_cost=20.0, additional_services=9.45, bdi_percentage=12.5)
+
+    assert totals.subtotal == Decimal("150.55")
+    assert totals.bdi_value == Decimal("22.50")
+    assert totals.total == Decimal("202.50")
+
+async def test_price_lines_resolves_catalog_prices(catalog):
+    items = await price_lines(catalog, [
+        {"item_type": "pole", "item_id": "pole-1", "quantity": 3},
+        {"item_type": "medium_voltage_structures", "item_id": "mv-1", "quantity": 2.5},
+        {"item_type": "equipment", "item_id": "eq-1", "quantity": 3},
+    ])
+
+    assert [(item["code"], item["unit_price"], item["total_price"]) for item in items] == [
+        ("P11", 812.35, 2437.05), ("CE1", 40.0, 100.0), ("CH1", 0.1, 0.3),
+    ]
+    assert items[0]["description"] == "Poste Concreto 11m 300 daN"
+
+async def test_aliases_are_stored_under_the_collection_name(catalog):
+    lines = [{"item_type": item_type, "item_id": "pole-1", "quantity": 1} for item_type in ("pole", "poles")]
+    await catalog.budgets.insert_many([{"id": f"b{n}", "items": [item]}
+                                       for n, item in enumerate(await price_lines(catalog, lines))])
+
+    (top,) = await budget_search.top_items(catalog, {}, limit=10)
+
+    assert (top["item_type"], top["code"], top["quantity"], top["budget_count"]) == ("poles", "P11", 2, 2)
+
+async def test_unknown_items_are_all_reported(catalog):
+    with pytest.raises(PricingError) as raised:
+        await resolve_prices(catalog, [("poles", "pole-1"), ("poles", "missing"), ("hardware", "x")])
+
+    assert sorted(raised.value.missing) == [("hardware", "x"), ("poles", "missing")]
+
+async def test_priced_budget_route(api, db):
+    await db.poles.insert_one({"id": "pole-1", "code": "P11", "type": "Concreto", "height": 11.0,
+                               "capacity": 300, "unit_price": 812.345})
+    body = {"project_name": "Projeto", "client_name": "Cliente", "bdi_percentage": 10,
+            "lines": [{"item_type": "poles", "item_id": "pole-1", "quantity": 2}]}
+
+    quote = await api.post("/api/budgets/quote", json=body)
+    missing = await api.post("/api/budgets/quote", json={**body, "lines": [
+        {"item_type": "poles", "item_id": "nope", "quantity": 1}]})
+
+    assert quote.status_code == 200
+    assert (quote.json()["subtotal"], quote.json()["bdi_value"], quote.json()["total"]) == (1624.7, 162.47, 1787.17)
+    assert await db.budgets.count_documents({}) == 0
+    assert missing.status_code == 422
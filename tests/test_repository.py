@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import material_index
+
+pytestmark = pytest.mark.anyio
+
+def pole(code, price=100.0):
+    return {"type": "Concreto", "height": 11, "capacity": 300, "code": code, "unit_price": price}
+
+def structure(code, materials):
+    return {"code": code, "description": code, "voltage_class": "15kV", "materials": [
+        {"code": material_code, "description": material_code, "unit": "pç", "quantity": quantity, "unit_price": price}
+        for material_code, quantity, price in materials
+    ]}
+
+async def test_update_keeps_created_at_and_list_position(api, db):
+    ids = [(await api.post("/api/poles", json=pole(f"P{i}"))).json()["id"] for i in range(3)]
+    before = await db.poles.find_one({"id": ids[0]})
+
+    response = await api.put(f"/api/poles/{ids[0]}", json=pole("P0", price=250.0))
+
+    assert response.status_code == 200
+    after = await db.poles.find_one({"id": ids[0]})
+    assert after["created_at"] == before["created_at"]
+    assert after["unit_price"] == 250.0
+    first_page = await api.get("/api/poles", params={"limit": 1})
+    assert first_page.json()[0]["id"] == ids[0]
+    assert first_page.json()[0]["unit_price"] == 250.0
+
+async def test_update_of_a_missing_item_is_404(api):
+    response = await api.put("/api/poles/missing", json=pole("P0"))
+
+    assert response.status_code == 404
+
+async def test_structure_writes_keep_the_material_index_current(api, db):
+    created = (await api.post("/api/medium-voltage-structures",
+                              json=structure("CE1", [("PARAF", 4, 2.5)]))).json()
+    assert created["total_price"] == 10.0
+
+    await api.put(f"/api/medium-voltage-structures/{created['id']}",
+                  json=structure("CE1", [("ISOL", 3, 10.0)]))
+
+    assert (await material_index.material_usage(db, "PARAF"))["structures"] == []
+    usage = (await material_index.material_usage(db, "ISOL"))["structures"]
+    assert [(entry["structure_id"], entry["unit_price"]) for entry in usage] == [(created["id"], 10.0)]
+
+async def test_bulk_import_goes_through_the_repository(api, db, server):
+    await api.get("/api/low-voltage-structures")
+    assert server.catalog_cache.peek("low_voltage_structures") is not None
+    rows = [structure("SI1", [("ARMACAO", 2, 30.0)]), structure("SI2", [("ARMACAO", 1, 30.0), ("PARAF", 2, 1.5)])]
+    body = "\n".join(json.dumps(row) for row in rows)
+
+    response = await api.post("/api/low-voltage-structures/bulk", content=body,
+                              headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.json()["inserted"] == 2
+    stored = {doc["code"]: doc async for doc in db.low_voltage_structures.find({})}
+    assert stored["SI1"]["total_price"] == 60.0
+    assert stored["SI2"]["total_price"] == 33.0
+    assert server.catalog_cache.peek("low_voltage_structures") is None
+    usage = (await material_index.material_usage(db, "ARMACAO"))["structures"]
+    assert sorted(entry["structure_code"] for entry in usage) == ["SI1", "SI2"]
+    count = server.metrics.REPOSITORY_OPERATION_SECONDS.count("low_voltage_structures", "bulk_upsert")
+    assert count >= 1
+
+async def test_budget_updates_are_timed_by_the_repository(api, server):
+    budget = {"project_name": "Projeto", "client_name": "Cliente", "items": []}
+    budget_id = (await api.post("/api/budgets", json=budget)).json()["id"]
+    before = server.metrics.REPOSITORY_OPERATION_SECONDS.count("budgets", "replace")
+
+    await api.put(f"/api/budgets/{budget_id}", json={**budget, "notes": "revisado"})
+
+    assert server.metrics.REPOSITORY_OPERATION_SECONDS.count("budgets", "replace") == before + 1
@@ -0,0 +1,124 @@
+import pytest
+
+import material_index
+from repricing import reprice, round_cents
+
+pytestmark = pytest.mark.anyio
+
+def material(code, quantity, unit_price):
+    return {"code": code, "description": code, "unit": "pç", "quantity": quantity, "unit_price": unit_price}
+
+def structure(structure_id, code, materials):
+    return {"id": structure_id, "code": code, "materials": materials,
+            "total_price": sum(m['quantity'] * m['unit_price'] for m in materials)}
+
+def budget(budget_id, lines, bdi=0.0):
+    items = [{"item_id": item_id, "quantity": quantity, "unit_price": price,
+              "total_price": round(quantity * price, 2)} for item_id, quantity, price in lines]
+    subtotal = sum(item['total_price'] for item in items)
+    return {"id": budget_id, "project_name": budget_id, "items": items, "labor_cost": 0.0,
+            "additional_services": 0.0, "bdi_percentage": bdi, "subtotal": subtotal,
+            "bdi_value": round(subtotal * bdi / 100, 2), "total": round(subtotal * (1 + bdi / 100), 2)}
+
+@pytest.fixture
+async def catalog(db):
+    mv = structure("mv-1", "CE1", [material("PARAF", 4, 2.5), material("ISOL", 3, 10.0)])
+    lv = structure("lv-1", "SI1", [material("ARMACAO", 1, 30.0)])
+    await db.medium_voltage_structures.insert_one(dict(mv))
+    await db.low_voltage_structures.insert_one(dict(lv))
+    await material_index.index_structure(db, "medium_voltage_structures", mv)
+    await material_index.index_structure(db, "low_voltage_structures", lv)
+    await db.poles.insert_one({"id": "pole-1", "code": "P11", "unit_price": 800.0})
+    return db
+
+def test_round_cents_is_half_up():
+    assert list(round_cents([0.125, 1.005, -0.125, 2.0])) == [0.13, 1.01, -0.13, 2.0]
+
+async def test_empty_database(db):
+    report = await reprice(db, {"PARAF": 3.0})
+
+    assert report.budgets_scanned == 0
+    assert report.summary()["structures_changed"] == 0
+    assert report.summary()["budgets_changed"] == 0
+    assert list(report.budgets.columns) == ["id", "project_name", "old_total", "new_total", "delta"]
+
+async def test_no_budgets_reference_the_repriced_structures(catalog):
+    await catalog.budgets.insert_one(budget("b-1", [("pole-1", 2, 800.0)]))
+
+    report = await reprice(catalog, {"ARMACAO": 40.0}, targeted=True)
+
+    assert report.budgets_scanned == 0
+    assert report.budgets.empty
+    assert report.writes == {"low_voltage_structures": 1}
+
+async def test_reprices_structures_and_budgets(catalog):
+    await catalog.budgets.insert_one(budget("b-1", [("mv-1", 2, 40.0), ("pole-1", 1, 800.0)], bdi=10.0))
+
+    report = await reprice(catalog, {"PARAF": 3.0})
+
+    assert report.structures.set_index("id").loc["mv-1", "new_total"] == 42.0
+    stored = await catalog.medium_voltage_structures.find_one({"id": "mv-1"})
+    assert stored['total_price'] == 42.0
+    assert stored['materials'][0]['unit_price'] == 3.0
+    assert stored['materials'][1]['unit_price'] == 10.0
+
+    stored = await catalog.budgets.find_one({"id": "b-1"})
+    assert stored['items'][0]['unit_price'] == 42.0
+    assert stored['items'][0]['total_price'] == 84.0
+    assert stored['subtotal'] == 884.0
+    assert stored['bdi_value'] == 88.4
+    assert stored['total'] == 972.4
+    assert report.budgets.iloc[0]['delta'] == 4.4
+
+async def test_targeted_only_touches_referencing_budgets(catalog):
+    await catalog.budgets.insert_many([
+        budget("uses-mv", [("mv-1", 1, 40.0)]),
+        budget("uses-lv", [("lv-1", 1, 30.0)]),
+    ])
+
+    report = await reprice(catalog, {"ISOL": 12.0}, targeted=True)
+
+    assert report.budgets_scanned == 1
+    assert list(report.budgets["id"]) == ["uses-mv"]
+    assert (await catalog.budgets.find_one({"id": "uses-mv"}))['total'] == 46.0
+    assert (await catalog.budgets.find_one({"id": "uses-lv"}))['total'] == 30.0
+
+async def test_dry_run_reports_without_writing(catalog):
+    await catalog.budgets.insert_one(budget("b-1", [("mv-1", 1, 40.0)]))
+
+    report = await reprice(catalog, {"PARAF": 3.0}, dry_run=True)
+
+    assert report.writes == {}
+    assert report.budgets.iloc[0]['new_total'] == 42.0
+    assert (await catalog.medium_voltage_structures.find_one({"id": "mv-1"}))['total_price'] == 40.0
+    assert (await catalog.budgets.find_one({"id": "b-1"}))['total'] == 40.0
+
+async def test_lines_without_a_catalog_entry_keep_their_price(catalog):
+    await catalog.budgets.insert_one(budget("b-1", [("deleted-item", 3, 7.25), ("mv-1", 1, 40.0)]))
+
+    await reprice(catalog, {"PARAF": 3.0})
+
+    stored = await catalog.budgets.find_one({"id": "b-1"})
+    assert stored['items'][0]['unit_price'] == 7.25
+    assert stored['items'][0]['total_price'] == 21.75
+    assert stored['total'] == 63.75
+
+async def test_unchanged_catalog_writes_nothing(catalog):
+    await catalog.budgets.insert_one(budget("b-1", [("mv-1", 1, 40.0), ("pole-1", 1, 800.0)]))
+
+    report = await reprice(catalog)
+
+    assert report.structures.empty
+    assert report.budgets.empty
+    assert report.writes == {}
+
+async def test_material_usage_shows_the_new_prices(catalog):
+    await reprice(catalog, {"PARAF": 3.0, "ARMACAO": 35.0}, targeted=True)
+
+    usage = await material_index.material_usage(catalog, "PARAF")
+    assert [entry['unit_price'] for entry in usage['structures']] == [3.0]
+    usage = await material_index.material_usage(catalog, "ARMACAO")
+    assert [entry['unit_price'] for entry in usage['structures']] == [35.0]
+    # Untouched materials of a repriced structure are still indexed
+    usage = await material_index.material_usage(catalog, "ISOL")
+    assert [entry['unit_price'] for entry in usage['structures']] == [10.0]
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+import pytest
+from pymongo import DeleteOne, InsertOne, UpdateOne
+
+import seeding
+from seeding import plan_seed, seed_collection, structure_totals
+
+pytestmark = pytest.mark.anyio
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def pole(code, price, **extra):
+    return {"type": "Concreto", "height": 11, "capacity": 300, "code": code, "unit_price": price, **extra}
+
+def stored(_id, code, price, doc_id=None, day=1):
+    return pole(code, price, _id=_id, id=doc_id or f"id-{code}", created_at=CREATED.replace(day=day))
+
+def test_plan_inserts_updates_and_leaves_unchanged_rows():
+    seed = [pole("P11", 800.0), pole("P12", 950.0), pole("P13", 1200.0)]
+    current = [stored(1, "P11", 800.0), stored(2, "P12", 900.0)]
+
+    ops, report = plan_seed(seed, current, ("code",), collection="poles")
+
+    assert (report.inserted, report.updated, report.unchanged, report.deleted) == (1, 1, 1, 0)
+    update, insert = ops
+    assert isinstance(update, UpdateOne)
+    assert update._filter == {"_id": 2}
+    assert update._doc == {"$set": {"unit_price": 950.0}}
+    assert isinstance(insert, InsertOne)
+    assert insert._doc["code"] == "P13"
+    assert insert._doc["id"] and insert._doc["created_at"].tzinfo is not None
+
+def test_unchanged_seed_plans_no_writes():
+    ops, report = plan_seed([pole("P11", 800.0)], [stored(1, "P11", 800.0)], ("code",))
+
+    assert ops == []
+    assert not report.changed
+    assert report.unchanged == 1
+
+def test_duplicates_and_rows_outside_the_seed_are_kept_unless_pruned():
+    # Stored in (created_at, id) order: the oldest P11 is the one matched
+    current = [stored(1, "P11", 800.0, day=1), stored(2, "P11", 700.0, "dup", day=2), stored(3, "P99", 10.0)]
+
+    ops, report = plan_seed([pole("P11", 800.0)], current, ("code",))
+    assert ops == []
+    assert (report.unchanged, report.extra, report.deleted) == (1, 2, 0)
+
+    ops, report = plan_seed([pole("P11", 800.0)], current, ("code",), prune=True)
+    assert [op._filter for op in ops] == [{"_id": 2}, {"_id": 3}]
+    assert all(isinstance(op, DeleteOne) for op in ops)
+    assert (report.deleted, report.extra) == (2, 0)
+
+def test_compound_key_and_last_seed_row_wins():
+    seed = [{"category": "pole_types", "value": "Concreto", "label": "Concreto"},
+            {"category": "pole_types", "value": "Concreto", "label": "Concreto armado"}]
+    current = [{"_id": 1, "category": "pole_types", "value": "Concreto", "label": "Concreto"}]
+
+    ops, report = plan_seed(seed, current, ("category", "value"))
+
+    assert report.updated == 1
+    assert ops[0]._doc == {"$set": {"label": "Concreto armado"}}
+
+async def test_seed_keeps_id_and_created_at(db):
+    await db.poles.insert_one({**pole("P11", 800.0), "id": "keep-me", "created_at": CREATED})
+
+    report = await seed_collection(db, "poles", [pole("P11", 850.0), pole("P12", 900.0)])
+
+    assert (report.inserted, report.updated, report.swapped) == (1, 1, False)
+    docs = {doc["code"]: doc async for doc in db.poles.find({}, {"_id": 0})}
+    assert (docs["P11"]["id"], docs["P11"]["created_at"], docs["P11"]["unit_price"]) == ("keep-me", CREATED, 850.0)
+    assert isinstance(docs["P12"]["created_at"], datetime)
+
+    again = await seed_collection(db, "poles", [pole("P11", 850.0), pole("P12", 900.0)])
+    assert not again.changed
+
+async def test_in_place_seed_keeps_concurrent_api_writes(db):
+    await db.poles.insert_one({**pole("P11", 800.0), "id": "p11", "created_at": CREATED})
+    await db.poles.insert_one({**pole("API-1", 10.0), "id": "from-api", "created_at": CREATED})
+
+    await seed_collection(db, "poles", [pole("P11", 850.0)])
+
+    assert await db.poles.find_one({"id": "from-api"}) is not None
+
+async def test_dry_run_writes_nothing(db):
+    await db.poles.insert_one({**pole("P11", 800.0), "id": "p11", "created_at": CREATED})
+
+    report = await seed_collection(db, "poles", [pole("P11", 850.0), pole("P12", 900.0)], prune=True, dry_run=True)
+
+    assert (report.inserted, report.updated, report.swapped) == (1, 1, False)
+    assert [doc["unit_price"] async for doc in db.poles.find({})] == [800.0]
+
+async def test_swap_replaces_the_collection_and_keeps_its_indexes(db):
+    await db.poles.insert_one({**pole("P11", 800.0), "id": "p11", "created_at": CREATED})
+    await db.poles.create_index("type", name="by_type")
+
+    report = await seed_collection(db, "poles", [pole("P11", 850.0), pole("P12", 900.0)], swap=True)
+
+    assert report.swapped
+    docs = {doc["code"]: doc async for doc in db.poles.find({})}
+    assert (docs["P11"]["id"], docs["P11"]["unit_price"]) == ("p11", 850.0)
+    assert "P12" in docs
+    assert {"by_type", "id_unique", "code"} <= set(await db.poles.index_information())
+    assert "poles" + seeding.STAGING_SUFFIX not in await db.list_collection_names()
+
+def test_structure_totals():
+    structure = {"materials": [{"quantity": 4, "unit_price": 2.5}, {"quantity": 3, "unit_price": 10.0}]}
+
+    assert structure_totals(structure)["total_price"] == 40.0
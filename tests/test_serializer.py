@@ -0,0 +1,126 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+@pytest.fixture
+async def catalog(db):
+    # Two rows share a timestamp so the id breaks the tie
+    await db.conductors.insert_many([
+        {"id": f"c{number:02d}", "type": "Alumínio", "insulation": "XLPE", "section": f"{number}mm²",
+         "code": f"CA{number:02d}", "configuration": "Multiplexado", "unit_price": number + 0.5,
+         "created_at": START + timedelta(minutes=min(number, 5))}
+        for number in range(7)
+    ])
+    await db.budgets.insert_many([
+        {"id": f"b{number}", "project_name": f"Projeto {number}", "client_name": "Cliente", "items": [],
+         "subtotal": 10.0, "labor_cost": 0.0, "additional_services": 0.0, "bdi_percentage": 0.0,
+         "bdi_value": 0.0, "total": 10.0, "notes": None, "created_at": START + timedelta(days=number)}
+        for number in range(3)
+    ])
+
+async def pages(api, path, limit):
+    """Every page body of ``path``, following X-Next-Cursor."""
+    bodies, params = [], {"limit": limit}
+    while True:
+        response = await api.get(path, params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        bodies.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            assert "link" not in response.headers
+            return bodies
+        assert response.headers["link"].endswith('rel="next"')
+        params = {"limit": limit, "after": cursor}
+
+def test_cursor_round_trip(server):
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    cursor = server.encode_cursor({"created_at": created_at, "id": "abc"})
+
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor) == (created_at, "abc")
+
+def test_naive_cursor_dates_are_utc(server):
+    cursor = server.encode_cursor({"created_at": datetime(2024, 5, 1), "id": "abc"})
+
+    assert server.decode_cursor(cursor)[0] == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("cursor", ["###", "bm90LWpzb24", "WzFd"])
+def test_invalid_cursor_is_400(server, cursor):
+    with pytest.raises(HTTPException) as exc:
+        server.decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("path", ["/api/conductors", "/api/budgets"])
+async def test_fast_path_matches_the_generic_path(api, server, catalog, monkeypatch, path):
+    fast = await pages(api, path, limit=3)
+    monkeypatch.setattr(server, "FAST_JSON", False)
+    server.catalog_cache.invalidate_all()
+    generic = await pages(api, path, limit=3)
+
+    assert fast == generic
+    rows = [row for body in fast for row in body]
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert len({row["id"] for row in rows}) == len(rows)
+
+async def test_catalog_pages_follow_the_cursor(api, catalog):
+    bodies = await pages(api, "/api/conductors", limit=3)
+
+    assert [len(body) for body in bodies] == [3, 3, 1]
+    assert bodies[0][0] == {"id": "c00", "type": "Alumínio", "insulation": "XLPE", "section": "0mm²",
+                            "code": "CA00", "configuration": "Multiplexado", "unit_price": 0.5,
+                            "created_at": "2024-01-01T00:00:00Z"}
+
+async def test_summaries_use_the_summary_model(api, catalog):
+    (body,) = await pages(api, "/api/budgets/summary", limit=10)
+
+    assert body[0] == {"id": "b0", "project_name": "Projeto 0", "client_name": "Cliente", "total": 10.0,
+                       "created_at": "2024-01-01T00:00:00Z", "item_count": 0}
+
+@pytest.mark.parametrize("path", ["/api/conductors", "/api/budgets"])
+async def test_ndjson_streams_one_document_per_line(api, catalog, path):
+    by_param = await api.get(path, params={"format": "ndjson"})
+    by_header = await api.get(path, headers={"Accept": "application/x-ndjson"})
+    listed = (await api.get(path)).json()
+
+    assert by_param.headers["content-type"] == "application/x-ndjson"
+    assert by_param.content == by_header.content
+    lines = by_param.content.decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["id"] for row in rows] == [row["id"] for row in listed]
+
+async def test_ndjson_resumes_after_a_cursor(api, catalog):
+    first = await api.get("/api/budgets", params={"limit": 1})
+
+    rest = await api.get("/api/budgets", params={"format": "ndjson", "after": first.headers["x-next-cursor"]})
+
+    assert [json.loads(line)["id"] for line in rest.content.decode().splitlines()] == ["b1", "b2"]
+
+async def test_bundle_matches_the_generic_path(api, server, catalog, monkeypatch):
+    fast = await api.get("/api/catalog/bundle")
+    monkeypatch.setattr(server, "FAST_JSON", False)
+    server.catalog_cache.invalidate_all()
+    monkeypatch.setattr(server, "_bundle_body", None)
+    generic = await api.get("/api/catalog/bundle")
+
+    assert fast.json() == generic.json()
+    assert fast.headers["etag"] == generic.headers["etag"]
+    assert [row["code"] for row in fast.json()["catalogs"]["conductors"]] == [f"CA{n:02d}" for n in range(7)]
+
+@pytest.mark.parametrize("path", ["/api/conductors", "/api/budgets", "/api/budgets/summary"])
+async def test_both_formats_write_the_same_documents(api, catalog, path):
+    listed = await api.get(path)
+    streamed = await api.get(path, headers={"Accept": "application/x-ndjson"})
+
+    assert [json.loads(line) for line in streamed.content.decode().splitlines()] == listed.json()
+    assert listed.json()[0]["created_at"].endswith("Z")
+    # The format follows Accept, so shared caches must not mix the two
+    for response in (listed, streamed):
+        assert "Accept" in [value.strip() for value in response.headers["vary"].split(",")]